@@ -16,7 +16,7 @@
 
 import socket
 import threading
-import socket
+from collections import deque
 
 
 
@@ -35,26 +35,62 @@ class Proxy(object):
 
     class _Socket_proxy_reader_thread(threading.Thread):
 
-        def __init__(self, socket):
+        def __init__(self, socket, chunk_size: int = 65536):
             super(Proxy._Socket_proxy_reader_thread, self).__init__()
             self.socket = socket
             self.lock = threading.Lock()
             self.condition = threading.Condition(self.lock)
-            self.replies = []
+            self.replies = deque()
             self.matches = {}
+            self.frame_matches = {}
+            # Bytes received but not yet consumed. Consumed bytes are removed from the front,
+            # which does not move the remaining ones.
+            self.buffer = bytearray()
+            self.chunk = memoryview(bytearray(chunk_size))
+
+        def __fill(self):
+            size = self.socket.recv_into(self.chunk)
+            if size == 0:
+                raise EOFError()
+            self.buffer += self.chunk[:size]
+
+        def read_line(self):
+            """Return the next line, including the ending newline."""
+            start = 0
+            while True:
+                end = self.buffer.find(b'\n', start)
+                if end != -1:
+                    line = self.buffer[:end + 1].decode('utf-8')
+                    del self.buffer[:end + 1]
+                    return line
+                start = len(self.buffer)
+                self.__fill()
+
+        def read(self, size: int) -> bytes:
+            """Return the next size bytes of binary payload."""
+            while len(self.buffer) < size:
+                self.__fill()
+            data = bytes(self.buffer[:size])
+            del self.buffer[:size]
+            return data
 
         def run(self):
             while True:
-                reply = ""
                 try:
-                    while True:
-                        byte = self.socket.recv(1).decode('utf-8')
-                        reply += byte
-                        if byte == '\n':
-                            break
-                except:
+                    reply = self.read_line()
+
+                    # Binary frames are announced by a line ending with their size
+                    prefix, _, size = reply[:-1].rpartition(' ')
+                    frame_callback = self.frame_matches.get(prefix)
+                    if frame_callback is not None:
+                        payload = self.read(int(size, 0))
+                except (OSError, EOFError):
                     return
 
+                if frame_callback is not None:
+                    frame_callback[0](payload, *frame_callback[1], **frame_callback[2])
+                    continue
+
                 callback = self.matches.get(reply)
                 if callback is not None:
                     callback[0](*callback[1], **callback[2])
@@ -69,7 +105,7 @@ class Proxy(object):
             self.lock.acquire()
             while len(self.replies) == 0:
                 self.condition.wait()
-            reply = self.replies.pop(0)
+            reply = self.replies.popleft()
 
             self.lock.release()
 
@@ -81,6 +117,13 @@ class Proxy(object):
         def unregister_callback(self, match):
             self.matches[match] = None
 
+        def register_frame_callback(self, match, callback, *kargs, **kwargs):
+            """Call callback with the payload of each binary frame announced by match followed by its size."""
+            self.frame_matches[match] = callback, kargs, kwargs
+
+        def unregister_frame_callback(self, match):
+            self.frame_matches.pop(match, None)
+
 
     def __init__(self, host: str = 'localhost', port: int = 42951):
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -184,7 +227,8 @@ class Proxy(object):
         self.socket.send(('quit %d\n' % status).encode('ascii'))
 
 
-    def _handle_err(self, error, error_str=None):
+    @staticmethod
+    def _handle_err(error, error_str=None):
         if error != 0:
             if error_str is None:
                 raise RuntimeError("Proxy command failed with status %s" % error)
@@ -192,8 +236,12 @@ class Proxy(object):
                 raise RuntimeError("Proxy command failed with message: %s" % error_str)
 
 
-    def _get_retval(self):
-        result = self.reader.wait_reply()
+    def _send(self, data: bytes):
+        self.socket.sendall(data)
+
+
+    @staticmethod
+    def _parse_retval(result):
         error = 0
         error_str = None
         for arg in result.split(';'):
@@ -203,6 +251,20 @@ class Proxy(object):
             elif name == 'msg':
                 error_str = value
 
+        return error, error_str
+
+
+    def _get_retvals(self, count: int):
+        # All the replies are consumed before reporting an error so that the following ones
+        # are not taken as the replies of the next commands.
+        retvals = [self._parse_retval(self.reader.wait_reply()) for i in range(0, count)]
+        for error, error_str in retvals:
+            self._handle_err(error, error_str)
+
+
+    def _get_retval(self):
+        error, error_str = self._parse_retval(self.reader.wait_reply())
+
         self._handle_err(error, error_str)
 
         if error != 0:
@@ -234,22 +296,15 @@ class Router(object):
         self.proxy = proxy
         self.lock = threading.Lock()
         self.condition = threading.Condition(self.lock)
-        self.pending_read_bytes = []
+        self.pending_reads = deque()
         self.component = proxy._get_component(path)
-        self.proxy.reader.register_callback('router %s read\n' % self.component, self.__handle_read)
+        self.proxy.reader.register_frame_callback('router %s read' % self.component, self.__handle_read)
 
 
-    def __handle_read(self):
+    def __handle_read(self, payload):
 
         self.lock.acquire()
-
-        size = self.read_size
-        reply = []
-        while size > 0:
-            reply += self.proxy.socket.recv(size)
-            size = self.read_size - len(reply)
-        
-        self.pending_read_bytes = reply
+        self.pending_reads.append(payload)
         self.condition.notify()
         self.lock.release()
 
@@ -274,12 +329,7 @@ class Router(object):
         RuntimeError
             If the access generates an error in the architecture.
         """
-        cmd = 'component %s mem_write 0x%x 0x%x\n' % (self.component, addr, size)
-
-        self.proxy.socket.send(cmd.encode('ascii'))
-        self.proxy.socket.send(values)
-
-        self.proxy._get_retval()
+        self.mem_write_batch([(addr, values[0:size])])
 
     def mem_read(self, addr: int, size: int) -> bytes:
         """Inject a memory read.
@@ -305,23 +355,75 @@ class Router(object):
             If the access generates an error in the architecture.
         """
 
-        self.read_size = size
-        cmd = 'component %s mem_read 0x%x 0x%x\n' % (self.component, addr, size)
-        self.proxy.socket.send(cmd.encode('ascii'))
+        return self.mem_read_batch([(addr, size)])[0]
+
+
+    def mem_write_batch(self, accesses: list):
+        """Inject several memory writes.
+
+        All the writes are sent at once and then all the replies are waited for, which is
+        much faster than calling mem_write for each access.
+
+        Parameters
+        ----------
+        accesses : list
+            List of (addr, values) tuples, values being the bytes to be written at addr, in little endian
+            byte ordering.
 
+        Raises
+        ------
+        RuntimeError
+            If any access generates an error in the architecture.
+        """
+        request = bytearray()
+        for addr, values in accesses:
+            request += ('component %s mem_write 0x%x 0x%x\n' % (self.component, addr, len(values))).encode('ascii')
+            request += values
+
+        self.proxy._send(request)
+
+        self.proxy._get_retvals(len(accesses))
+
+    def mem_read_batch(self, accesses: list) -> list:
+        """Inject several memory reads.
+
+        All the reads are sent at once and then all the replies are waited for, which is
+        much faster than calling mem_read for each access.
+
+        Parameters
+        ----------
+        accesses : list
+            List of (addr, size) tuples.
+
+        Returns
+        -------
+        list
+            The sequence of bytes read by each access, in little endian byte ordering.
+
+        Raises
+        ------
+        RuntimeError
+            If any access generates an error in the architecture.
+        """
+        request = ''
+        for addr, size in accesses:
+            request += 'component %s mem_read 0x%x 0x%x\n' % (self.component, addr, size)
+
+        self.proxy._send(request.encode('ascii'))
+
+        replies = []
         self.lock.acquire()
-        
-        while len(self.pending_read_bytes) < size:
-            self.condition.wait()
 
-        reply = self.pending_read_bytes
-        self.pending_read_bytes = []
+        while len(replies) < len(accesses):
+            while len(self.pending_reads) == 0:
+                self.condition.wait()
+            replies.append(self.pending_reads.popleft())
 
         self.lock.release()
 
-        self.proxy._get_retval()
+        self.proxy._get_retvals(len(accesses))
 
-        return reply
+        return replies
 
 
     def mem_write_int(self, addr: int, size: int, value: int):
@@ -528,8 +630,7 @@ class Testbench_uart(object):
         """
         cmd = 'component %s uart tx %d %d\n' % (self.testbench, self.id, len(values))
 
-        self.proxy.socket.send(cmd.encode('ascii'))
-        self.proxy.socket.send(values)
+        self.proxy._send(cmd.encode('ascii') + bytes(values))
 
         self.proxy._get_retval()
 
@@ -603,7 +704,7 @@ class Testbench_uart(object):
 
     def __handle_rx(self):
         self.lock.acquire()
-        reply = self.proxy.socket.recv(1)
+        reply = self.proxy.reader.read(1)
         if self.callback is not None:
             self.callback[0](1, reply, *self.callback[1], **self.callback[2])
         else:
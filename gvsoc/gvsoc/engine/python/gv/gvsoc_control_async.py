@@ -0,0 +1,426 @@
+#
+# Copyright (C) 2021 GreenWaves Technologies
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Asyncio client for the GVSOC socket proxy.
+
+This provides the same classes as gv.gvsoc_control but their methods are coroutines. Requests
+are pipelined: each one queues a future which gets its reply, so several tasks can have requests
+in flight on the same proxy and one event loop can drive many simulations::
+
+    proxy = await Proxy.connect('localhost', port)
+    router = await Router.create(proxy)
+    values = await asyncio.gather(*[router.mem_read(addr, 4) for addr in addrs])
+
+GVSOC executes the commands of a connection in order and replies in order, so the oldest
+pending future is the one a reply belongs to.
+"""
+
+import asyncio
+from collections import deque
+
+from gv.gvsoc_control import Proxy as _Sync_proxy
+
+
+class Proxy(object):
+    """
+    A class used to control GVSOC through the socket proxy from asyncio code.
+
+    Use Proxy.connect to create it.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        # Futures of the requests waiting for a reply line, oldest first
+        self.pending = deque()
+        # Only one task at a time may wait for the write buffer to drain
+        self.drain_lock = asyncio.Lock()
+        # Binary frames whose size is given at the end of the line announcing them
+        self.frame_matches = {}
+        # Binary frames of a fixed size, announced by a given line
+        self.fixed_frame_matches = {}
+        self.reader_task = asyncio.ensure_future(self.__read_loop())
+
+    @classmethod
+    async def connect(cls, host: str = 'localhost', port: int = 42951):
+        """Connect to a GVSOC proxy.
+
+        Parameters
+        ----------
+        host : str
+            a string giving the hostname where the proxy is running
+        port : int
+            the port where to connect
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def close(self):
+        """Close the proxy.
+
+        Pending requests fail with ConnectionError.
+        """
+        if self.writer.can_write_eof():
+            self.writer.write_eof()
+        await self.reader_task
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def __read_loop(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if len(line) == 0:
+                    break
+                reply = line.decode('utf-8')
+
+                fixed_frame = self.fixed_frame_matches.get(reply)
+                if fixed_frame is not None:
+                    fixed_frame[1](await self.reader.readexactly(fixed_frame[0]))
+                    continue
+
+                prefix, _, size = reply[:-1].rpartition(' ')
+                frame_callback = self.frame_matches.get(prefix)
+                if frame_callback is not None:
+                    frame_callback(await self.reader.readexactly(int(size, 0)))
+                    continue
+
+                if len(self.pending) != 0:
+                    future = self.pending.popleft()
+                    if not future.done():
+                        future.set_result(reply)
+
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+
+        while len(self.pending) != 0:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError('GVSOC proxy connection closed'))
+
+    def register_frame_callback(self, match: str, callback):
+        """Call callback with the payload of each binary frame announced by match followed by its size."""
+        self.frame_matches[match] = callback
+
+    def unregister_frame_callback(self, match: str):
+        self.frame_matches.pop(match, None)
+
+    def register_fixed_frame_callback(self, match: str, size: int, callback):
+        """Call callback with the size bytes following each line equal to match."""
+        self.fixed_frame_matches[match] = size, callback
+
+    def unregister_fixed_frame_callback(self, match: str):
+        self.fixed_frame_matches.pop(match, None)
+
+    def _send(self, cmd: str, payload: bytes = None, reply: bool = True):
+        """Send a command and return the future of its reply line.
+
+        This does not yield so the commands are sent in the order of the calls, which is also the
+        order of their futures in pending.
+        """
+        data = cmd.encode('utf-8')
+        if payload is not None:
+            data += bytes(payload)
+        future = None
+        if reply:
+            future = asyncio.get_running_loop().create_future()
+            self.pending.append(future)
+        self.writer.write(data)
+        return future
+
+    async def _drain(self):
+        # Before python 3.10 StreamWriter.drain supports a single waiter once the transport is paused
+        async with self.drain_lock:
+            await self.writer.drain()
+
+    async def _command(self, cmd: str, payload: bytes = None) -> str:
+        future = self._send(cmd, payload)
+        await self._drain()
+        return await future
+
+    async def _command_noreply(self, cmd: str):
+        self._send(cmd, reply=False)
+        await self._drain()
+
+    async def _retval(self, cmd: str, payload: bytes = None):
+        error, error_str = _Sync_proxy._parse_retval(await self._command(cmd, payload))
+        _Sync_proxy._handle_err(error, error_str)
+
+    async def _wait_retvals(self, futures):
+        await self._drain()
+        retvals = [_Sync_proxy._parse_retval(await future) for future in futures]
+        for error, error_str in retvals:
+            _Sync_proxy._handle_err(error, error_str)
+
+    async def trace_add(self, trace: str):
+        """Enable the traces matching the regular expression trace."""
+        await self._command_noreply('trace add %s\n' % trace)
+
+    async def trace_remove(self, trace: str):
+        """Disable the traces matching the regular expression trace."""
+        await self._command_noreply('trace remove %s\n' % trace)
+
+    async def trace_level(self, level: str):
+        """Changes the trace level, can be "error", "warning", "info", "debug" or "trace"."""
+        await self._command_noreply('trace level %s\n' % level)
+
+    async def event_add(self, event: str):
+        """Enable the events matching the regular expression event."""
+        await self._command_noreply('event add %s\n' % event)
+
+    async def event_remove(self, event: str):
+        """Disable the events matching the regular expression event."""
+        await self._command_noreply('event remove %s\n' % event)
+
+    async def run(self, duration: int = None) -> int:
+        """Starts execution, for duration picoseconds or forever if it is None.
+
+        Returns
+        -------
+        int
+            The simulation time when the command was handled.
+        """
+        if duration is not None:
+            reply = await self._command('step %d\n' % duration)
+        else:
+            reply = await self._command('run\n')
+
+        return int(reply.split()[1])
+
+    async def quit(self, status: int = 0):
+        """Exit simulation with the specified status."""
+        await self._command_noreply('quit %d\n' % status)
+
+    async def _get_component(self, path):
+        result = await self._command('get_component %s\n' % path)
+        return result.replace('\n', '')
+
+
+class Router(object):
+    """
+    A class used to inject memory accesses into a router.
+
+    Use Router.create to create it. Any number of accesses can be in flight at the same time.
+    """
+
+    def __init__(self, proxy: Proxy, component: str):
+        self.proxy = proxy
+        self.component = component
+        # Futures of the mem_read payloads, oldest first
+        self.pending_reads = deque()
+        self.proxy.register_frame_callback('router %s read' % self.component, self.__handle_read)
+
+    @classmethod
+    async def create(cls, proxy: Proxy, path: str = '/sys/board/chip/soc/axi_ico'):
+        return cls(proxy, await proxy._get_component(path))
+
+    def __handle_read(self, payload):
+        future = self.pending_reads.popleft()
+        if not future.done():
+            future.set_result(payload)
+
+    async def mem_write(self, addr: int, size: int, values: bytes):
+        """Inject a memory write. See gvsoc_control.Router.mem_write."""
+        cmd = 'component %s mem_write 0x%x 0x%x\n' % (self.component, addr, size)
+        await self.proxy._retval(cmd, values[0:size])
+
+    async def mem_read(self, addr: int, size: int) -> bytes:
+        """Inject a memory read. See gvsoc_control.Router.mem_read."""
+        payload = asyncio.get_running_loop().create_future()
+        self.pending_reads.append(payload)
+        await self.proxy._retval('component %s mem_read 0x%x 0x%x\n' % (self.component, addr, size))
+        return await payload
+
+    async def mem_write_int(self, addr: int, size: int, value: int):
+        """Write an integer of size bytes."""
+        await self.mem_write(addr, size, value.to_bytes(size, byteorder='little'))
+
+    async def mem_read_int(self, addr: int, size: int) -> int:
+        """Read an integer of size bytes."""
+        return int.from_bytes(await self.mem_read(addr, size), byteorder='little')
+
+    async def mem_write_batch(self, accesses: list):
+        """Inject the (addr, values) memory writes of accesses, all in flight at the same time."""
+        retvals = [self.proxy._send('component %s mem_write 0x%x 0x%x\n' % (self.component, addr, len(values)), values)
+            for addr, values in accesses]
+        await self.proxy._wait_retvals(retvals)
+
+    async def mem_read_batch(self, accesses: list) -> list:
+        """Inject the (addr, size) memory reads of accesses, all in flight at the same time."""
+        payloads = []
+        retvals = []
+        for addr, size in accesses:
+            payloads.append(asyncio.get_running_loop().create_future())
+            self.pending_reads.append(payloads[-1])
+            retvals.append(self.proxy._send('component %s mem_read 0x%x 0x%x\n' % (self.component, addr, size)))
+        await self.proxy._wait_retvals(retvals)
+        return [await payload for payload in payloads]
+
+
+class Testbench(object):
+    """Testbench class.
+
+    Use Testbench.create to create it.
+    """
+
+    def __init__(self, proxy: Proxy, component: str):
+        self.proxy = proxy
+        self.component = component
+
+    @classmethod
+    async def create(cls, proxy: Proxy, path: str = '/sys/board/testbench/testbench'):
+        return cls(proxy, await proxy._get_component(path))
+
+    def i2s_get(self, id: int = 0):
+        """Return an object which can be used to access the specified SAI."""
+        return Testbench_i2s(self.proxy, self.component, id)
+
+    def uart_get(self, id: int = 0):
+        """Return an object which can be used to access the specified uart interface."""
+        return Testbench_uart(self.proxy, self.component, id)
+
+
+def _options(**kwargs):
+    return ''.join(' %s=%s' % (name, int(value) if isinstance(value, bool) else value)
+        for name, value in kwargs.items())
+
+
+class Testbench_uart(object):
+    """Class instantiated for each manipulated uart interface. See gvsoc_control.Testbench_uart."""
+
+    def __init__(self, proxy: Proxy, testbench: str, id=0):
+        self.id = id
+        self.proxy = proxy
+        self.testbench = testbench
+        self.callback = None
+        self.pending_rx_bytes = bytearray()
+        self.rx_event = asyncio.Event()
+
+    async def open(self, baudrate: int, word_size: int=8, stop_bits: int=1, parity_mode: bool=False, ctrl_flow: bool=True,
+            is_usart: bool=False, usart_polarity: int=0, usart_phase: int=0):
+        """Open and configure the uart interface."""
+        options = _options(itf=self.id, enabled=1, baudrate=baudrate, word_size=word_size, stop_bits=stop_bits,
+            parity_mode=parity_mode, ctrl_flow=ctrl_flow, is_usart=is_usart, usart_polarity=usart_polarity,
+            usart_phase=usart_phase)
+        await self.proxy._retval('component %s uart setup %s\n' % (self.testbench, options))
+
+    async def close(self):
+        """Close the uart interface."""
+        options = _options(itf=self.id, enabled=0)
+        await self.proxy._retval('component %s uart setup %s\n' % (self.testbench, options))
+
+    async def tx(self, values: bytes):
+        """Send data to the uart."""
+        await self.proxy._retval('component %s uart tx %d %d\n' % (self.testbench, self.id, len(values)), values)
+
+    async def rx(self, size=None) -> bytes:
+        """Pop size received bytes, waiting for them if needed, or all the received bytes if size is None."""
+        if size is not None:
+            while len(self.pending_rx_bytes) < size:
+                self.rx_event.clear()
+                await self.rx_event.wait()
+        else:
+            size = len(self.pending_rx_bytes)
+
+        reply = bytes(self.pending_rx_bytes[0:size])
+        del self.pending_rx_bytes[0:size]
+        return reply
+
+    async def rx_enable(self):
+        """Enable receiving bytes from the uart."""
+        self.proxy.register_fixed_frame_callback('uart rx %d\n' % self.id, 1, self.__handle_rx)
+        await self.proxy._retval('component %s uart rx %d 1\n' % (self.testbench, self.id))
+
+    async def rx_disable(self):
+        """Disable receiving bytes from the uart."""
+        self.proxy.unregister_fixed_frame_callback('uart rx %d\n' % self.id)
+        await self.proxy._retval('component %s uart rx %d 0\n' % (self.testbench, self.id))
+
+    def __handle_rx(self, payload):
+        if self.callback is not None:
+            self.callback[0](len(payload), payload, *self.callback[1], **self.callback[2])
+        else:
+            self.pending_rx_bytes += payload
+            self.rx_event.set()
+
+    def rx_attach_callback(self, callback, *kargs, **kwargs):
+        """Call callback(size, bytes, *kargs, **kwargs) from the event loop for the received bytes."""
+        self.callback = callback, kargs, kwargs
+
+    def rx_detach_callback(self):
+        """Detach the callback attached with rx_attach_callback."""
+        self.callback = None
+
+
+class Testbench_i2s(object):
+    """Class instantiated for each manipulated SAI. See gvsoc_control.Testbench_i2s."""
+
+    def __init__(self, proxy: Proxy, testbench: str, id=0):
+        self.id = id
+        self.proxy = proxy
+        self.testbench = testbench
+
+    async def __command(self, name, options):
+        await self.proxy._retval('component %s i2s %s %s\n' % (self.testbench, name, options))
+
+    async def open(self, word_size: int = 16, sampling_freq: int = -1, nb_slots: int = 1, is_pdm: bool = False,
+            is_full_duplex: bool = False, is_ext_clk: bool = False, is_ext_ws: bool = False, is_sai0_clk: bool = False,
+            is_sai0_ws: bool = False, clk_polarity: int = 0, ws_polarity: int = 0):
+        """Open and configure SAI."""
+        await self.__command('setup', _options(itf=self.id, enabled=1, sampling_freq=sampling_freq,
+            word_size=word_size, nb_slots=nb_slots, is_pdm=is_pdm, is_full_duplex=is_full_duplex,
+            is_ext_clk=is_ext_clk, is_ext_ws=is_ext_ws, is_sai0_clk=is_sai0_clk, is_sai0_ws=is_sai0_ws,
+            clk_polarity=clk_polarity, ws_polarity=ws_polarity))
+
+    async def close(self):
+        """Close SAI."""
+        await self.__command('setup', _options(itf=self.id, enabled=0))
+
+    async def clk_start(self):
+        """Start clock."""
+        await self.__command('clk_start', '%d' % self.id)
+
+    async def clk_stop(self):
+        """Stop clock."""
+        await self.__command('clk_stop', '%d' % self.id)
+
+    async def slot_open(self, slot: int = 0, is_rx: bool = True, word_size: int = 16, is_msb: bool = True,
+            sign_extend: bool = False, left_align: bool = False):
+        """Open and configure a slot."""
+        await self.__command('slot_setup', _options(itf=self.id, slot=slot, is_rx=is_rx, enabled=1,
+            word_size=word_size, format=is_msb | (left_align << 1) | (sign_extend << 1)))
+
+    async def slot_close(self, slot: int = 0):
+        """Close a slot."""
+        await self.__command('slot_setup', _options(itf=self.id, slot=slot, enabled=0))
+
+    def __file_options(self, slot, slots, filetype, filepath, channel):
+        options = ' itf=%d' % self.id
+        for slot_id in ([slot] if slot is not None else []) + slots:
+            options += ' slot=%d' % slot_id
+        return options + _options(filetype=filetype, filepath=filepath, channel=channel)
+
+    async def slot_rx_file_reader(self, slot: int = None, slots: list = [], filetype: str = "wav", filepath: str = None, channel: int = 0):
+        """Stream the samples of a file to the SAI."""
+        await self.__command('slot_rx_file_reader', self.__file_options(slot, slots, filetype, filepath, channel))
+
+    async def slot_tx_file_dumper(self, slot: int = None, slots: list = [], filetype: str = "wav", filepath: str = None, channel: int = 0):
+        """Write the samples received from the SAI to a file."""
+        await self.__command('slot_tx_file_dumper', self.__file_options(slot, slots, filetype, filepath, channel))
+
+    async def slot_stop(self, slot: int = 0, stop_rx: bool = True, stop_tx: bool = True):
+        """Stop the streamings configured on a slot."""
+        await self.__command('slot_stop', _options(itf=self.id, slot=slot, stop_rx=stop_rx, stop_tx=stop_tx))
@@ -0,0 +1,160 @@
+#
+# Copyright (C) 2021 GreenWaves Technologies
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Measures the throughput of the GVSOC proxy client.
+
+The client is connected to a stub server which implements the router memory accesses of the
+proxy protocol on a local memory so that only the cost of the client and of the socket is
+measured. Run it with:
+
+    python3 -m gv.gvsoc_control_benchmark [--count COUNT] [--size SIZE]
+"""
+
+import argparse
+import asyncio
+import socketserver
+import threading
+import time
+
+import gv.gvsoc_control as gvsoc
+import gv.gvsoc_control_async as gvsoc_async
+
+
+class Stub_server(socketserver.ThreadingTCPServer):
+    """Local server answering the proxy commands used by Router."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, mem_size=1 << 20):
+        super(Stub_server, self).__init__(('localhost', 0), Stub_handler)
+        self.mem = bytearray(mem_size)
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class Stub_handler(socketserver.StreamRequestHandler):
+
+    component = '0x1000'
+    # Replies are buffered until the end of each command as GVSOC does
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        mem = self.server.mem
+        for line in self.rfile:
+            words = line.decode('utf-8').split()
+            if len(words) == 0:
+                continue
+
+            if words[0] == 'get_component':
+                self.wfile.write(('%s\n' % self.component).encode('ascii'))
+
+            elif words[0] == 'component' and words[2] in ['mem_read', 'mem_write']:
+                addr = int(words[3], 0)
+                size = int(words[4], 0)
+                error = 0 if addr + size <= len(mem) else 1
+                if words[2] == 'mem_write':
+                    values = self.rfile.read(size)
+                    if error == 0:
+                        mem[addr:addr + size] = values
+                else:
+                    values = mem[addr:addr + size] if error == 0 else bytes(size)
+                    self.wfile.write(('router %s read 0x%x\n' % (words[1], size)).encode('ascii'))
+                    self.wfile.write(values)
+                self.wfile.write(('err=%d\n' % error).encode('ascii'))
+
+            elif words[0] in ['run', 'step']:
+                self.wfile.write(b'running 0\n')
+
+            elif words[0] == 'quit':
+                return
+
+            self.wfile.flush()
+
+
+def bench(name, count, size, func):
+    start = time.perf_counter()
+    func()
+    report(name, count, size, time.perf_counter() - start)
+
+
+def report(name, count, size, duration):
+    print('%-20s %10.0f accesses/s %10.2f MB/s' % (name, count / duration, count * size / duration / 1e6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the throughput of the GVSOC proxy client')
+    parser.add_argument("--count", dest="count", default=10000, type=int, help="Number of accesses")
+    parser.add_argument("--size", dest="size", default=4, type=int, help="Size in bytes of each access")
+    args = parser.parse_args()
+
+    server = Stub_server()
+    proxy = gvsoc.Proxy('localhost', server.port)
+    router = gvsoc.Router(proxy)
+
+    addrs = [(i * args.size) % (len(server.mem) - args.size) for i in range(0, args.count)]
+    values = bytes(range(0, 256)) * (args.size // 256 + 1)
+    writes = [(addr, values[0:args.size]) for addr in addrs]
+    reads = [(addr, args.size) for addr in addrs]
+
+    def mem_write():
+        for addr, value in writes:
+            router.mem_write(addr, args.size, value)
+
+    def mem_read():
+        for addr, size in reads:
+            router.mem_read(addr, size)
+
+    bench('mem_write', args.count, args.size, mem_write)
+    bench('mem_read', args.count, args.size, mem_read)
+    bench('mem_write_batch', args.count, args.size, lambda: router.mem_write_batch(writes))
+    bench('mem_read_batch', args.count, args.size, lambda: router.mem_read_batch(reads))
+
+    proxy.close()
+
+    async def async_bench():
+        proxy = await gvsoc_async.Proxy.connect('localhost', server.port)
+        router = await gvsoc_async.Router.create(proxy)
+
+        start = time.perf_counter()
+        await router.mem_write_batch(writes)
+        write_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await router.mem_read_batch(reads)
+        read_duration = time.perf_counter() - start
+
+        await proxy.close()
+        return write_duration, read_duration
+
+    write_duration, read_duration = asyncio.run(async_bench())
+    report('async mem_write', args.count, args.size, write_duration)
+    report('async mem_read', args.count, args.size, read_duration)
+
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -1633,7 +1633,7 @@ void Gv_proxy::proxy_loop(int socket_fd, int reply_fd)
             {
                 int64_t timestamp = top->get_time();
                 this->top->run();
-                dprintf(this->reply_pipe, "running %ld\n", timestamp);
+                dprintf(reply_fd, "running %ld\n", timestamp);
             }
             else if (words[0] == "step")
             {
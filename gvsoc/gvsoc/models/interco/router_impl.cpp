@@ -371,7 +371,8 @@ std::string router::handle_command(FILE *req_file, FILE *reply_file, std::vector
 
         if (!is_write)
         {
-            fprintf(reply_file, "router %p read\n", this);
+            // The size is given so that the client can read the data without knowing the request
+            fprintf(reply_file, "router %p read 0x%llx\n", this, size);
             int write_size = fwrite(buffer, 1, size, reply_file);
             if (write_size != size)
             {
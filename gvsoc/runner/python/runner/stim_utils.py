@@ -23,8 +23,13 @@
 from elftools.elf.elffile import ELFFile
 import os
 import os.path
-import struct
 import argparse
+import array
+import sys
+
+
+# Typecodes of the arrays used to convert whole segments to words, by word width
+WORD_TYPECODES = { 1: 'B', 2: 'H', 4: 'I', 8: 'Q' }
 
 
 
@@ -66,24 +71,25 @@ class stim(object):
     if iter_size > size:
       iter_size = size
 
-    value = self.mem.get(str(aligned_base))
+    value = self.mem.get(aligned_base)
     if value is None:
       value = 0
 
-    value &= ~(((1<<width) - 1) << (shift*8))
+    value &= ~(((1<<(iter_size*8)) - 1) << (shift*8))
     value |= int.from_bytes(data[0:iter_size], byteorder='little') << (shift*8)
 
-    self.mem[str(aligned_base)] = value
+    self.mem[aligned_base] = value
 
     return iter_size
 
 
 
-
-
   def __add_mem(self, base, size, data, width):
 
-    while size > 0:
+    data = memoryview(data)
+
+    # Partial words are merged with what is already there, full words are converted all at once
+    while size > 0 and ((base & (width - 1)) != 0 or size < width):
 
       iter_size = self.__add_mem_word(base, size, data, width)
 
@@ -91,6 +97,21 @@ class stim(object):
       base += iter_size
       data = data[iter_size:]
 
+    nb_words = size // width
+    if nb_words > 0:
+      words = array.array(WORD_TYPECODES[width])
+      words.frombytes(data[0:nb_words*width])
+      if sys.byteorder != 'little':
+        words.byteswap()
+      self.mem.update(zip(range(base, base + nb_words*width, width), words))
+
+      size -= nb_words*width
+      base += nb_words*width
+      data = data[nb_words*width:]
+
+    if size > 0:
+      self.__add_mem_word(base, size, data, width)
+
 
   def __gen_stim_slm(self, filename, width):
 
@@ -101,13 +122,13 @@ class stim(object):
     except:
       pass
 
+    line_format = '%%X_%%0%dX\n' % (width*2)
     with open(filename, 'w') as file:
-      for key in sorted(self.mem.keys()):
-        file.write('%X_%0*X\n' % (int(key), width*2, self.mem.get(key)))
+      file.write(''.join([line_format % (addr, self.mem[addr]) for addr in sorted(self.mem.keys())]))
 
-  def __parse_binaries(self, width):
+  def __get_segments(self):
 
-    self.mem = {}
+    segments = []
 
     for binary in self.binaries:
 
@@ -134,18 +155,27 @@ class stim(object):
 
                       self.dump('  Handling section (base: 0x%x, size: 0x%x)' % (addr, size))
 
-                      self.__add_mem(addr, size, data, width)
+                      segments.append([addr, data])
 
                       if segment['p_filesz'] < segment['p_memsz']:
                           addr = segment['p_paddr'] + segment['p_filesz']
                           size = segment['p_memsz'] - segment['p_filesz']
                           self.dump('  Init section to 0 (base: 0x%x, size: 0x%x)' % (addr, size))
-                          self.__add_mem(addr, size, [0] * size, width)
+                          segments.append([addr, bytes(size)])
 
                     else:
 
                       self.dump('  Bypassing section (base: 0x%x, size: 0x%x)' % (addr, size))
 
+    return segments
+
+  def __parse_binaries(self, width):
+
+    self.mem = {}
+
+    for addr, data in self.__get_segments():
+      self.__add_mem(addr, len(data), data, width)
+
 
 
 
@@ -158,24 +188,24 @@ class stim(object):
 
   def gen_stim_bin(self, stim_file):
 
-    self.__parse_binaries(1)
+    segments = [segment for segment in self.__get_segments() if len(segment[1]) != 0]
 
     try:
       os.makedirs(os.path.dirname(stim_file))
     except:
       pass
 
+    # The image goes from the first to the last loaded byte, holes are filled with zeros
+    # and later segments overwrite earlier ones.
+    image = bytearray()
+    if len(segments) != 0:
+      start = min([addr for addr, data in segments])
+      image = bytearray(max([addr + len(data) for addr, data in segments]) - start)
+      for addr, data in segments:
+        image[addr - start:addr - start + len(data)] = data
+
     with open(stim_file, 'wb') as file:
-      prev_addr = None
-      for key in sorted(self.mem.keys()):
-        addr = int(key)
-        if prev_addr is not None:
-          while prev_addr != addr - 1:
-            file.write(struct.pack('B', 0))
-            prev_addr += 1
-
-        prev_addr = addr
-        file.write(struct.pack('B', int(self.mem.get(key))))
+      file.write(image)
 
 
 
@@ -0,0 +1,474 @@
+#!/usr/bin/python
+# Bit exact numpy emulation of the FIX16 MFCC built by MFCC_Generator (DSP_Generators.c)
+# with the LUTs generated by GenMFCCLUT.py. Every stage processes all the frames of all
+# the clips at once so whole datasets can be preprocessed with the on device features.
+import json
+import argparse
+import numpy as np
+from SetupLUT import SetupTwiddlesLUT, SetupSwapTable, SetupSwapTableR4, SetupTwiddlesRFFT, SetupDCTTable, SetupLiftCoeff, MFCC_COEFF_DYN
+
+QNN = 15
+LN_2_1F15 = 0x000058B9
+LN_10_INV_Q10 = 0x1bd
+LOG10_2 = 0x2688
+SQRT_2_Q15 = 0xb504
+FFT2_SCALEDOWN = 1
+FFT4_SCALEDOWN = 2
+
+# math_funcs.c tables
+SqrtCoeffTable = [
+	0x00001A91, 0x0000BA3A, 0xFFFF53DA, 0x00008DAC,
+	0xFFFFBB54, 0x00000E5A
+]
+Sqrt2Powers = np.array([
+	0x000000B5, 0x00000100, 0x0000016A, 0x00000200,
+	0x000002D4, 0x00000400, 0x000005A8, 0x00000800,
+	0x00000B50, 0x00001000, 0x000016A1, 0x00002000,
+	0x00002D41, 0x00004000, 0x00005A82, 0x00008000,
+	0x0000B505, 0x00010000, 0x00016A0A, 0x00020000,
+	0x0002D414, 0x00040000, 0x0005A828, 0x00080000,
+	0x000B504F, 0x00100000, 0x0016A09E, 0x00200000,
+	0x002D413D, 0x00400000, 0x005A827A, 0x00800000
+], dtype=np.int64)
+LognCoeffTable = [
+	0x00007FE3, 0xFFFFC149, 0x00002491, 0xFFFFEEF8,
+	0x00000404
+]
+
+M32 = 0xFFFFFFFF
+
+# All the emulation is done on int64 arrays, the helpers below give back the C
+# behaviour of the narrower types used on chip
+
+def wrap16(x):
+	return np.asarray(x).astype(np.int16).astype(np.int64)
+
+def wrap32(x):
+	return np.asarray(x).astype(np.int32).astype(np.int64)
+
+def bit_length(x):
+	# exact for x < 2**53
+	return np.frexp(np.asarray(x, dtype=np.float64))[1].astype(np.int64)
+
+def gap_fl1(x):
+	# p.fl1 gives 32 when no bit is set
+	x = np.asarray(x, dtype=np.int64) & M32
+	return np.where(x == 0, 32, bit_length(x) - 1)
+
+def gap_clb(x):
+	x = wrap32(np.asarray(x, dtype=np.int64) & M32)
+	return 31 - bit_length(np.where(x < 0, ~x, x))
+
+def gap_mulsRN(x, y, n):
+	return (wrap16(x) * wrap16(y) + (1 << (n - 1))) >> n
+
+def gap_cplxmuls(xr, xi, yr, yi):
+	# one operand is always a twiddle, never -32768, so the sums of products fit in 32 bits
+	xr, xi, yr, yi = [np.asarray(v).astype(np.int32) for v in (xr, xi, yr, yi)]
+	return ((xr * yr - xi * yi) >> 15).astype(np.int16), ((xr * yi + xi * yr) >> 15).astype(np.int16)
+
+def gap_clip(x, precision):
+	return np.clip(x, -(1 << precision), (1 << precision) - 1)
+
+def usqrt_17_15(x):
+	x = np.asarray(x, dtype=np.int64) & M32
+	exponent = gap_clb(x)
+	y = ((x << exponent) & M32) >> 16
+	z = y
+	result = np.zeros_like(x)
+	for coeff in SqrtCoeffTable[1:]:
+		result = (result + z * coeff) & M32
+		z = ((z * y) & M32) >> 15
+	result = (result >> 15) + SqrtCoeffTable[0]
+	pre_shift = np.where(exponent < 12, 12 - exponent, 0)
+	scaled = (((result >> pre_shift) * Sqrt2Powers[31 - exponent]) & M32) >> (15 - pre_shift)
+	result = np.where(exponent != 16, scaled, result)
+	return np.where(x == 0, 0, result)
+
+def ulogn_17_15(x):
+	# result is the signed int the kernels assign it to
+	x = np.asarray(x, dtype=np.int64) & M32
+	exponent = gap_clb(x)
+	y = wrap32((((x << exponent) & M32) >> 15) - 0x8000)
+	z = wrap32(y * y) >> 15
+	result = wrap32(wrap32(LognCoeffTable[0]) * y)
+	for coeff in LognCoeffTable[1:]:
+		result = wrap32(result + z * wrap32(coeff))
+		z = wrap32(z * y) >> 15
+	result = result >> 15
+	result = np.where(exponent != 15, wrap32(result + LN_2_1F15 * (15 - exponent)), result)
+	return np.where(x == 0, -0x80000000, result)
+
+def FFTUsesRadix4(n_fft):
+	# RFFT_DIF_Par_Fix16 choice of complex fft
+	return (n_fft >> 1) in (256, 1024)
+
+def SetupMFCCLUTs(frame_size, n_fft, sample_rate, mfcc_bank_cnt, fmin=20.0, fmax=4000.0, win_func="hanning",
+				  n_dct=0, dct_type=2, lifter_coeff=0, use_tf_mfcc=False, use_librosa=False, librosa_mel_norm="slaney"):
+	# Same tables GenMFCCLUT.py writes for dtype fix16, the fft ones being the set
+	# RFFT_DIF_Par_Fix16 runs with (radix 4 only for 256 and 1024 points)
+	n_fft_int = n_fft // 2
+	luts = {}
+	luts["WindowLUT"] = (getattr(np, win_func)(frame_size) * 2**(15)).astype(np.int16)
+
+	Twiddles_cos, Twiddles_sin = SetupTwiddlesLUT(n_fft_int, dtype="int")
+	if FFTUsesRadix4(n_fft):
+		NTwiddles = int(3/4*n_fft_int)
+		luts["SwapTable"] = SetupSwapTableR4(n_fft_int).astype(np.int16)
+	else:
+		NTwiddles = int(n_fft_int//2)
+		luts["SwapTable"] = SetupSwapTable(n_fft_int).astype(np.int16)
+	luts["TwiddlesLUT"] = np.stack([Twiddles_cos[:NTwiddles], Twiddles_sin[:NTwiddles]], axis=-1).astype(np.int16)
+	RFFTTwiddles_real, RFFTTwiddles_imag = SetupTwiddlesRFFT(n_fft, dtype="int")
+	luts["RFFTTwiddlesLUT"] = np.stack([RFFTTwiddles_real, RFFTTwiddles_imag], axis=-1).astype(np.int16)
+
+	if n_dct > 0:
+		luts["DCT_Coeff"] = SetupDCTTable(n_dct, dct_type, "int")
+		if lifter_coeff > 0:
+			luts["Lift_Coeff"] = SetupLiftCoeff(lifter_coeff, n_dct).astype(np.int16)
+
+	if use_tf_mfcc:
+		from SetupLUT import GenMFCC_FB_tf
+		filters, MFCC_Coeff, HeadCoeff = GenMFCC_FB_tf(n_fft, mfcc_bank_cnt, Fmin=fmin, Fmax=fmax, sample_rate=sample_rate, dtype="int")
+	elif use_librosa:
+		from SetupLUT import GenMFCC_FB_librosa
+		filters, MFCC_Coeff, HeadCoeff = GenMFCC_FB_librosa(n_fft, mfcc_bank_cnt, Fmin=fmin, Fmax=fmax, sample_rate=sample_rate, norm=librosa_mel_norm, dtype="int")
+	else:
+		from SetupLUT import GenMFCC_FB
+		filters, MFCC_Coeff, HeadCoeff = GenMFCC_FB(n_fft, mfcc_bank_cnt, Fmin=fmin, Fmax=fmax, sample_rate=sample_rate, dtype="int")
+
+	FilterBank = []
+	HeadCoeff = 0
+	for filt in filters:
+		if np.all(filt == 0):
+			Start, Items = 0, 0
+		else:
+			Start = np.argmax(filt!=0)
+			Stop = len(filt) - np.argmax(filt[::-1]!=0) - 1
+			Items = Stop - Start + 1
+		FilterBank.append((Start, Items, HeadCoeff))
+		HeadCoeff += Items
+	luts["MFCC_FilterBank"] = np.array(FilterBank, dtype=np.int16).reshape(-1, 3)
+	# Add a last 0 coeff
+	luts["MFCC_Coeffs"] = np.concatenate([np.array(MFCC_Coeff).astype(np.int16).flatten(), [0]]).astype(np.int16)
+	return luts
+
+class MFCC_Fix16():
+	"""Emulates MFCC_Generator(..., DataType=FIX16, ...) kernels on frames of int16 samples.
+
+	log_type is the generator LogType: 0 melspectrogram (uint32), 1 natural log, 2 10log10.
+	norm is the Norm argument of the generated kernel. The mel spectrogram (log_type 0) and
+	the mel bands without dct (n_dct 0) have mfcc_bank_cnt values per frame, with dct the first
+	mfcc_bank_cnt coefficients are computed by MFCC_ComputeDCT_II_Fix16."""
+
+	def __init__(self, frame_size, frame_step, n_fft, luts, preemp_factor=0.0, no_window=False,
+				 mag_squared=True, log_type=1, norm=0, lifter=False):
+		if bin(n_fft).count("1") != 1:
+			raise ValueError("Incorrect FFTDim: %d, it has to be a a power of 2" % n_fft)
+		if n_fft < frame_size:
+			raise ValueError("Incorrect FFTDim: %d, it has to be a greater than FrameSize %d" % (n_fft, frame_size))
+		self.frame_size = frame_size
+		self.frame_step = frame_step
+		self.n_fft = n_fft
+		self.no_window = no_window
+		self.mag_squared = mag_squared
+		self.log_type = log_type
+		self.norm = norm
+
+		# Q formats as set by MFCC_Generator
+		use_radix4 = ((n_fft >> 1) & -(n_fft >> 1)).bit_length() % 2 == 1 and (n_fft >> 1) > 64
+		log2_nfft = n_fft.bit_length() - 1
+		self.qin_fft = 12 if use_radix4 else 13
+		self.q_out_fft = 15 - (log2_nfft - 3) + (1 if use_radix4 else 0)
+		self.preemp_factor = int(np.float32(preemp_factor) * np.float32((1 << 15) - 1))
+
+		self.window = luts["WindowLUT"].astype(np.int64)[:frame_size]
+		twiddles = luts["TwiddlesLUT"].astype(np.int32).reshape(-1, 2)
+		self.twiddles = twiddles[:, 0], twiddles[:, 1]
+		rtwiddles = luts["RFFTTwiddlesLUT"].astype(np.int32).reshape(-1, 2)
+		self.rtwiddles = rtwiddles[:, 0], rtwiddles[:, 1]
+		# SwapSamples_Par as a gather
+		swap_table = luts["SwapTable"].astype(np.int64)
+		self.swap = np.arange(n_fft >> 1)
+		for i, swap_index in enumerate(swap_table[:n_fft >> 1]):
+			if i < swap_index:
+				self.swap[[i, swap_index]] = self.swap[[swap_index, i]]
+
+		self.filterbank = luts["MFCC_FilterBank"].astype(np.int64).reshape(-1, 3)
+		self.n_mels = self.filterbank.shape[0]
+		self.mel_coeffs = luts["MFCC_Coeffs"].astype(np.int64) & 0xFFFF
+		self.dct_coeff = luts.get("DCT_Coeff")
+		if self.dct_coeff is not None and log_type != 0:
+			self.dct_coeff = self.dct_coeff.astype(np.int64).reshape(-1)
+			self.n_dct = int(round(np.sqrt(self.dct_coeff.size)))
+			if self.n_mels > self.n_dct:
+				raise ValueError("mfcc_bank_cnt must be <= n_dct")
+		else:
+			self.dct_coeff = None
+			self.n_dct = 0
+		self.lift_coeff = luts["Lift_Coeff"].astype(np.int64) if lifter and self.n_dct else None
+
+	def frames(self, signals):
+		if signals.shape[-1] < self.frame_size:
+			raise ValueError("signals of %d samples are shorter than frame_size %d" % (signals.shape[-1], self.frame_size))
+		n_frames = 1 + (signals.shape[-1] - self.frame_size) // self.frame_step
+		idx = self.frame_step * np.arange(n_frames)[:, np.newaxis] + np.arange(self.frame_size)
+		return signals[..., idx]
+
+	def preemphasis(self, frames):
+		"""PreEmphasis, returns the frames scaled to QIn_FFT and the shift applied"""
+		frames = frames.astype(np.int64)
+		# Prev is 0 at each frame
+		maxin = np.abs(frames).max(axis=-1)
+		shift = self.qin_fft - np.where(maxin != 0, gap_fl1(maxin), 0)
+		left = np.maximum(shift, 0)[:, np.newaxis]
+		right = np.maximum(-shift, 0)[:, np.newaxis]
+		S = np.where(shift[:, np.newaxis] > 0, wrap16(frames << left), frames >> right)
+		Sprev = np.concatenate([np.zeros_like(S[:, :1]), S[:, :-1]], axis=-1)
+		return wrap16(S - gap_mulsRN(self.preemp_factor, Sprev, 15)), shift
+
+	def windowing(self, frames):
+		"""WindowingReal2Real_Fix16 or ZeroPad_Fix16"""
+		padded = np.zeros((frames.shape[0], self.n_fft), dtype=np.int64)
+		padded[:, :self.frame_size] = frames if self.no_window else wrap16(gap_mulsRN(frames, self.window, 15))
+		return padded
+
+	def _radix2_fft(self, re, im):
+		n = re.shape[-1]
+		tw_re, tw_im = self.twiddles
+		iM = n >> 1
+		while iM:
+			# butterflies of the first log2(n)-3 layers are scaled down
+			scale = FFT2_SCALEDOWN if iM > 4 else 0
+			shape = (re.shape[0], n // (2*iM), 2, iM)
+			x = re.reshape(shape), im.reshape(shape)
+			y = np.empty(shape, dtype=np.int16), np.empty(shape, dtype=np.int16)
+			for p in range(2):
+				y[p][:, :, 0] = (x[p][:, :, 0] + x[p][:, :, 1]) >> scale
+				y[p][:, :, 1] = x[p][:, :, 0] - x[p][:, :, 1]
+			if iM > 1:
+				W = np.arange(iM) * (n // (2*iM))
+				Br, Bi = gap_cplxmuls(y[0][:, :, 1], y[1][:, :, 1], tw_re[W], tw_im[W])
+				y[0][:, :, 1], y[1][:, :, 1] = Br >> scale, Bi >> scale
+			re, im = y[0].reshape(shape[0], n), y[1].reshape(shape[0], n)
+			iM >>= 1
+		return re, im
+
+	def _radix4_fft(self, re, im):
+		n = re.shape[-1]
+		tw_re, tw_im = self.twiddles
+		iM = n >> 2
+		while iM:
+			# butterflies of the first log4(n)-2 layers are scaled down
+			scale = FFT4_SCALEDOWN if iM > 4 else 0
+			shape = (re.shape[0], n // (4*iM), 4, iM)
+			x = re.reshape(shape), im.reshape(shape)
+			y = np.empty(shape, dtype=np.int16), np.empty(shape, dtype=np.int16)
+			# gap_sub2rotmj(B, D)
+			R = x[1][:, :, 1] - x[1][:, :, 3], x[0][:, :, 3] - x[0][:, :, 1]
+			for p in range(2):
+				A, B, C, D = [x[p][:, :, k] for k in range(4)]
+				ACp, ACm, BDp = A + C, A - C, B + D
+				y[p][:, :, 0] = (ACp + BDp) >> scale
+				y[p][:, :, 1] = ACm + R[p]
+				y[p][:, :, 2] = ACp - BDp
+				y[p][:, :, 3] = ACm - R[p]
+			if iM > 1:
+				iQ = np.arange(iM) * (n // (4*iM))
+				for k in range(1, 4):
+					Xr, Xi = gap_cplxmuls(y[0][:, :, k], y[1][:, :, k], tw_re[k*iQ], tw_im[k*iQ])
+					y[0][:, :, k], y[1][:, :, k] = Xr >> scale, Xi >> scale
+			re, im = y[0].reshape(shape[0], n), y[1].reshape(shape[0], n)
+			iM >>= 2
+		return re, im
+
+	def rfft(self, frames):
+		"""RFFT_DIF_Par_Fix16, returns the n_fft/2+1 bins"""
+		# the complex data is kept in int16 so that numpy wraps the sums as the v2s operations do
+		re, im = frames[:, 0::2].astype(np.int16), frames[:, 1::2].astype(np.int16)
+		n = re.shape[-1]
+		if FFTUsesRadix4(self.n_fft):
+			re, im = self._radix4_fft(re, im)
+		else:
+			re, im = self._radix2_fft(re, im)
+		re, im = re[:, self.swap], im[:, self.swap]
+
+		out_re = np.zeros((re.shape[0], n + 1), dtype=np.int16)
+		out_im = np.zeros((re.shape[0], n + 1), dtype=np.int16)
+		t1a = (re[:, 0] >> 2) + (re[:, 0] >> 2)
+		t1b = (im[:, 0] >> 2) + (im[:, 0] >> 2)
+		out_re[:, 0], out_im[:, 0] = t1a + t1b, t1a - t1b
+
+		xAr, xAi = re[:, 1:n], im[:, 1:n]
+		xBr, xBi = re[:, n-1:0:-1], -im[:, n-1:0:-1]
+		t1r, t1i = (xBr - xAr) >> 2, (xBi - xAi) >> 2
+		t2r, t2i = (xAr + xBr) >> 2, (xAi + xBi) >> 2
+		tw_re, tw_im = self.rtwiddles[0][1:n], self.rtwiddles[1][1:n]
+		Xr, Xi = gap_cplxmuls(tw_re, tw_im, t1r, t1i)
+		out_re[:, 1:n], out_im[:, 1:n] = Xr + t2r, Xi + t2i
+		# the n_fft/2 bin is never written by the kernel, it is left to 0 here
+		return out_re, out_im
+
+	def spectrum(self, re, im, shift):
+		"""CmplxMagSquared_Fix16 or CmplxMag_Fix32 (uint32 values)"""
+		re, im = re.astype(np.int64), im.astype(np.int64)
+		power = (re * re + im * im) & M32
+		if self.mag_squared:
+			return power
+		QP = (2 * (self.q_out_fft + shift) - 15)[:, np.newaxis]
+		Mul = np.where(QP % 2 != 0, SQRT_2_Q15 >> 5, 1 << 10)
+		sqrt_p = usqrt_17_15(power)
+		pos = (((sqrt_p >> np.maximum(QP // 2, 0)) * Mul) & M32) >> 11
+		neg = ((((sqrt_p << np.maximum(-QP // 2, 0)) & M32) * Mul) & M32) >> 10
+		return np.where(QP > 0, pos, neg)
+
+	def mel_filterbank(self, power):
+		"""MelFilterBank_Fix32, returns the mel spectrum (uint32 values) and shift_buff"""
+		mel = np.zeros((power.shape[0], self.n_mels), dtype=np.int64)
+		shift_buff = np.zeros((power.shape[0], self.n_mels), dtype=np.int64)
+		for i, (start, items, base) in enumerate(self.filterbank):
+			bins = power[:, start:start+items]
+			maxin = bins.max(axis=-1) if items > 0 else np.zeros(power.shape[0], dtype=np.int64)
+			shift0 = np.where(maxin != 0, gap_fl1(maxin), 0)
+			# an empty filter gets fl1(0) = 32 as on chip
+			shift = np.maximum(shift0 + MFCC_COEFF_DYN + gap_fl1(items) - 31, 0)
+			coeffs = self.mel_coeffs[base:base+items]
+			acc = ((bins >> shift[:, np.newaxis]) * coeffs).sum(axis=-1) & M32
+			mel[:, i] = np.where(acc != 0, acc, 1)
+			shift_buff[:, i] = shift
+		return mel, shift_buff
+
+	def melspect(self, mel, shift_buff):
+		"""norm_clip_32_melspect"""
+		norm = 30 - shift_buff - 16
+		return np.where(norm < 32, mel >> (norm & 31), 0)
+
+	def log(self, mel, shift_buff, shift):
+		"""MFCC_ComputeLog_Fix32 or MFCC_ComputeDB_Fix32"""
+		shift = shift[:, np.newaxis]
+		log = ulogn_17_15(mel)
+		if self.log_type == 2:
+			if self.mag_squared:
+				Qformat = MFCC_COEFF_DYN - 2 - shift_buff + 2 * shift
+			else:
+				Qformat = 30 - shift_buff
+			out = 10 * ((wrap32(log * LN_10_INV_Q10) >> 10) - (Qformat - QNN) * LOG10_2)
+		else:
+			if self.mag_squared:
+				Qformat = MFCC_COEFF_DYN - shift_buff + 2 * self.q_out_fft + 2 * shift
+			else:
+				Qformat = 30 - shift_buff
+			out = log - (Qformat - QNN) * LN_2_1F15
+		return gap_clip(wrap32(out) >> self.norm, 15)
+
+	def dct(self, log, power):
+		"""MFCC_ComputeDCT_II_Fix16"""
+		# the inputs past the mel bands are what is left of the power spectrum in the buffer
+		inputs = np.ascontiguousarray(power.astype(np.uint32)).view(np.int16)[:, :self.n_dct].astype(np.int64)
+		inputs[:, :self.n_mels] = log
+		dct_table = self.dct_coeff.reshape(self.n_dct, self.n_dct)[:self.n_mels]
+		acc = wrap32(inputs @ dct_table.T)
+		return gap_clip(acc >> 14, 15)
+
+	def lifter(self, feat):
+		"""MFCC_Lifter_Fix16"""
+		return wrap16(gap_mulsRN(feat, self.lift_coeff[:feat.shape[-1]], 11))
+
+	def run_frames(self, frames):
+		"""Computes the features of frames of shape (n, frame_size)"""
+		x, shift = self.preemphasis(frames)
+		x = self.windowing(x)
+		re, im = self.rfft(x)
+		power = self.spectrum(re, im, shift)
+		mel, shift_buff = self.mel_filterbank(power)
+		if self.log_type == 0:
+			return self.melspect(mel, shift_buff).astype(np.uint32)
+		feat = self.log(mel, shift_buff, shift)
+		if self.dct_coeff is not None:
+			feat = self.dct(feat, power)
+			if self.lift_coeff is not None:
+				feat = self.lifter(feat)
+		return feat.astype(np.int16)
+
+	def __call__(self, signals, batch_size=256):
+		"""Computes the features of int16 signals of shape (..., n_samples)
+
+		Returns an array of shape (..., n_frames, n_features). The signals are processed
+		batch_size rows at a time to bound the memory used."""
+		signals = np.asarray(signals)
+		if not np.issubdtype(signals.dtype, np.integer):
+			raise ValueError("signals must be int16 samples")
+		lead_shape = signals.shape[:-1]
+		signals = signals.astype(np.int16).reshape(-1, signals.shape[-1])
+		outs = []
+		for first in range(0, max(signals.shape[0], 1), batch_size):
+			frames = self.frames(signals[first:first+batch_size])
+			n_frames = frames.shape[1]
+			feat = self.run_frames(frames.reshape(-1, self.frame_size))
+			outs.append(feat.reshape(-1, n_frames, feat.shape[-1]))
+		out = np.concatenate(outs)
+		return out.reshape(lead_shape + out.shape[1:])
+
+def create_parser():
+	# create the top-level parser
+	parser = argparse.ArgumentParser(prog='mfcc_emulator')
+
+	parser.add_argument('--params_json', required=True,
+						help="Path to the .json file of parameters used by GenMFCCLUT.py")
+	parser.add_argument('--input', required=True,
+						help="path to a .npy file of int16 clips (..., n_samples)")
+	parser.add_argument('--output', required=True,
+						help="path to the .npy file where to write the features")
+	parser.add_argument('--preemp_factor', default=0.0, type=float,
+						help="PreempFactor given to MFCC_Generator")
+	parser.add_argument('--no_window', action='store_true',
+						help="NoWindow given to MFCC_Generator")
+	parser.add_argument('--use_abs', action='store_true',
+						help="use the magnitude instead of the power spectrum (MagSquared=0)")
+	parser.add_argument('--log_type', default=1, type=int,
+						help="LogType given to MFCC_Generator (0: melspectrogram, 1: log, 2: 10log10)")
+	parser.add_argument('--norm', default=0, type=int,
+						help="Norm argument of the generated kernel")
+	parser.add_argument('--batch_size', default=256, type=int,
+						help="number of clips processed at once")
+	return parser
+
+def main():
+	parser = create_parser()
+	args = parser.parse_args()
+
+	with open(args.params_json, "r") as f:
+		models_params = json.load(f)
+	if models_params.get("dtype", "fix16") != "fix16":
+		parser.error("only the fix16 MFCC is emulated, %s has dtype %s" % (args.params_json, models_params["dtype"]))
+
+	luts = SetupMFCCLUTs(
+		models_params["frame_size"],
+		models_params["n_fft"],
+		models_params["sample_rate"],
+		models_params.get("mfcc_bank_cnt", 40),
+		fmin=models_params.get("fmin", 20.0),
+		fmax=models_params.get("fmax", 4000.0),
+		win_func=models_params.get("win_func", "hanning"),
+		n_dct=models_params.get("n_dct", 0),
+		dct_type=models_params.get("dct_type", 2),
+		lifter_coeff=models_params.get("lifter_coeff", 0),
+		use_tf_mfcc=models_params.get("use_tf_mfcc", False),
+		use_librosa=models_params.get("use_librosa", False),
+		librosa_mel_norm=models_params.get("librosa_mel_norm", "slaney"))
+	mfcc = MFCC_Fix16(
+		models_params["frame_size"],
+		models_params["frame_step"],
+		models_params["n_fft"],
+		luts,
+		preemp_factor=args.preemp_factor,
+		no_window=args.no_window,
+		mag_squared=not args.use_abs,
+		log_type=args.log_type,
+		norm=args.norm,
+		lifter=models_params.get("lifter_coeff", 0) > 0)
+
+	np.save(args.output, mfcc(np.load(args.input), batch_size=args.batch_size))
+
+if __name__ == "__main__":
+	main()
@@ -19,7 +19,7 @@ def SetupTwiddlesLUT(Nfft, Inverse=False, dtype="int"):
 		Twiddles_real = np.cos(-Phi)
 		Twiddles_imag = np.sin(-Phi)
 	if dtype == "int":
-		return np.round(Twiddles_real * ((1<<FFT_TWIDDLE_DYN)-1)).astype(np.int), np.round(Twiddles_imag * ((1<<FFT_TWIDDLE_DYN)-1)).astype(np.int)
+		return np.round(Twiddles_real * ((1<<FFT_TWIDDLE_DYN)-1)).astype(int), np.round(Twiddles_imag * ((1<<FFT_TWIDDLE_DYN)-1)).astype(int)
 	elif dtype == "float16":
 		return Twiddles_real.astype(np.float16), Twiddles_imag.astype(np.float16)
 	else:
@@ -60,7 +60,7 @@ def SetupTwiddlesRFFT(Nfft, Inverse=False, dtype="int"):
 	Twiddles_real = np.sin(Phi)
 	Twiddles_imag = np.cos(Phi)
 	if dtype == "int":
-		return np.round(Twiddles_real * ((1<<FFT_TWIDDLE_DYN)-1)).astype(np.int), np.round(Twiddles_imag * ((1<<FFT_TWIDDLE_DYN)-1)).astype(np.int)
+		return np.round(Twiddles_real * ((1<<FFT_TWIDDLE_DYN)-1)).astype(int), np.round(Twiddles_imag * ((1<<FFT_TWIDDLE_DYN)-1)).astype(int)
 	elif dtype == "float16":
 		return Twiddles_real.astype(np.float16), Twiddles_imag.astype(np.float16)
 	else:
@@ -187,9 +187,9 @@ def GenMFCC_FB(Nfft, Nbanks, sample_rate=16000, Fmin=20, Fmax=4000, dtype='int')
 	filters = np.zeros((Nbanks, Nfft // 2))
 	for i in range(1, Nbanks+1):
 		for k in range(f[i-1], f[i]):
-			filters[i-1][k] = np.float(k-f[i-1])/(f[i]-f[i-1])
+			filters[i-1][k] = float(k-f[i-1])/(f[i]-f[i-1])
 		for k in range(f[i], f[i+1]):
-			filters[i-1][k] = np.float(f[i+1]-k)/(f[i+1]-f[i])
+			filters[i-1][k] = float(f[i+1]-k)/(f[i+1]-f[i])
 
 	HeadCoeff = 0
 	MFCC_Coeff = []
@@ -22,6 +22,7 @@ from elftools.elf.elffile import ELFFile
 import struct
 import subprocess
 import hashlib
+import zlib
 
 from errors import FatalError
 import traces
@@ -51,8 +52,7 @@ class BlockBuffer(bytearray):
         self += struct.pack('Q', value)
     
     def pad(self, padsize):
-        for i in range(0, padsize):
-            self.appendByte(255)
+        self += b'\xff' * padsize
     
     def padToOffset(self, offset):
         if (offset < len(self)):
@@ -196,18 +196,9 @@ class SSBL(Binary):
         super().__init__(romBlockSize, encrypt=encrypt, aesKey=aesKey, aesIv=aesIv, *args, **kargs)
     
     def get_crc(self, buff):
-        crc = 0xffffffff
-        for data in buff:
-            crc = crc ^ data
-            for i in range(7, -1, -1):
-                if crc & 1 == 1:
-                    mask = 0xffffffff
-                else:
-                    mask = 0
-                crc2 = crc >> 1
-                crc = (crc >> 1) ^ (0xEDB88320 & mask)
-        
-        return (crc ^ 0xffffffff)
+        # Standard CRC-32 (reflected 0xEDB88320 polynomial, initial value and final xor
+        # of 0xffffffff) which zlib computes with a lookup table
+        return zlib.crc32(buff) & 0xffffffff
     
     def __append(self, buffer, padToOffset = None):
         if self.encrypt == True:
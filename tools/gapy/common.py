@@ -20,6 +20,8 @@
 
 import os
 import sys
+import json
+import tempfile
 
 import argparse
 import traces
@@ -151,7 +153,7 @@ def importConfig(parser):
         if os.environ.get('GAPY_CONFIGS_INI') is not None:
             ini_configs += os.environ.get('GAPY_CONFIGS_INI').split()
 
-        return js.import_config_from_file(jsonPath, find = True, interpret = True, paths = gapyJsonPath, ini_configs=ini_configs, config_items=args.config_items)
+        return js.import_config_from_file(jsonPath, find = True, interpret = True, paths = gapyJsonPath, ini_configs=ini_configs, config_items=args.config_items, cache = True)
     else:
         return None
 
@@ -167,6 +169,56 @@ def argToInt(value):
         return int(value, 0)
 
 
+def fileStamp(path):
+    """ Return what is used to detect that a file has changed without reading it.
+    """
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def manifestPath(outputPath):
+    return outputPath + '.manifest'
+
+
+def readManifest(outputPath):
+    """ Return the manifest saved next to outputPath or None if there is none or it can't be read.
+    """
+    try:
+        with open(manifestPath(outputPath), 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def writeManifest(outputPath, manifest):
+    dirPath = os.path.dirname(os.path.abspath(outputPath))
+    fd, tmpPath = tempfile.mkstemp(suffix = '.tmp', dir = dirPath)
+    with os.fdopen(fd, 'w') as file:
+        json.dump(manifest, file, indent = 2)
+    os.replace(tmpPath, manifestPath(outputPath))
+
+
+def removeManifest(outputPath):
+    try:
+        os.remove(manifestPath(outputPath))
+    except FileNotFoundError:
+        pass
+
+
+def isOutputUpToDate(outputPath, inputs):
+    """ Return True if outputPath was generated from inputs by a previous call to saveOutputInputs and
+    has not been modified since.
+    """
+    manifest = readManifest(outputPath)
+    if manifest is None or manifest.get('inputs') != inputs or not os.path.exists(outputPath):
+        return False
+    return manifest.get('output') == fileStamp(outputPath)
+
+
+def saveOutputInputs(outputPath, inputs):
+    writeManifest(outputPath, {'inputs': inputs, 'output': fileStamp(outputPath)})
+
+
 def hexify(s, uppercase = True):
     format_str = '%02X' if uppercase else '%02x'
     return ''.join(format_str % c for c in s)
@@ -26,6 +26,7 @@ import os
 import argcomplete
 import argparse
 import struct
+import hashlib
 
 from errors import FatalError, NotSupportedError
 import common
@@ -38,6 +39,9 @@ import traces
 
 __version__ = "0.1"
 
+# Bump if the content of the image manifest changes so that images are rebuilt
+MANIFEST_VERSION = 1
+
 PYTHON2 = sys.version_info[0] < 3  # True if on pre-Python 3
 if PYTHON2:
     print("Fatal error: gen_flash_image needs to be run with python version 3")
@@ -59,6 +63,75 @@ def dumpLongToSlm(file, addr, value):
 def dumpLongLongToSlm(file, addr, value):
     file.write("@%08X %032X\n" % (addr, value))
 
+HEX_DIGITS = b"0123456789ABCDEF"
+
+def hexDigitColumn(start, count, shift):
+    """Returns the hex digit at bit position shift of each of the count numbers from start"""
+    period = 1 << shift
+    if period >= 256:
+        # long runs of the same digit
+        runs = []
+        value = start
+        while value < start + count:
+            runEnd = min((value // period + 1) * period, start + count)
+            runs.append(bytes([HEX_DIGITS[(value >> shift) & 0xF]]) * (runEnd - value))
+            value = runEnd
+        return b"".join(runs)
+    cycle = b"".join(bytes([digit]) * period for digit in HEX_DIGITS)
+    offset = start % len(cycle)
+    return (cycle * ((offset + count) // len(cycle) + 1))[offset:offset + count]
+
+def dumpBufferToSlm(file, buff, width, chunkWords=0x10000):
+    """Writes buff as little endian words of width bytes, one per line, as the
+    dump*ToSlm functions do for one word. Any incomplete last word is ignored."""
+    # Every line is "@AAAAAAAA DD..DD\n" so each column of the output is filled at once
+    lineLen = 1 + 8 + 1 + width * 2 + 1
+    nbWords = len(buff) // width
+    for start in range(0, nbWords, chunkWords):
+        count = min(chunkWords, nbWords - start)
+        data = bytes(buff[start * width:(start + count) * width])
+        lines = bytearray(b" " * (lineLen * count))
+        lines[0::lineLen] = b"@" * count
+        lines[lineLen - 1::lineLen] = b"\n" * count
+        for digit in range(8):
+            lines[1 + digit::lineLen] = hexDigitColumn(start, count, (7 - digit) * 4)
+        for byte in range(width):
+            # most significant byte first
+            digits = data[width - 1 - byte::width].hex().upper().encode()
+            lines[10 + byte * 2::lineLen] = digits[0::2]
+            lines[11 + byte * 2::lineLen] = digits[1::2]
+        file.write(lines.decode())
+
+
+class PartitionImage(object):
+    """
+    Content of a partition, either read from a file or already in memory.
+    """
+    
+    def __init__(self, name, offset, path = None, data = None):
+        self.name = name
+        self.offset = offset
+        self.path = path
+        self.data = data
+        self.size = os.path.getsize(path) if data is None else len(data)
+    
+    def read(self):
+        if self.data is None:
+            with open(self.path, 'rb') as file:
+                self.data = file.read()
+        return self.data
+    
+    def getManifestEntry(self, previousEntry = None):
+        entry = { 'name': self.name, 'offset': self.offset, 'size': self.size, 'stamp': None }
+        if self.path is not None:
+            entry['stamp'] = common.fileStamp(self.path)
+        
+        # Only read the file again if it was modified since the image was generated
+        if entry['stamp'] is not None and previousEntry is not None and previousEntry.get('stamp') == entry['stamp']:
+            entry['sha1'] = previousEntry['sha1']
+        else:
+            entry['sha1'] = hashlib.sha1(self.read()).hexdigest()
+        return entry
 
 
 class FlashImage(object):
@@ -134,6 +207,60 @@ class FlashImage(object):
         with open(outputPath, 'wb') as file:
             file.write(self.image)
     
+    def getManifest(self, partitionImages, previousManifest = None):
+        """
+        Return the description of the image saved next to it to allow patching it later on.
+        """
+        previous = {}
+        if previousManifest is not None and previousManifest.get('version') == MANIFEST_VERSION:
+            previous = { entry['name']: entry for entry in previousManifest['partitions'] }
+
+        end = len(self.image)
+        partitions = []
+        for partitionImage in partitionImages:
+            if partitionImage.offset < end:
+                raise ValueError
+            partitions.append(partitionImage.getManifestEntry(previous.get(partitionImage.name)))
+            end = partitionImage.offset + partitionImage.size
+
+        return {
+            'version': MANIFEST_VERSION,
+            'header': hashlib.sha1(self.image).hexdigest(),
+            'size': binary.align(end, 4),
+            'partitions': partitions
+        }
+
+    def getChangedPartitions(self, outputPath, partitionImages, manifest, previous):
+        """
+        Return the partitions of the image that have to be written to patch outputPath, or None if the image
+        must be fully rewritten because its layout changed or it was modified since its manifest was saved.
+        """
+        if previous is None or not os.path.exists(outputPath):
+            return None
+
+        for key in ['version', 'header', 'size']:
+            if previous.get(key) != manifest[key]:
+                return None
+
+        if previous.get('image') != common.fileStamp(outputPath):
+            return None
+
+        layout = lambda manifest: [(entry['name'], entry['offset'], entry['size']) for entry in manifest['partitions']]
+        if layout(previous) != layout(manifest):
+            return None
+
+        return [
+            partitionImage for partitionImage, entry, previousEntry in
+            zip(partitionImages, manifest['partitions'], previous['partitions'])
+            if entry['sha1'] != previousEntry['sha1']
+        ]
+
+    def patchRAWImage(self, outputPath, partitionImages):
+        with open(outputPath, 'r+b') as file:
+            for partitionImage in partitionImages:
+                file.seek(partitionImage.offset)
+                file.write(partitionImage.read())
+
     def writeStimuli(self, outputPath):
         # Warning: not tested!
         # Creating folders if necessary
@@ -148,25 +275,13 @@ class FlashImage(object):
                 last_bytes = len(self.buff) & 0xF
                 for i in range(0, 16 - last_bytes):
                     self.__appendByte(0)
-                for i in range(0, len(self.buff) >> 4):
-                    value = (self.buff[i * 16 + 15] << 120) + (self.buff[i * 16 + 14] << 112) + \
-                            (self.buff[i * 16 + 13] << 104) + (self.buff[i * 16 + 12] << 96) + \
-                            (self.buff[i * 16 + 11] << 88)  + (self.buff[i * 16 + 10] << 80) + \
-                            (self.buff[i * 16 + 9]  << 72)  + (self.buff[i * 16 + 8]  << 64) + \
-                            (self.buff[i * 16 + 7]  << 56)  + (self.buff[i * 16 + 6]  << 48) + \
-                            (self.buff[i * 16 + 5]  << 40)  + (self.buff[i * 16 + 4]  << 32) + \
-                            (self.buff[i * 16 + 3]  << 24)  + (self.buff[i * 16 + 2]  << 16) + \
-                            (self.buff[i * 16 + 1]  << 8)   + (self.buff[i * 16])
-                    dumpLongLongToSlm(file, i, value)
+                dumpBufferToSlm(file, self.buff, 16)
             elif self.flashType == 'hyper':
                 if len(self.buff) & 1 != 0:
                     self.__appendByte(0)
-                for i in range(0, len(self.buff) >> 1):
-                    value = (self.buff[i * 2 + 1] << 8) + self.buff[i * 2]
-                    dumpShortToSlm(file, i, value)
+                dumpBufferToSlm(file, self.buff, 2)
             else:
-                for i in range(0, len(self.buff)):
-                    dumpByteToSlm(file, i, self.buff[i])
+                dumpBufferToSlm(file, self.buff, 1)
 
 
 def appendArgs(parser: argparse.ArgumentParser, flashConfig: js.config) -> None:
@@ -286,6 +401,9 @@ def appendArgs(parser: argparse.ArgumentParser, flashConfig: js.config) -> None:
                         dest = 'output',
                         help = 'RAW image output',
                         **kwargs)
+    
+    parser.add_argument('--full-rebuild', action = 'store_true', dest = 'fullRebuild',
+                        help = 'Write the whole image even if only some partitions changed since the last build')
 
 
 def operationFunc(args, flash_config=None):
@@ -446,6 +564,7 @@ def operationFunc(args, flash_config=None):
     #
     traces.info("Dumping partition image::")
 
+    partitionImages = []
     if flash_config and flash_config.get('content/partitions') is not None:
         for p in table:
             path = p.path
@@ -453,33 +572,53 @@ def operationFunc(args, flash_config=None):
                 path = flash_config.get_str('content/partitions/%s/image' % p.name)
 
             if path:
-                flashImage.image.padToOffset(p.offset)
-                with open(path, 'rb') as p_file:
-                    flashImage.image += p_file.read()
+                partitionImages.append(PartitionImage(p.name, p.offset, path = path))
 
     else:
         for p in sorted(table, key = lambda x: x.offset):
             if p.name in args.partition.keys():
                 traces.info("%s partition [%s]" % (p.name, args.partition[p.name].name))
-                flashImage.image.padToOffset(p.offset)
-                flashImage.image += args.partition[p.name].read()
+                partitionImages.append(PartitionImage(p.name, p.offset, data = args.partition[p.name].read()))
             
             else:
                 traces.info("%s partition [None]" % p.name)
     
-    # add padding to finish on 4 bytes align
-    flashImage.image.padToOffset(binary.align(flashImage.getCurrentSize(), 4))
-    
     #
     # Write output
     #
     
-    traces.info("\nWritting output image to %s, size %uKB." % (args.output, flashImage.getCurrentSize() / 1024))
-    flashImage.writeRAWImage(args.output)
+    previousManifest = common.readManifest(args.output)
+    manifest = flashImage.getManifest(partitionImages, previousManifest)
+    changed = None
+    if not args.fullRebuild:
+        changed = flashImage.getChangedPartitions(args.output, partitionImages, manifest, previousManifest)
+
+    if changed is None:
+        for partitionImage in partitionImages:
+            flashImage.image.padToOffset(partitionImage.offset)
+            flashImage.image += partitionImage.read()
+
+        # add padding to finish on 4 bytes align
+        flashImage.image.padToOffset(binary.align(flashImage.getCurrentSize(), 4))
+
+        traces.info("\nWritting output image to %s, size %uKB." % (args.output, flashImage.getCurrentSize() / 1024))
+        common.removeManifest(args.output)
+        flashImage.writeRAWImage(args.output)
+
+    else:
+        traces.info("\nPatching output image %s, partitions changed: %s" % (args.output, ', '.join(p.name for p in changed) or 'none'))
+        common.removeManifest(args.output)
+        flashImage.patchRAWImage(args.output, changed)
+
+    manifest['image'] = common.fileStamp(args.output)
+    common.writeManifest(args.output, manifest)
 
     if args.flashStimuliFormat is not None:
         file_name = args.flashStimuliFile
         traces.info("\nWritting output stimuli to %s" %( file_name))
+        if changed is not None:
+            with open(args.output, 'rb') as file:
+                flashImage.image = bytearray(file.read())
         flashImage.writeStimuli(file_name)
 
 
@@ -63,6 +63,16 @@ def appendArgs(parser: argparse.ArgumentParser, partitionConfig: js.config=None)
                         **kwargs)
 
 
+def getDirStamps(path):
+	stamps = []
+	for dirPath, dirNames, fileNames in os.walk(path):
+		dirNames.sort()
+		for name in sorted(dirNames + fileNames):
+			stat = os.stat(os.path.join(dirPath, name))
+			stamps.append([os.path.relpath(os.path.join(dirPath, name), path), stat.st_size, stat.st_mtime_ns])
+	return stamps
+
+
 def operationFunc(args, config=None):
 	if config.get_str('root_dir') is None:
 		return
@@ -74,10 +84,17 @@ def operationFunc(args, config=None):
 	traces.info('Generating LittleFS images with command:')
 	traces.info('  ' + cmd)
 
-	stdout = None if traces.verbose else subprocess.PIPE
-
-	if subprocess.run(shlex.split(cmd), stdout=stdout).returncode != 0:
-		raise errors.InputError('Failed to generate LittleFS image')
+	# mklfs is only run again if a file or directory of the root dir changed
+	inputs = [cmd, getDirStamps(config.get_str('root_dir'))]
+	if common.isOutputUpToDate(args.output, inputs):
+		traces.info('LittleFS image %s is up to date' % args.output)
+	else:
+		stdout = None if traces.verbose else subprocess.PIPE
+
+		common.removeManifest(args.output)
+		if subprocess.run(shlex.split(cmd), stdout=stdout).returncode != 0:
+			raise errors.InputError('Failed to generate LittleFS image')
+		common.saveOutputInputs(args.output, inputs)
 
 	if config is not None:
 		config.set('enabled', True)
@@ -222,8 +222,15 @@ def operationFunc(args, config=None):
 		for comp in getCompsFromDir(compDir, rec = True, incDirInName = args.incDirInName):
 			readFS.appendComponent(comp)
 			is_enabled = True
-			
-	readFS.generate(args.output)
+
+	# The image only depends on the component names and contents
+	inputs = [[comp.name] + common.fileStamp(comp.path) for comp in readFS.compList]
+	if common.isOutputUpToDate(args.output, inputs):
+		traces.info("ReadFS image %s is up to date" % args.output)
+	else:
+		common.removeManifest(args.output)
+		readFS.generate(args.output)
+		common.saveOutputInputs(args.output, inputs)
 
 	if config is not None:
 		config.set('enabled', True)
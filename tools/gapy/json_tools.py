@@ -22,6 +22,21 @@ import io
 import importlib
 import configparser
 import collections
+import hashlib
+import pickle
+import tempfile
+
+
+# Keys which are interpreted instead of being added to the tree, see config_object
+INTERPRETED_KEYS = ('@cond@', '@eval@', '@includes@', '@includes2@', '@include@', 'includes', 'includes2', 'include')
+
+# Bumped by any change to any tree so that memoized lookups can be dropped
+_generation = 0
+
+# What the config being resolved for the config cache depends on, None when nothing is cached
+_dependencies = None
+
+CONFIG_CACHE_VERSION = 1
 
 
 def argToInt(value):
@@ -72,11 +87,119 @@ def find_config(config, paths):
     for path in paths:
         full_path = os.path.join(path, config)
         if os.path.exists(full_path):
+            _add_file_dependency(full_path)
             return full_path
+        # The result changes if a file appears earlier in the paths
+        _add_dependency(('missing', os.path.abspath(full_path)))
 
     return None
 
 
+def tree_changed():
+    """ Drop the lookups memoized on all trees, must be called on any change to a tree.
+    """
+    global _generation
+    _generation += 1
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _add_dependency(dependency):
+    if _dependencies is not None:
+        _dependencies.append(dependency)
+
+
+def _add_file_dependency(path):
+    if _dependencies is not None:
+        _dependencies.append(('file', os.path.abspath(path), _file_stamp(path)))
+
+
+def _add_eval_dependency(expr, result):
+    _add_dependency(('eval', expr, result))
+
+
+def _is_dependency_valid(dependency):
+    kind = dependency[0]
+    if kind == 'file':
+        return os.path.exists(dependency[1]) and _file_stamp(dependency[1]) == dependency[2]
+    elif kind == 'missing':
+        return not os.path.exists(dependency[1])
+    elif kind == 'eval':
+        # Expressions mostly read the environment
+        result = do_node_eval(dependency[1])
+        return type(result) == type(dependency[2]) and result == dependency[2]
+    return False
+
+
+def get_config_cache_dir():
+    """ Return the directory where resolved configs are cached or None if the cache is disabled
+    by setting GAPY_CONFIG_CACHE to an empty string.
+    """
+    cache_dir = os.environ.get('GAPY_CONFIG_CACHE')
+    if cache_dir is None:
+        return os.path.join(os.path.expanduser('~'), '.cache', 'gapy', 'configs')
+    if cache_dir == '':
+        return None
+    return cache_dir
+
+
+def _config_cache_path(file_path, interpret, find, path, gen, paths, ini_configs, config_items):
+    cache_dir = get_config_cache_dir()
+    if cache_dir is None:
+        return None
+    key = repr((CONFIG_CACHE_VERSION, sys.version, os.path.abspath(file_path), interpret, find,
+        gen, [os.path.abspath(search_path) for search_path in get_paths(path=path, paths=paths)],
+        [os.path.abspath(ini_config) for ini_config in ini_configs], list(config_items)))
+    return os.path.join(cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.pickle')
+
+
+def _load_cached_config(cache_path):
+    try:
+        with open(cache_path, 'rb') as fd:
+            entry = pickle.load(fd)
+        for dependency in entry['dependencies']:
+            if not _is_dependency_valid(dependency):
+                return None
+        return entry['config']
+    except Exception:
+        return None
+
+
+def _save_cached_config(cache_path, config, dependencies):
+    try:
+        data = pickle.dumps({'dependencies': dependencies, 'config': config})
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(cache_path))
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        # The cache is only an optimization
+        pass
+
+
+def _is_canonical(config):
+    """ Return True if building a tree from config.get_dict() gives back the same tree.
+    """
+    if type(config) == config_object:
+        for key, value in config.items.items():
+            if key in INTERPRETED_KEYS or not _is_canonical(value):
+                return False
+        return True
+    elif type(config) == config_array:
+        return all(_is_canonical(elem) for elem in config.elems)
+    elif type(config) == config_string:
+        return is_string(config.value)
+    elif type(config) == config_bool:
+        return type(config.value) == bool
+    elif type(config) == config_number:
+        return type(config.value) not in (list, dict, OrderedDict, bool) and not is_string(config.value)
+    return False
+
+
 def import_config(config, interpret=False, path=None, paths=None, gen=False, indent='', ini_configs=[], config_items=[]):
     config = config_object(config, interpret=interpret, path=path, paths=paths, gen=gen, indent=indent)
 
@@ -88,7 +211,8 @@ def import_config(config, interpret=False, path=None, paths=None, gen=False, ind
       paths = parser.read(ini_config)
       if len(paths) == 0:
           raise Exception("Didn't manage to open file: %s" % (ini_config))
-          
+      _add_file_dependency(ini_config)
+
       for section in parser.sections():
         for item in parser.items(section):
           path = ('%s.%s' % (section, item[0])).split('.')
@@ -99,8 +223,9 @@ def import_config(config, interpret=False, path=None, paths=None, gen=False, ind
         key, value = config_opt.split('=', 1)
         config.user_set(key, value)
 
-
-    config = config_object(config.get_dict(), interpret=interpret, path=path, paths=paths, gen=gen, indent=indent)
+    # Rebuilding the tree only normalizes what was set or generated above
+    if len(ini_configs) != 0 or len(config_items) != 0 or gen or not _is_canonical(config):
+        config = config_object(config.get_dict(), interpret=interpret, path=path, paths=paths, gen=gen, indent=indent)
 
     return config
 
@@ -116,14 +241,43 @@ def get_config_file(file_path, interpret=False, find=False, path=None, paths=Non
                 file_path, ":".join(paths)))
         file_path = new_file_path
 
+    else:
+        _add_file_dependency(file_path)
+
     with io.open(file_path, 'r', encoding='utf-8') as fd:
         config_dict = json.load(fd, object_pairs_hook=OrderedDict)
         return config_dict
 
 
-def import_config_from_file(file_path, interpret=False, find=False, path=None, gen=False, paths=None, indent='', ini_configs=[], config_items=[]):
-    config_dict = get_config_file(file_path, interpret=interpret, find=find, path=path, paths=paths)
-    return import_config(config_dict, interpret=interpret, path=os.path.dirname(file_path), gen=gen, paths=paths, indent=indent, ini_configs=ini_configs, config_items=config_items)
+def import_config_from_file(file_path, interpret=False, find=False, path=None, gen=False, paths=None, indent='', ini_configs=[], config_items=[], cache=False):
+    """ Import a config from a JSON file. With cache, the resolved config is saved to the config cache
+    and reused until one of the files it was resolved from changes.
+    """
+    global _dependencies
+
+    cache_path = None
+    if cache and _dependencies is None:
+        cache_path = _config_cache_path(file_path, interpret, find, path, gen, paths, ini_configs, config_items)
+
+    if cache_path is None:
+        config_dict = get_config_file(file_path, interpret=interpret, find=find, path=path, paths=paths)
+        return import_config(config_dict, interpret=interpret, path=os.path.dirname(file_path), gen=gen, paths=paths, indent=indent, ini_configs=ini_configs, config_items=config_items)
+
+    config = _load_cached_config(cache_path)
+    if config is not None:
+        return config
+
+    _dependencies = []
+    try:
+        config = import_config_from_file(file_path, interpret=interpret, find=find, path=path, gen=gen, paths=paths, indent=indent, ini_configs=ini_configs, config_items=config_items)
+        dependencies = _dependencies
+    finally:
+        _dependencies = None
+
+    if None not in dependencies:
+        _save_cached_config(cache_path, config, dependencies)
+
+    return config
 
 
 class config(object):
@@ -220,6 +374,7 @@ class config_object(config):
 
     def __init__(self, config=None, interpret=False, path=None, do_eval=False, gen=False, paths=None, indent=''):
         self.items = OrderedDict()
+        self._reset_lookups()
 
         #if gen == True and interpret == False:
         #    raise RuntimeError("")
@@ -233,7 +388,7 @@ class config_object(config):
                 #print (indent + 'PARSE ' + key)
                 #print (id(self))
 
-                if interpret and (key == '@cond@' or key == '@eval@' or key == '@includes@' or key == '@includes2@' or key == '@include@' or key == 'includes' or key == 'includes2' or key == 'include'):
+                if interpret and key in INTERPRETED_KEYS:
 
                     if key == '@cond@':
 
@@ -241,6 +396,7 @@ class config_object(config):
                             if expr[0] == '@' and expr[-1] == '@':
                                 expr = expr[1:len(expr)-1]
                                 expr_result = eval(expr)
+                                _add_eval_dependency(expr, expr_result)
                                 if expr_result:
                                     current_config.merge(current_config.get_tree(expr_value, interpret, path, do_eval=do_eval, indent=indent+'  ', gen=gen))
                             else:
@@ -275,6 +431,9 @@ class config_object(config):
 
                 generator = current_config.get_str("@generator@")
 
+                # The generated config can depend on anything
+                _add_dependency(None)
+
                 module = importlib.import_module(generator.replace('/', '.'))
 
                 self.merge(module.get_config(config_object(current_config.get_dict(), interpret, path, gen=False, indent=indent)))
@@ -309,7 +468,47 @@ class config_object(config):
             return None
         return config.get_int()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lookups'], state['_index'], state['_lookups_generation']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_lookups()
+
+    def _reset_lookups(self):
+        # Memo of the wildcard lookups and index of the '**/key' lookups, valid while no tree changes
+        self._lookups = {}
+        self._index = None
+        self._lookups_generation = _generation
+
+    def _get_lookups(self):
+        if self._lookups_generation != _generation:
+            self._reset_lookups()
+        return self._lookups
+
+    def _get_index(self):
+        """ Return for each key the values found under it by a '**/key' lookup, in search order.
+        The search does not go below a value found under the key it is looking for.
+        """
+        if self._index is None:
+            index = {}
+
+            def add_items(config, parent_keys):
+                for key, value in config.items.items():
+                    if key not in parent_keys:
+                        index.setdefault(key, []).append(value)
+                    if type(value) == config_object:
+                        add_items(value, parent_keys | {key})
+
+            add_items(self, frozenset())
+            self._index = index
+
+        return self._index
+
     def merge(self, new_value):
+        tree_changed()
         for key, value in new_value.items.items():
             if self.items.get(key) is None:
                 self.items[key] = value
@@ -322,6 +521,30 @@ class config_object(config):
         if len(name_list) == 0:
             return self
 
+        if name_list[0] != "*" and name_list[0] != "**":
+            value = self.items.get(name_list[0])
+            if value is None:
+                return None
+            return value.get_from_list(name_list[1:])
+
+        lookups = self._get_lookups()
+        lookup = tuple(name_list)
+        if lookup in lookups:
+            return lookups[lookup]
+
+        if name_list[0] == "**" and len(name_list) > 1 and name_list[1] != "*" and name_list[1] != "**":
+            result = None
+            for value in self._get_index().get(name_list[1], []):
+                result = value.get_from_list(name_list[2:])
+                if result is not None:
+                    break
+        else:
+            result = self._search(name_list)
+
+        lookups[lookup] = result
+        return result
+
+    def _search(self, name_list):
         result = None
         name_pos = 0
 
@@ -349,6 +572,7 @@ class config_object(config):
         return result
 
     def set_from_list(self, name_list, value):
+        tree_changed()
 
         if len(name_list) == 1:
             key = name_list.pop(0)
@@ -464,6 +688,7 @@ class config_array(config):
         return None
 
     def set_from_list(self, name_list, value):
+        tree_changed()
         if len(name_list) == 0:
             self.merge(self.get_tree(value))
         else:
@@ -490,6 +715,7 @@ class config_array(config):
         return self.elems
 
     def merge(self, new_value):
+        tree_changed()
         if type(new_value) != config_array:
             new_value = config_array([new_value.get_dict()])
 
@@ -514,6 +740,7 @@ class config_string(config):
     def __init__(self, config, do_eval=False):
         if do_eval:
             self.value = do_node_eval(config)
+            _add_eval_dependency(config, self.value)
         else:
             self.value = config
 
@@ -536,6 +763,7 @@ class config_string(config):
 
     def set_from_list(self, name_list, value):
         if len(name_list) == 0:
+            tree_changed()
             self.value = self.get_tree(value)
 
 
@@ -544,6 +772,7 @@ class config_number(config):
     def __init__(self, config, do_eval=False):
         if do_eval:
             self.value = eval(config)
+            _add_eval_dependency(config, self.value)
         else:
             self.value = config
 
@@ -563,6 +792,7 @@ class config_number(config):
 
     def set_from_list(self, name_list, value):
         if len(name_list) == 0:
+            tree_changed()
             self.value = self.get_tree(value)
 
 
@@ -571,6 +801,7 @@ class config_bool(config):
     def __init__(self, config, do_eval=False):
         if do_eval:
             self.value = eval(config)
+            _add_eval_dependency(config, self.value)
         else:
             self.value = config
 
@@ -590,4 +821,5 @@ class config_bool(config):
 
     def set_from_list(self, name_list, value):
         if len(name_list) == 0:
+            tree_changed()
             self.value = self.get_tree(value)
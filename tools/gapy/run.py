@@ -55,7 +55,7 @@ def import_runner(name):
 
 def append_platform(parser, plt_name, plt_config_path):
 
-    plt_config = js.import_config_from_file(plt_config_path, paths = gapyJsonPath, find=True, interpret=True)
+    plt_config = js.import_config_from_file(plt_config_path, paths = gapyJsonPath, find=True, interpret=True, cache=True)
     runner_module = plt_config.get_str('runner_module')
 
     if runner_module is not None:
@@ -0,0 +1,148 @@
+# Copyright (C) 2020  GreenWaves Technologies, SAS
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import logging
+import os
+import pickle
+from collections import OrderedDict
+from copy import deepcopy
+
+import numpy as np
+
+LOG = logging.getLogger('nntool.' + __name__)
+
+
+def digest(*objs):
+    """Hex digest of the pickled objs. Arrays are hashed on their shape, dtype and data."""
+    hasher = hashlib.sha1()
+    for obj in objs:
+        if isinstance(obj, np.ndarray):
+            hasher.update(repr((obj.shape, obj.dtype.str)).encode('utf-8'))
+            hasher.update(np.ascontiguousarray(obj).data)
+        else:
+            hasher.update(pickle.dumps(obj, protocol=4))
+    return hasher.hexdigest()
+
+
+def copy_tensors(val):
+    if isinstance(val, np.ndarray):
+        return val.copy()
+    if isinstance(val, (list, tuple)):
+        return type(val)(copy_tensors(elem) for elem in val)
+    if isinstance(val, dict):
+        return deepcopy(val)
+    return val
+
+
+def tensors_size(val):
+    if isinstance(val, np.ndarray):
+        return val.nbytes
+    if isinstance(val, (list, tuple)):
+        return sum(tensors_size(elem) for elem in val)
+    return 0
+
+
+class ExecutionCache():
+    """Cache of the results of executing the top level nodes of a graph.
+
+    An entry is keyed on a digest of the node, its quantization records, the execution mode
+    and the keys of the entries that produced its inputs so a change to one node or its
+    quantization only invalidates that node and the nodes after it. Graph input nodes are
+    keyed on a digest of their input tensor.
+
+    At most max_bytes of tensors are kept in memory. Least recently used entries are
+    evicted to spill_dir if it is set and dropped otherwise."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, spill_dir=None):
+        self._max_bytes = max_bytes
+        self._spill_dir = spill_dir
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._entries = OrderedDict()
+        self._spilled = {}
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def node_key(node, qrecs, mode, input_keys):
+        return digest(node.name, node, qrecs, mode, input_keys)
+
+    def get(self, key):
+        """Returns (yields, outputs) if key is cached or None. The returned tensors are copies
+        that can be modified by the caller"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._unspill(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        yields, outputs, _ = entry
+        return [tuple(copy_tensors(elem) for elem in val) for val in yields], copy_tensors(outputs)
+
+    def put(self, key, yields, outputs):
+        """Cache the values yielded by the execution of a node and its output tensors.
+        The values are stored as they are so they must not be modified by the caller
+        afterwards."""
+        size = sum(tensors_size(val) for val in yields) + tensors_size(outputs)
+        if size > self._max_bytes:
+            return
+        if key in self._entries:
+            self._size -= self._entries.pop(key)[2]
+        self._entries[key] = (yields, outputs, size)
+        self._size += size
+        while self._size > self._max_bytes:
+            old_key, old_entry = self._entries.popitem(last=False)
+            self._size -= old_entry[2]
+            self._spill(old_key, old_entry)
+
+    def _spill(self, key, entry):
+        if not self._spill_dir:
+            return
+        filename = os.path.join(self._spill_dir, key + '.pickle')
+        try:
+            with open(filename, 'wb') as fp:
+                pickle.dump(entry, fp, protocol=4)
+            self._spilled[key] = filename
+        except OSError as ex:
+            LOG.warning("unable to spill execution cache entry: %s", ex)
+
+    def _unspill(self, key):
+        filename = self._spilled.pop(key, None)
+        if filename is None:
+            return None
+        try:
+            with open(filename, 'rb') as fp:
+                entry = pickle.load(fp)
+            os.remove(filename)
+        except (OSError, pickle.UnpicklingError) as ex:
+            LOG.warning("unable to load spilled execution cache entry: %s", ex)
+            return None
+        self.put(key, entry[0], entry[1])
+        return self._entries.get(key)
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+        for filename in self._spilled.values():
+            if os.path.exists(filename):
+                os.remove(filename)
+        self._spilled.clear()
+
+    def __len__(self):
+        return len(self._entries) + len(self._spilled)
@@ -18,7 +18,7 @@ from typing import Mapping, Optional, Sequence
 
 import numpy as np
 from graph.types import (ActivationFusion, ConstantInputParameters,
-                         ConvFusionParameters, FusionInputParameters,
+                         ConvFusionParameters, FusionBase, FusionInputParameters,
                          FusionOutputParameters, InputParameters,
                          MatMulOpFusionParameters, PaddedAddFusionParameters,
                          Parameters)
@@ -27,6 +27,7 @@ from quantization.new_qrec import QRec
 from utils.graph import Graph
 from utils.node_id import NodeId
 
+from execution.execution_cache import ExecutionCache, copy_tensors, digest
 from execution.execution_progress import ExecutionProgress
 from execution.quantization_mode import QuantizationMode
 
@@ -36,9 +37,11 @@ LOG = logging.getLogger('nntool.'+__name__)
 class GraphExecuter():
     def __init__(self,
                  G: Graph,
-                 qrecs: Optional[Mapping[NodeId, QRec]] = None):
+                 qrecs: Optional[Mapping[NodeId, QRec]] = None,
+                 cache: Optional[ExecutionCache] = None):
         self._G = G
         self._qrecs = qrecs
+        self._cache = cache
 
     @staticmethod
     def collect_outputs(G, saved_outputs, node):
@@ -56,6 +59,32 @@ class GraphExecuter():
     def save_output(saved_outputs, node, outputs):
         saved_outputs[node] = outputs
 
+    @staticmethod
+    def quantize(qtype, tensor, batch_size=None, float_dtype=None):
+        # channel quantized qtypes index the channel dimension of a single sample
+        if batch_size is not None and qtype.quantized_dimension is not None:
+            return np.stack([qtype.quantize(sample, float_dtype=float_dtype) for sample in tensor])
+        return qtype.quantize(tensor, float_dtype=float_dtype)
+
+    @staticmethod
+    def dequantize(qtype, tensor, batch_size=None, float_dtype=None):
+        if batch_size is not None and qtype.quantized_dimension is not None:
+            return np.stack([qtype.dequantize(sample, float_dtype=float_dtype) for sample in tensor])
+        return qtype.dequantize(tensor, float_dtype=float_dtype)
+
+    @staticmethod
+    def quantize_dequantize(qtype, tensor, batch_size=None, float_dtype=None):
+        if batch_size is not None and qtype.quantized_dimension is not None:
+            return np.stack([qtype.quantize_dequantize(sample, float_dtype=float_dtype)
+                             for sample in tensor])
+        return qtype.quantize_dequantize(tensor, float_dtype=float_dtype)
+
+    @staticmethod
+    def execute_kernel(node, input_tensors, qrec, details, batch_size=None):
+        if batch_size is None:
+            return KernelExecuter.execute(node, input_tensors, qrec, details)
+        return KernelExecuter.execute_batch(node, input_tensors, qrec, batch_size, details=details)
+
     def execute_qnoq_iterator(self,
                               in_tensors,
                               step_idx_limit=None,
@@ -155,7 +184,16 @@ class GraphExecuter():
                          parent_node=None,
                          parent_step_idx=None,
                          saved_outputs=None,
-                         G=None):
+                         G=None,
+                         batch_size: Optional[int] = None):
+        """Execute the graph node by node yielding the outputs of each node.
+
+        If batch_size is set then each of the in_tensors carries a leading batch axis of
+        that size and all the yielded tensors are batched in the same way. The graph is
+        only traversed once for the whole batch.
+
+        If the executer has an execution cache then the results of top level nodes whose
+        inputs, parameters and quantization have not changed are taken from it."""
         if qmode is None:
             qmode = QuantizationMode.none()
 
@@ -163,8 +201,13 @@ class GraphExecuter():
             G = self._G
             saved_outputs = {}
 
+        use_cache = (self._cache is not None and parent_node is None and
+                     start_node is None and record_inputs is None)
+        node_keys = {}
+
         if not silent:
-            LOG.info("execute uncached: quantization mode %s", qmode)
+            LOG.info("execute %s: quantization mode %s",
+                     "cached" if use_cache else "uncached", qmode)
             ExecutionProgress.start()
         for node in G.dfs():
             step_idx = node.step_idx
@@ -201,74 +244,144 @@ class GraphExecuter():
                     else:
                         qrec = self._qrecs[nid]
                     if qmode.is_step and output_tensors:
-                        output_tensors = [qrec.in_qs[i].quantize(
-                            output_tensor) for i, output_tensor in enumerate(output_tensors)]
+                        output_tensors = [self.quantize(qrec.in_qs[i], output_tensor, batch_size,
+                                                        float_dtype=qmode.float_dtype)
+                                          for i, output_tensor in enumerate(output_tensors)]
                 else:
                     qrec = None
 
             details = {} if yield_details and (
                 not only_yield_step or step_idx == step_idx_limit) else None
-            if isinstance(node, (ConvFusionParameters, ActivationFusion, PaddedAddFusionParameters, MatMulOpFusionParameters)):
-
-                for f_step_idx, f_pnode, f_node, f_output_tensors, f_details in self.execute_iterator(
-                        output_tensors,
-                        qmode=qmode,
-                        yield_fusions=yield_fusions,
-                        yield_details=yield_details,
-                        silent=True,
-                        parent_node=node,
-                        parent_step_idx=step_idx,
-                        saved_outputs=saved_outputs,
-                        G=node.subgraph
-                ):
-                    if yield_fusions and not isinstance(f_node, (FusionInputParameters, FusionOutputParameters)):
-                        yield f_step_idx, f_pnode, f_node, f_output_tensors, f_details
-                f_outputs = node.subgraph.outputs()
-                num_outputs = max(f_output.idx for f_output in f_outputs) + 1
-                output_tensors = [None]*num_outputs
-                for f_output in f_outputs:
-                    output_tensors[f_output.idx] = saved_outputs[f_output][0]
-
-            elif isinstance(node, (InputParameters, FusionInputParameters)):
-                output_tensors = KernelExecuter.execute(
-                    node, in_tensors, qrec, details)
-            else:
-                output_tensors = KernelExecuter.execute(
-                    node, output_tensors, qrec, details)
-
-            if qmode.dequantize and qrec:
-                qoutput_tensors = [qrec.out_qs[i].dequantize(
-                    output_tensor) for i, output_tensor in enumerate(output_tensors)]
-                if parent_node:
-                    yield parent_step_idx, parent_node, node, qoutput_tensors, details
-                elif not only_yield_step or step_idx == step_idx_limit:
-                    yield step_idx, node, None, qoutput_tensors, details
-                if qmode.is_step and qmode.get_quantized(node, step_idx):
-                    output_tensors = qoutput_tensors
-            elif qmode.is_float_q_deq and qrec:
-                if qmode.is_step and qmode.get_quantized(node, step_idx):
-                    output_tensors = [qrec.out_qs[i].dequantize(
-                        output_tensor) for i, output_tensor in enumerate(output_tensors)]
-                qoutput_tensors = [qrec.out_qs[i].dequantize(qrec.out_qs[i].quantize(
-                    output_tensor)) for i, output_tensor in enumerate(output_tensors)]
-                if parent_node:
-                    yield parent_step_idx, parent_node, node, qoutput_tensors, details
-                elif not only_yield_step or step_idx == step_idx_limit:
-                    yield step_idx, node, None, qoutput_tensors, details
+            yield_node = not only_yield_step or step_idx == step_idx_limit
+
+            node_execution = self._execute_node(
+                node, step_idx, in_tensors, output_tensors, qrec, qmode, details,
+                yield_node, yield_fusions, yield_details, parent_node, parent_step_idx,
+                saved_outputs, batch_size)
+            if use_cache:
+                key = self._node_cache_key(G, node, step_idx, in_tensors, qmode, qrec,
+                                           details is not None, yield_node, yield_fusions,
+                                           batch_size, node_keys)
+                node_keys[node.name] = key
+                cached = self._cache.get(key)
+                if cached is None:
+                    cached_yields = []
+                    output_tensors = yield from self._capture_execution(node_execution,
+                                                                        cached_yields)
+                    self._cache.put(key, cached_yields, copy_tensors(output_tensors))
+                else:
+                    cached_yields, output_tensors = cached
+                    for f_name, tensors, f_details in cached_yields:
+                        if f_name is None:
+                            yield step_idx, node, None, tensors, f_details
+                        else:
+                            yield step_idx, node, node.get_contained_node(f_name), tensors, f_details
             else:
-                if qmode.is_step and qmode.get_quantized(node, step_idx) and qrec:
-                    output_tensors = [qrec.out_qs[i].dequantize(
-                        output_tensor) for i, output_tensor in enumerate(output_tensors)]
-                if parent_node:
-                    yield parent_step_idx, parent_node, node, output_tensors, details
-                elif not only_yield_step or step_idx == step_idx_limit:
-                    yield step_idx, node, None, output_tensors, details
+                output_tensors = yield from node_execution
 
             self.save_output(saved_outputs, node, output_tensors)
 
         if not silent:
             ExecutionProgress.end()
 
+    def _node_cache_key(self, G, node, step_idx, in_tensors, qmode, qrec, with_details,
+                        yield_node, yield_fusions, batch_size, node_keys):
+        qrecs = [qrec]
+        if isinstance(node, FusionBase) and qrec is not None:
+            qrecs.extend(self._qrecs.get(NodeId(node, fnode))
+                         for fnode in node.contained_nodes())
+        mode = (qmode.get_quantized(node, step_idx), qmode.is_step, qmode.dequantize,
+                qmode.is_float_q_deq, qmode.float_dtype, with_details, yield_node, yield_fusions,
+                batch_size)
+        if isinstance(node, InputParameters):
+            input_keys = [digest(in_tensors[node.index])]
+        else:
+            input_keys = sorted((edge.to_idx, node_keys.get(edge.from_node.name), edge.from_idx)
+                                for edge in G.in_edges(node.name))
+        return self._cache.node_key(node, qrecs, mode, input_keys)
+
+    @staticmethod
+    def _capture_execution(node_execution, cached_yields):
+        """Pass through the values yielded by node_execution keeping a copy of them"""
+        while True:
+            try:
+                val = next(node_execution)
+            except StopIteration as ex:
+                return ex.value
+            _, _, fnode, tensors, details = val
+            cached_yields.append((None if fnode is None else fnode.name,
+                                  copy_tensors(tensors), copy_tensors(details)))
+            yield val
+
+    def _execute_node(self, node, step_idx, in_tensors, output_tensors, qrec, qmode, details,
+                      yield_node, yield_fusions, yield_details, parent_node, parent_step_idx,
+                      saved_outputs, batch_size):
+        """Execute one node yielding its outputs and the outputs of the nodes that it contains
+        if it is a fusion. Returns the output tensors passed on to the following nodes."""
+        if isinstance(node, (ConvFusionParameters, ActivationFusion, PaddedAddFusionParameters, MatMulOpFusionParameters)):
+
+            for f_step_idx, f_pnode, f_node, f_output_tensors, f_details in self.execute_iterator(
+                    output_tensors,
+                    qmode=qmode,
+                    yield_fusions=yield_fusions,
+                    yield_details=yield_details,
+                    silent=True,
+                    parent_node=node,
+                    parent_step_idx=step_idx,
+                    saved_outputs=saved_outputs,
+                    G=node.subgraph,
+                    batch_size=batch_size
+            ):
+                if yield_fusions and not isinstance(f_node, (FusionInputParameters, FusionOutputParameters)):
+                    yield f_step_idx, f_pnode, f_node, f_output_tensors, f_details
+            f_outputs = node.subgraph.outputs()
+            num_outputs = max(f_output.idx for f_output in f_outputs) + 1
+            output_tensors = [None]*num_outputs
+            for f_output in f_outputs:
+                output_tensors[f_output.idx] = saved_outputs[f_output][0]
+
+        elif isinstance(node, (InputParameters, FusionInputParameters)):
+            output_tensors = self.execute_kernel(
+                node, in_tensors, qrec, details, batch_size=batch_size)
+        else:
+            output_tensors = self.execute_kernel(
+                node, output_tensors, qrec, details, batch_size=batch_size)
+
+        float_dtype = qmode.float_dtype
+        if qmode.dequantize and qrec:
+            qoutput_tensors = [self.dequantize(qrec.out_qs[i], output_tensor, batch_size,
+                                               float_dtype=float_dtype)
+                               for i, output_tensor in enumerate(output_tensors)]
+            if parent_node:
+                yield parent_step_idx, parent_node, node, qoutput_tensors, details
+            elif yield_node:
+                yield step_idx, node, None, qoutput_tensors, details
+            if qmode.is_step and qmode.get_quantized(node, step_idx):
+                output_tensors = qoutput_tensors
+        elif qmode.is_float_q_deq and qrec:
+            if qmode.is_step and qmode.get_quantized(node, step_idx):
+                output_tensors = [self.dequantize(qrec.out_qs[i], output_tensor, batch_size,
+                                                  float_dtype=float_dtype)
+                                  for i, output_tensor in enumerate(output_tensors)]
+            qoutput_tensors = [self.quantize_dequantize(qrec.out_qs[i], output_tensor, batch_size,
+                                                        float_dtype=float_dtype)
+                               for i, output_tensor in enumerate(output_tensors)]
+            if parent_node:
+                yield parent_step_idx, parent_node, node, qoutput_tensors, details
+            elif yield_node:
+                yield step_idx, node, None, qoutput_tensors, details
+        else:
+            if qmode.is_step and qmode.get_quantized(node, step_idx) and qrec:
+                output_tensors = [self.dequantize(qrec.out_qs[i], output_tensor, batch_size,
+                                                  float_dtype=float_dtype)
+                                  for i, output_tensor in enumerate(output_tensors)]
+            if parent_node:
+                yield parent_step_idx, parent_node, node, output_tensors, details
+            elif yield_node:
+                yield step_idx, node, None, output_tensors, details
+
+        return output_tensors
+
     def execute_qnoq(self,
                      in_tensors: Sequence[np.ndarray],
                      step_idx_limit=None,
@@ -321,12 +434,15 @@ class GraphExecuter():
                 qmode: QuantizationMode = None,
                 all_details=None,
                 yield_fusions=False,
-                silent=False):
+                silent=False,
+                batch_size=None):
 
         if qmode is None:
             qmode = QuantizationMode.none()
 
         if qmode.is_step_all:
+            if batch_size is not None:
+                raise ValueError("batched execution is not supported in step all mode")
             iterator = [(qoutput, qdetails, fnode)
                         for _, _, _, _, qoutput, qdetails, fnode
                         in self.execute_qnoq_iterator(in_tensors,
@@ -341,7 +457,8 @@ class GraphExecuter():
                                                  yield_fusions=yield_fusions,
                                                  only_yield_step=only_yield_step,
                                                  yield_details=all_details is not None,
-                                                 silent=silent)]
+                                                 silent=silent,
+                                                 batch_size=batch_size)]
 
         outputs = []
         if yield_fusions:
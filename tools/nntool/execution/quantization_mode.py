@@ -18,10 +18,12 @@ from graph.types import Parameters
 from utils.node_id import NodeId
 
 class QuantizationMode():
-    def __init__(self, qlevel: str = "all", qstep: Optional[Union[int, NodeId]] = None, dequantize=False):
+    def __init__(self, qlevel: str = "all", qstep: Optional[Union[int, NodeId]] = None, dequantize=False,
+                 float_dtype=None):
         self._qlevel = qlevel
         self._qstep = qstep
         self._dequantize = dequantize
+        self._float_dtype = float_dtype
 
     @classmethod
     def all(cls):
@@ -80,6 +82,15 @@ class QuantizationMode():
     def dequantize(self):
         return (self.is_step or self.is_all) and self._dequantize
 
+    @property
+    def float_dtype(self):
+        """dtype of dequantized tensors. None uses float64 and numpy's promotion rules"""
+        return self._float_dtype
+
+    @float_dtype.setter
+    def float_dtype(self, val):
+        self._float_dtype = val
+
     def __str__(self):
         if self.is_none or self.is_all:
             return self._qlevel
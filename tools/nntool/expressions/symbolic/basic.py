@@ -19,10 +19,11 @@ from scipy.special import expit
 
 from .function import Function
 from .symbol import (DTYPES_TO_CTYPES, Constant, Rational, c_headers,
-                     environment, handles, handlesr, nargs)
+                     environment, handles, handlesr, nargs, ufunc)
 
 
 @nargs(2)
+@ufunc(np.add)
 @handles('__add__')
 @handlesr('__radd__')
 class Add(Function):
@@ -38,6 +39,7 @@ class Add(Function):
 
 
 @nargs(2)
+@ufunc(np.multiply)
 @handles('__mul__')
 @handlesr('__rmul__')
 class Mul(Function):
@@ -57,6 +59,7 @@ class Mul(Function):
 
 
 @nargs(2)
+@ufunc(np.subtract)
 @handles('__sub__')
 @handlesr('__rsub__')
 class Sub(Function):
@@ -108,7 +111,7 @@ class LShift(Function):
         return np.left_shift(args[0], args[1], dtype=np.int32)
 
     def _py_expr(self, *args, **kwargs):
-        return "np.left_shift(%s, %s)" % (args[0], args[1])
+        return "np.left_shift(%s, %s, dtype=np.int32)" % (args[0], args[1])
 
     def _c_expr(self, *args, **kwargs):
         return "(%s<<%s)" % (args[0], args[1])
@@ -123,13 +126,14 @@ class RShift(Function):
         return np.right_shift(args[0], args[1], dtype=np.int32)
 
     def _py_expr(self, *args, **kwargs):
-        return "np.right_shift(%s, %s)" % (args[0], args[1])
+        return "np.right_shift(%s, %s, dtype=np.int32)" % (args[0], args[1])
 
     def _c_expr(self, *args, **kwargs):
         return "(%s>>%s)" % (args[0], args[1])
 
 
 @nargs(1)
+@ufunc(np.negative)
 @handles('__neg__')
 class Neg(Function):
 
@@ -139,7 +143,7 @@ class Neg(Function):
     def _py_expr(self, *args, **kwargs):
         return "np.negative(%s)" % args[0]
 
-    def _py_expr(self, *args, **kwargs):
+    def _c_expr(self, *args, **kwargs):
         return "(-%s)" % args[0]
 
 
@@ -202,6 +206,7 @@ class Ceil(Function):
 
 
 @nargs(2)
+@ufunc(np.maximum)
 @c_headers('<math.h>')
 class Max(Function):
 
@@ -221,6 +226,7 @@ class GapMax(Max):
 
 
 @nargs(2)
+@ufunc(np.minimum)
 @c_headers('<math.h>')
 class Min(Function):
 
@@ -355,7 +361,7 @@ class Sigmoid(Function):
         return expit(args[0])
 
     def _py_expr(self, *args, **kwargs):
-        return "np.expit(%s)" % (args[0],)
+        return "expit(%s)" % (args[0],)
 
     def _c_expr(self, *args, **kwargs):
         return f"fsigmoid({args[0]})"
@@ -397,6 +403,10 @@ class CompoundFunction(Function):
         global_dict.update(self._inner_function.collect_globals())
         return global_dict
 
+    @property
+    def inner_function(self):
+        return self._inner_function
+
     @property
     def unbound_variables(self):
         return self._inner_function.unbound_variables
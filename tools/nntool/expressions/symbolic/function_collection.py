@@ -13,14 +13,17 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import logging
 from functools import cmp_to_key, reduce
 from typing import Any, Sequence, Tuple
 
 import numpy as np
 from generation.code_block import CodeBlock
 from expressions.symbolic.quantization_base import QuantizationHandlerBase
+from expressions.symbolic.py_kernel import PyKernel
 from expressions.symbolic.symbol import Symbol, Variable
 
+LOG = logging.getLogger('nntool.' + __name__)
 
 def prod(x):
     return reduce(lambda a, b: a * b, x, 1)
@@ -70,6 +73,17 @@ class FunctionCollection():
         for var_name in self._inters:
             sym = self._vars[var_name]
             sym.ispointer = False
+        # compiled lazily on the first call. False if the functions cannot be compiled
+        self._py_kernel = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_py_kernel'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('_py_kernel', None)
 
     @property
     def input_names(self):
@@ -116,6 +130,18 @@ class FunctionCollection():
         # add one for the assignment
         return sum(sym.ops + 1 for sym in self._functions.values())
 
+    @property
+    def py_kernel(self):
+        """The functions compiled into a single Python function or None if they
+        cannot be compiled"""
+        if self._py_kernel is None:
+            try:
+                self._py_kernel = PyKernel(self.execution_order, self._functions, self._outputs)
+            except ValueError as ex:
+                LOG.debug('expression will be interpreted: %s', ex)
+                self._py_kernel = False
+        return self._py_kernel or None
+
     @property
     def c_header_set(self):
         return set().union(*[func.c_header_set for func in self._functions.values()])
@@ -286,12 +312,34 @@ class FunctionCollection():
         in_qrecs.update(out_qrecs)
         return FunctionCollection(funcs, qrecs=in_qrecs)
 
+    def _call_compiled(self, args, quantize_inputs, kwargs):
+        """Runs the compiled functions if nothing needs the symbols to be evaluated
+        one by one. Returns None if the functions must be interpreted"""
+        if (args or quantize_inputs or kwargs.get('calculate_ranges') or
+                kwargs.get('track_results') is not None or
+                any(name not in kwargs for name in self._inputs)):
+            return None
+        py_kernel = self.py_kernel
+        if py_kernel is None:
+            return None
+        try:
+            return py_kernel(kwargs)
+        #pylint: disable=broad-except
+        except Exception as ex:
+            LOG.debug('compiled expression failed - it will be interpreted: %s', ex)
+            self._py_kernel = False
+            return None
+
     def __call__(self, *args: Any, dequantize_outputs=False, quantize_inputs=False, **kwargs: Any) -> Any:
-        if quantize_inputs:
-            quantize_inputs = self._inputs
-        for sym_var in self.execution_order:
-            kwargs[sym_var.name] = self._functions[sym_var](
-                *args, quantize_inputs=quantize_inputs, **kwargs)
+        outputs = self._call_compiled(args, quantize_inputs, kwargs)
+        if outputs is not None:
+            kwargs.update(outputs)
+        else:
+            if quantize_inputs:
+                quantize_inputs = self._inputs
+            for sym_var in self.execution_order:
+                kwargs[sym_var.name] = self._functions[sym_var](
+                    *args, quantize_inputs=quantize_inputs, **kwargs)
         if dequantize_outputs:
             if self._qrecs is None:
                 raise ValueError('function collection is not quantized')
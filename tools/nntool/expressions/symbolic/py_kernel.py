@@ -0,0 +1,178 @@
+# Copyright (C) 2020  GreenWaves Technologies, SAS
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Mapping, Sequence
+
+import numpy as np
+from generation.code_block import CodeBlock
+
+from .basic import CompoundFunction
+from .function import Function
+from .symbol import Constant, Symbol, Variable
+
+
+def apply_inplace(ufunc, args, candidates):
+    """Applies ufunc to args writing the result into the first of candidates that has the
+    dtype and shape of the result. Arguments are never 0-d so the result dtype is the
+    result_type of the arguments."""
+    dtype = np.result_type(*args)
+    shape = np.broadcast(*args).shape
+    for out in candidates:
+        if out.dtype == dtype and out.shape == shape:
+            return ufunc(*args, out=out)
+    return ufunc(*args)
+
+
+class PyKernel():
+    """Compiles a set of functions into one generated Python function.
+
+    Each function is flattened into a sequence of assignments built from the py_expr of
+    its symbols. Identical sub expressions are only computed once, constant sub expressions
+    are evaluated at compile time and temporaries that are no longer needed are reused as
+    the output of elementwise ufuncs. The result is the same as calling each function in
+    execution order."""
+
+    def __init__(self, execution_order: Sequence[Variable],
+                 functions: Mapping[Variable, Symbol],
+                 outputs: Sequence[str]) -> None:
+        self._globals = {
+            'np': np,
+            'atleast_1d': np.atleast_1d,
+            'apply_inplace': apply_inplace
+        }
+        # ops are (target, expression, ufunc, args)
+        self._ops = []
+        self._exprs = {}
+        self._loads = {}
+        self._consts = {}
+        self._produced = {}
+        # temporaries that have never been passed to anything that could alias them
+        self._owned = set()
+        for var in execution_order:
+            func = functions[var]
+            if not isinstance(func, Function):
+                raise ValueError(f'{var.name} is not produced by a function')
+            self._produced[var.name] = self._ref(func)
+        self._outputs = list(outputs)
+        self._source = self._generate()
+        #pylint: disable=exec-used
+        exec(compile(self._source, '<expression kernel>', 'exec'), self._globals)
+        self._kernel = self._globals['expression_kernel']
+
+    @property
+    def source(self):
+        return self._source
+
+    def _new_temp(self):
+        return "t%s" % (len(self._ops))
+
+    def _add_op(self, expr, args, ufunc=None, owned=False):
+        target = self._new_temp()
+        self._ops.append((target, expr, ufunc, args))
+        if owned:
+            self._owned.add(target)
+        return target
+
+    def _const(self, value):
+        name = "c%s" % len(self._consts)
+        self._consts[name] = value
+        self._globals[name] = value
+        return name
+
+    def _ref(self, sym: Symbol):
+        if isinstance(sym, CompoundFunction):
+            return self._ref(sym.inner_function)
+        if isinstance(sym, Constant):
+            return self._const(sym.value)
+        if isinstance(sym, Variable):
+            return self._variable(sym)
+        if not isinstance(sym, Function):
+            raise ValueError(f'cannot compile {sym.__class__.__name__}')
+        if sym.is_constant:
+            return self._const(sym.calculate().value)
+        args = [self._ref(elem) for elem in sym.contents]
+        expr = sym._py_expr(*args)
+        target = self._exprs.get(expr)
+        if target is not None:
+            return target
+        if sym.ENVIRONMENT:
+            self._globals.update(sym.ENVIRONMENT)
+        if sym.UFUNC is not None:
+            target = self._add_op(expr, args, ufunc=sym.UFUNC, owned=True)
+        else:
+            # the result of an arbitrary expression may be a view on its arguments
+            self._owned.difference_update(args)
+            target = self._add_op(f"atleast_1d({expr})", args)
+        self._exprs[expr] = target
+        return target
+
+    def _variable(self, sym: Variable):
+        if sym.name in self._produced:
+            ref = self._produced[sym.name]
+            if sym.shape is None:
+                return ref
+            expr = f"np.reshape({ref}, {sym.shape})"
+            target = self._exprs.get(expr)
+            if target is None:
+                self._owned.discard(ref)
+                target = self._add_op(expr, [ref])
+                self._exprs[expr] = target
+            return target
+        target = self._loads.get(sym.name)
+        if target is None:
+            load = f"np.array(in_vars[{sym.name!r}])"
+            if sym.shape is not None:
+                load = f"np.reshape({load}, {sym.shape})"
+            target = self._add_op(f"atleast_1d({load})", [], owned=True)
+            self._loads[sym.name] = target
+        return target
+
+    def _generate(self):
+        output_refs = set(self._produced[name] for name in self._outputs)
+        last_use = {}
+        for idx, (_, _, _, args) in enumerate(self._ops):
+            for arg in args:
+                last_use[arg] = idx
+        code_block = CodeBlock()
+        code_block.write("def expression_kernel(in_vars):")
+        code_block.indent()
+        for idx, (target, expr, ufunc, args) in enumerate(self._ops):
+            dead = [arg for arg in dict.fromkeys(args)
+                    if last_use[arg] == idx and arg not in output_refs]
+            reusable = [arg for arg in dead if arg in self._owned]
+            if ufunc is not None and reusable:
+                code_block.write("{} = apply_inplace(np.{}, ({},), ({},))",
+                                 target, ufunc.__name__, ", ".join(args), ", ".join(reusable))
+            elif ufunc is not None:
+                code_block.write("{} = np.{}({})", target, ufunc.__name__, ", ".join(args))
+            else:
+                code_block.write("{} = {}", target, expr)
+            dead = [arg for arg in dead if arg not in self._consts]
+            if dead:
+                code_block.write("del {}", ", ".join(dead))
+        returned = set()
+        results = []
+        for name in self._outputs:
+            ref = self._produced[name]
+            # outputs must not share storage with each other or with a bound constant
+            if ref in returned or ref in self._consts:
+                ref = f"{ref}.copy()"
+            returned.add(ref)
+            results.append(f"{name!r}: {ref}")
+        code_block.write("return {{{}}}", ", ".join(results))
+        return str(code_block)
+
+    def __call__(self, in_vars):
+        return self._kernel(in_vars)
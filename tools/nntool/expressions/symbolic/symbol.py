@@ -77,6 +77,7 @@ class Symbol():
     ENVIRONMENT = None
     COUNTS = {}
     C_HEADERS = []
+    UFUNC = None
 
 #pylint: disable=unused-argument
     def __init__(self, *args, name="", shape=None, dtype=np.float32, qrec: QuantInfoBase = None, **kwargs):
@@ -217,6 +218,11 @@ class Symbol():
     def c_headers(*headers):
         return Symbol.property_register("C_HEADERS", headers)
 
+    @staticmethod
+    def ufunc(func):
+        """Marks a symbol whose _impl is exactly func applied to its arguments"""
+        return Symbol.property_register("UFUNC", func)
+
     @property
     def sym_c_headers(self):
         return self.C_HEADERS
@@ -300,6 +306,7 @@ handles = Symbol.handles
 handlesr = Symbol.handlesr
 environment = Symbol.environment
 c_headers = Symbol.c_headers
+ufunc = Symbol.ufunc
 
 
 @environment({
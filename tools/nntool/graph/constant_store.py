@@ -20,9 +20,7 @@ import math
 from collections import namedtuple
 
 import numpy as np
-from scipy.cluster.vq import vq
-from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_score
+from utils.codebook_quantizer import CodebookQuantizer, codebook_lookup
 from utils.stats_funcs import qsnr
 
 LOG = logging.getLogger("nntool." + __name__)
@@ -58,8 +56,8 @@ class ConstantStore:
             return None
         if val[2] is None:
             return None
-        codes = vq(val[1].flatten().reshape((-1, 1)), val[2].codebook)
-        return codes[0], val[2].codebook, val[2].bits
+        codes = codebook_lookup(val[1].flatten(), val[2].codebook)
+        return codes, val[2].codebook, val[2].bits
 
     def get_compressed_size(self, node, idx):
         node_vals = self._values.get(node)
@@ -95,13 +93,15 @@ class ConstantStore:
         if val.size <= 4:
             LOG.warning('value in node %s is too small to compress', node.name)
             return None
+        # the histogram of the values is built once and shared by all the bit widths tried
+        quantizer = CodebookQuantizer(flattened_val)
         if bits is not None:
             bins = int(math.pow(2, bits))
             if bins > val.size:
                 bits = max(int(math.floor(math.log2(val.size))), 2)
                 bins = int(math.pow(2, bits))
                 LOG.warning('more bins than values for node %s - reducing to %s bits', node.name, bits)
-            compressed_val, codes, codebook = self.cluster(bins, flattened_val, val)
+            compressed_val, codes, codebook = self.cluster(bins, quantizer, val)
         elif min_qsnr:
             cur_qsnr = -math.inf
             bits = 1
@@ -114,20 +114,22 @@ class ConstantStore:
                 if bins > val.size:
                     LOG.warning('value in node %s cannot be reduced in size - not compressing', node.name)
                     return None
-                compressed_val, codes, codebook = self.cluster(bins, flattened_val, val)
+                compressed_val, codes, codebook = self.cluster(bins, quantizer, val)
                 cur_qsnr = qsnr(compressed_val.astype(
                     np.float32), val.astype(np.float32))
         else:
             # automatic search of optimal k with inertia method
+            clusterings = []
             silhouette = []
             inertia = []
             for bits in range(2, 9):
                 bins = int(math.pow(2, bits))
                 if bins > val.size - 1:
                     break
-                compressed_val, codes, codebook = self.cluster(bins, flattened_val, val, inertia=inertia)
-                silhouette.append(silhouette_score(flattened_val.reshape(-1, 1),
-                                                   compressed_val.flatten()))
+                centers, splits, cur_inertia = quantizer.kmeans(bins)
+                clusterings.append(centers)
+                inertia.append(cur_inertia)
+                silhouette.append(quantizer.silhouette(splits))
             if len(inertia) <= 1:
                 compressed_val, codes, codebook = self.encode_shorter(flattened_val, val)
             else:
@@ -139,9 +141,9 @@ class ConstantStore:
                 else:
                     elb_idx = 1
                 # take the three around the elbow and look at the silhouette
-                bits = np.argmax(np.array(silhouette[elb_idx-1:elb_idx+1])) + elb_idx + 1
-                bins = int(math.pow(2, bits))
-                compressed_val, codes, codebook = self.cluster(bins, flattened_val, val)
+                bits = int(np.argmax(np.array(silhouette[elb_idx-1:elb_idx+1])) + elb_idx + 1)
+                compressed_val, codes, codebook = self.encode(
+                    clusterings[bits - 2], quantizer, val)
         # see if sparse representation is better
         # TODO - this is not entirely correct since it is not accounting for the extra bin created by the sparse value
         freqs = np.unique(codes, return_counts=True)
@@ -170,21 +172,20 @@ class ConstantStore:
         return compressed_val, codes, codebook
 
     @staticmethod
-    def cluster(bins, flattened_val, val, inertia=None):
-        kmeans = KMeans(n_clusters=bins)
-        kmeans.fit(flattened_val.reshape((-1, 1)))
-        codebook = kmeans.cluster_centers_
-        codebook = codebook.astype(val.dtype).flatten()
-        compressed_val, codes = ConstantStore.codes_and_compressed(flattened_val, codebook, val.shape)
-        if inertia is not None:
-            inertia.append(kmeans.inertia_)
-        return compressed_val, codes, codebook
+    def cluster(bins, quantizer, val):
+        centers, _, _ = quantizer.kmeans(bins)
+        return ConstantStore.encode(centers, quantizer, val)
+
+    @staticmethod
+    def encode(centers, quantizer, val):
+        codebook = centers.astype(val.dtype)
+        codes = quantizer.codes(codebook)
+        return codebook[codes].reshape(val.shape), codes, codebook
 
     @staticmethod
     def codes_and_compressed(flattened_val, codebook, val_shape):
-        codes = vq(flattened_val, codebook)[0]
-        compressed_val = np.array(
-            [codebook[code] for code in codes]).reshape(val_shape)
+        codes = codebook_lookup(flattened_val, codebook)
+        compressed_val = codebook[codes].reshape(val_shape)
         return compressed_val, codes
 
     @property
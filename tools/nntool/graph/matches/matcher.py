@@ -15,6 +15,7 @@
 
 import logging
 from abc import ABC, abstractmethod
+from time import perf_counter
 from typing import Generator, Sequence
 
 from utils.graph import GraphView, MatchNode, Node
@@ -72,7 +73,7 @@ class Matcher(ABC):
 
     @staticmethod
     def needs_valid_dimension(val):
-        return Matcher.property_register("DESCRIPTION", val)
+        return Matcher.property_register("NEEDS_VALID_DIMENSION", val)
 
     @staticmethod
     def modifies_dimensions(val):
@@ -120,18 +121,37 @@ class DefaultMatcher(Matcher):
     def replace_function(self, G: GraphView, subgraph: GraphView) -> Node:
         pass
 
+    @staticmethod
+    def _neighbourhood(G: GraphView, subgraph: GraphView):
+        """Names of the nodes of subgraph and of the nodes connected to them"""
+        names = set()
+        for node in subgraph.nodes():
+            names.add(node.name)
+            names.update(edge.from_node.name for edge in G.in_edges(node.name))
+            names.update(edge.to_node.name for edge in G.out_edges(node.name))
+        return names
+
     def _match(self, G: GraphView, set_identity: bool = True, **kwargs) -> bool:
-        replaced = True
         has_modified_graph = False
+        replaced = True
         while replaced:
             replaced = False
+            # all the matches found by one scan are replaced unless a previous replacement
+            # touched them. Only if something was replaced is the graph scanned again to
+            # find the matches that were skipped or created by the replacements.
+            touched = set()
             for subgraph in self.match_function(G):
-                # TODO - Save in and out edges here since the replace function may modify the
+                nodes = subgraph.nodes()
+                if any(node.name in touched or node.name not in G or G[node.name] is not node
+                       for node in nodes):
+                    continue
+                # Save in and out edges here since the replace function may modify the
                 # subgraph
                 in_edges = [in_edge for input_node in subgraph.inputs()
                             for in_edge in G.in_edges(input_node.name)]
                 out_edges = [out_edge for output_node in subgraph.outputs()
                              for out_edge in G.out_edges(output_node.name)]
+                neighbourhood = self._neighbourhood(G, subgraph)
                 try:
                     replacement, edge_in_mapping, edge_out_mapping = self.replace_function(
                         G, subgraph)
@@ -151,7 +171,7 @@ class DefaultMatcher(Matcher):
                         raise TypeError(
                             "unexcepted return value from replace_function")
                     replaced = True
-                    break
+                    touched.update(neighbourhood)
                 except DontReplaceError:
                     pass
 
@@ -161,40 +181,96 @@ class DefaultMatcher(Matcher):
         return has_modified_graph
 
 
-# This can be used to define groups of matches to be selected
-# from the command line
-# It also can be inherited to group matches together
+class MatchTimings():
+    """Time spent in and number of modifications made by each matcher of a group"""
+
+    def __init__(self):
+        self._timings = {}
+        self._dimensions_time = 0
+        self._dimensions_count = 0
+
+    def add(self, name, elapsed, modified):
+        timing = self._timings.setdefault(name, {'runs': 0, 'modified': 0, 'time': 0})
+        timing['runs'] += 1
+        timing['modified'] += 1 if modified else 0
+        timing['time'] += elapsed
+
+    def add_dimensions(self, elapsed):
+        self._dimensions_count += 1
+        self._dimensions_time += elapsed
+
+    @property
+    def total_time(self):
+        return sum(timing['time'] for timing in self._timings.values()) + self._dimensions_time
+
+    def rows(self):
+        """[name, runs, modifications, seconds] for each matcher slowest first followed by
+        the dimension updates"""
+        rows = sorted([[name, timing['runs'], timing['modified'], timing['time']]
+                       for name, timing in self._timings.items()],
+                      key=lambda x: x[3], reverse=True)
+        rows.append(['add_dimensions', self._dimensions_count, 0, self._dimensions_time])
+        return rows
+
+
 class MatchGroup(Matcher):
 
     def __init__(self, *args: Sequence[Matcher], identity: str = None):
         super().__init__(identity)
         self.matches = list(args)
+        self._timings = None
 
     def add_match(self, match: Matcher):
         self.matches.append(match)
 
+    @property
+    def timings(self):
+        return self._timings
+
     def _match(self, G: GraphView, set_identity: bool = True, **kwargs):
-        # Note: assumption is that dimensions are valid when a match is called
-        found_match = True
+        # Note: assumption is that dimensions are valid when a match is called.
+        # Matchers are run in order until none of them modifies the graph. A matcher that
+        # did not modify the graph is not run again until another matcher has modified it
+        # and dimensions are only updated before running a matcher after a modification.
+        self._timings = MatchTimings()
+        modifications = 0
+        clean_at = [None] * len(self.matches)
         dimensions_set = True
+        found_match = True
         while found_match:
             found_match = False
-            for match_instance in self.matches:
-                LOG.debug("fusions - start %s", match_instance.name)
-                if match_instance.NEEDS_VALID_DIMENSION and not dimensions_set:
-                    G.add_dimensions(quiet=True)
+            for idx, match_instance in enumerate(self.matches):
+                if clean_at[idx] == modifications:
+                    continue
+                if not dimensions_set:
+                    self._update_dimensions(G)
                     dimensions_set = True
+                LOG.debug("fusions - start %s", match_instance.name)
+                start = perf_counter()
                 has_modified_graph = match_instance.match(
                     G, set_identity=False, group_identity=self._identity)
+                self._timings.add(match_instance.name, perf_counter() - start, has_modified_graph)
                 if has_modified_graph:
                     LOG.info("++ fusion %s modified graph", match_instance.name)
                     found_match = True
-                    G.add_dimensions(quiet=True)
-                if dimensions_set and has_modified_graph:
-                    dimensions_set = False
+                    modifications += 1
+                    if match_instance.MODIFIES_DIMENSIONS:
+                        dimensions_set = False
+                else:
+                    clean_at[idx] = modifications
+        if not dimensions_set:
+            self._update_dimensions(G)
+        LOG.info("fusions took %.3fs", self._timings.total_time)
+        for name, runs, modified, elapsed in self._timings.rows():
+            LOG.debug("fusions - %s: %d runs %d modifications %.3fs", name, runs, modified, elapsed)
         if set_identity:
             self.set_identity(G)
 
+    def _update_dimensions(self, G):
+        start = perf_counter()
+        G.add_dimensions(quiet=True)
+        self._timings.add_dimensions(perf_counter() - start)
+
 
 def find_forward(G: GraphView, edge, find_node_classes, skip_node_classes=None, find_skip=None):
     if find_skip is None:
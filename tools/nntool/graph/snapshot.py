@@ -0,0 +1,202 @@
+# Copyright (C) 2020  GreenWaves Technologies, SAS
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import io
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+
+import numpy as np
+from _version import __version__
+
+LOG = logging.getLogger('nntool.' + __name__)
+
+# bump if the layout of the file changes
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b'NNTSNAP\0'
+# magic and header length
+PREAMBLE = struct.Struct('<8sQ')
+# tensors smaller than this are left in the pickle
+MIN_TENSOR_BYTES = 1024
+TENSOR_ALIGNMENT = 64
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def nntool_sources_stamp():
+    """Changes if nntool or any of its source files changes. Pickled objects are only
+    valid with the code that wrote them."""
+    nntool_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    count = 0
+    latest = 0
+    for dirpath, _, filenames in os.walk(nntool_dir):
+        for filename in filenames:
+            if filename.endswith('.py'):
+                count += 1
+                latest = max(latest, os.stat(os.path.join(dirpath, filename)).st_mtime_ns)
+    return [__version__, nntool_dir, count, latest]
+
+
+def _can_map(obj):
+    return (type(obj) is np.ndarray and obj.dtype.isbuiltin and
+            obj.dtype.kind in 'biufc' and obj.nbytes >= MIN_TENSOR_BYTES)
+
+
+class _TensorPickler(pickle.Pickler):
+    """Pickler that writes large arrays to a separate content addressed store.
+
+    Each array object is referenced by its index so arrays that were shared stay shared.
+    Arrays with identical contents share storage in the file."""
+
+    def __init__(self, file, blobs, drop=None):
+        super().__init__(file, protocol=4)
+        self._blobs = blobs
+        self._arrays = {}
+        # keep the arrays alive so that their ids are not reused during the dump
+        self._keep = []
+        self._drop = set(id(obj) for obj in drop or [])
+
+    def persistent_id(self, obj):
+        if id(obj) in self._drop:
+            return ('drop',)
+        if not _can_map(obj):
+            return None
+        ref = self._arrays.get(id(obj))
+        if ref is None:
+            data = np.ascontiguousarray(obj)
+            digest = hashlib.sha1(data.data).hexdigest()
+            self._blobs.setdefault(digest, data)
+            ref = (len(self._arrays), digest)
+            self._arrays[id(obj)] = ref
+            self._keep.append(obj)
+        return ('tensor', ref[0], ref[1], obj.dtype.str, obj.shape)
+
+
+class _TensorUnpickler(pickle.Unpickler):
+    def __init__(self, file, buffer, offsets):
+        super().__init__(file)
+        self._buffer = buffer
+        self._offsets = offsets
+        self._arrays = {}
+
+    def persistent_load(self, pid):
+        if pid[0] == 'drop':
+            return None
+        if pid[0] != 'tensor':
+            raise pickle.UnpicklingError(f'unknown persistent id {pid[0]}')
+        _, array_idx, digest, dtype, shape = pid
+        array = self._arrays.get(array_idx)
+        if array is None:
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape, dtype=np.int64))
+            array = np.frombuffer(self._buffer, dtype=dtype, count=count,
+                                  offset=self._offsets[digest]).reshape(shape)
+            self._arrays[array_idx] = array
+        return array
+
+
+def save_snapshot(G, filename, state=None):
+    """Saves G, its quantization and constants and the picklable dict state to filename.
+
+    The graph is pickled apart from arrays of more than MIN_TENSOR_BYTES which are written
+    once per unique content after the pickle so that they can be memory mapped on load."""
+    blobs = {}
+    pickle_file = io.BytesIO()
+    # the imported model and the function that reloads it are not saved
+    drop = [obj for obj in (getattr(G, 'model', None), getattr(G, 'load_function', None))
+            if obj is not None]
+    _TensorPickler(pickle_file, blobs, drop=drop).dump({'G': G, 'state': state})
+    pickled = pickle_file.getvalue()
+
+    def align(offset):
+        return (offset + TENSOR_ALIGNMENT - 1) // TENSOR_ALIGNMENT * TENSOR_ALIGNMENT
+
+    # the header holds the tensor offsets so its size depends on them. Offsets are
+    # relative to the start of the tensor area which follows the header and pickle.
+    offsets = {}
+    offset = 0
+    for digest, data in blobs.items():
+        offsets[digest] = offset
+        offset = align(offset + data.nbytes)
+    header = {
+        'version': SNAPSHOT_VERSION,
+        'sources_stamp': nntool_sources_stamp(),
+        'pickle_len': len(pickled),
+        'tensors': offsets,
+        'tensor_bytes': offset
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    tensor_start = align(PREAMBLE.size + len(header_bytes) + len(pickled))
+
+    dirname = os.path.dirname(os.path.abspath(filename))
+    tmp_fd, tmp_file = tempfile.mkstemp(suffix='.tmp', dir=dirname)
+    try:
+        with os.fdopen(tmp_fd, 'wb') as fp:
+            fp.write(PREAMBLE.pack(SNAPSHOT_MAGIC, len(header_bytes)))
+            fp.write(header_bytes)
+            fp.write(pickled)
+            for digest, data in blobs.items():
+                fp.seek(tensor_start + offsets[digest])
+                fp.write(data.data)
+            fp.truncate(tensor_start + offset)
+        os.replace(tmp_file, filename)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    LOG.info("saved snapshot to %s: %d unique tensors, %d bytes",
+             filename, len(blobs), tensor_start + offset)
+
+
+def read_snapshot_header(fp):
+    preamble = fp.read(PREAMBLE.size)
+    if len(preamble) != PREAMBLE.size:
+        raise SnapshotError('file is too short to be a snapshot')
+    magic, header_len = PREAMBLE.unpack(preamble)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError('file is not a snapshot')
+    header = json.loads(fp.read(header_len).decode('utf-8'))
+    if header.get('version') != SNAPSHOT_VERSION:
+        raise SnapshotError(f"snapshot version {header.get('version')} is not supported")
+    if header.get('sources_stamp') != nntool_sources_stamp():
+        raise SnapshotError('snapshot was saved by a different version of nntool')
+    return header, PREAMBLE.size + header_len
+
+
+def load_snapshot(filename):
+    """Loads a snapshot written by save_snapshot. Returns the graph and the saved state.
+
+    Tensors are copy on write memory maps of the file so they are only read when used
+    and can be modified without changing the file."""
+    with open(filename, 'rb') as fp:
+        header, pickle_start = read_snapshot_header(fp)
+        pickled = fp.read(header['pickle_len'])
+        tensor_start = pickle_start + header['pickle_len']
+        tensor_start = ((tensor_start + TENSOR_ALIGNMENT - 1) //
+                        TENSOR_ALIGNMENT * TENSOR_ALIGNMENT)
+        if header['tensor_bytes']:
+            buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_COPY)
+            buffer = memoryview(buffer)[tensor_start:]
+        else:
+            buffer = None
+    contents = _TensorUnpickler(io.BytesIO(pickled), buffer, header['tensors']).load()
+    return contents['G'], contents['state']
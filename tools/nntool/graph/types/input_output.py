@@ -137,6 +137,9 @@ class ConstantInputParameters(InputBaseParameters):
     def __init__(self, *args, adjust_transpose=None, is_mutated=False,
                  is_intermediate=False, always_copy=False, value=None, qtype=None, **kwargs):
         super(ConstantInputParameters, self).__init__(*args, **kwargs)
+        # read only quantized values keyed by the qtypes they were quantized from and to
+        self._quantized = {}
+        self._quantized_source = None
         self.value = value
         del self.at_options.valid_options['FIXED_ORDER']
         self.at_options.valid_options['RESET_NAME'] = str
@@ -176,6 +179,7 @@ class ConstantInputParameters(InputBaseParameters):
     @qtype.setter
     def qtype(self, val):
         self._qtype = val
+        self.clear_quantized()
 
     @property
     def dqvalue(self):
@@ -193,14 +197,16 @@ class ConstantInputParameters(InputBaseParameters):
         return self._constant_store
 
     @property
-    def value(self):
+    def _stored_value(self):
         if self._constant_store:
             # compressed returns the real value with the error induced by the compression
-            value = self._constant_store.get(
+            return self._constant_store.get(
                 self, 0, compressed=self._use_compressed)
-        else:
-            value = self._value
+        return self._value
 
+    @property
+    def value(self):
+        value = self._stored_value
         if self._always_copy and isinstance(value, np.ndarray):
             return value.copy()
         return value
@@ -211,6 +217,7 @@ class ConstantInputParameters(InputBaseParameters):
             self._constant_store.set(self, 0, val)
         else:
             self._value = val
+        self.clear_quantized()
 
     def value_as(self, qtype, generation=False):
         # handles both None or both equal
@@ -222,6 +229,31 @@ class ConstantInputParameters(InputBaseParameters):
         # need to dequantize maybe need to quantize
         return qtype.quantize(self.dqvalue) if qtype else self.dqvalue
 
+    def cached_value_as(self, qtype):
+        """value_as for execution. The result is read only and is reused until the value
+        or either qtype changes. Mutated or always copied constants are not cached."""
+        if self._is_mutated or self._always_copy:
+            return self.value_as(qtype)
+        # the constant store may replace the value so check that it is the same object
+        source = self._stored_value
+        if source is not self._quantized_source:
+            self.clear_quantized()
+            self._quantized_source = source
+        key = (None if self._qtype is None else self._qtype.cache_key,
+               None if qtype is None else qtype.cache_key)
+        value = self._quantized.get(key)
+        if value is None:
+            value = self.value_as(qtype)
+            if isinstance(value, np.ndarray):
+                value = value.view()
+                value.flags.writeable = False
+            self._quantized[key] = value
+        return value
+
+    def clear_quantized(self):
+        self._quantized = {}
+        self._quantized_source = None
+
     @property
     def concated_nodes(self):
         return self._concated_nodes
@@ -269,6 +301,7 @@ class ConstantInputParameters(InputBaseParameters):
     @use_compressed.setter
     def use_compressed(self, val):
         self._use_compressed = val
+        self.clear_quantized()
 
     @property
     def is_constant(self):
@@ -310,6 +343,18 @@ class ConstantInputParameters(InputBaseParameters):
     def get_parameters(self):
         return {'value': self.value}
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # quantized values are recreated on first use
+        state['_quantized'] = {}
+        state['_quantized_source'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if '_quantized' not in state:
+            self.clear_quantized()
+
     def set_parameters(self, val):
         self.value = val['value']
 
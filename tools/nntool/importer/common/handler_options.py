@@ -13,6 +13,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import json
+import logging
+import os
+
+LOG = logging.getLogger('nntool.' + __name__)
+
+# bump if the manifest format changes
+MANIFEST_VERSION = 1
+OPTION_TYPES = {val_type.__name__: val_type for val_type in (str, int, float, bool)}
+
 
 class HandlerOptions():
     HANDLER_OPTIONS = []
@@ -51,3 +61,72 @@ class HandlerOptions():
 
 #pylint: disable=invalid-name
 handler_option = HandlerOptions.handler_option
+
+
+def importer_sources_stamp():
+    """Changes if any of the importer source files changes"""
+    importer_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    count = 0
+    latest = 0
+    for dirpath, _, filenames in os.walk(importer_dir):
+        for filename in filenames:
+            if filename.endswith('.py'):
+                count += 1
+                latest = max(latest, os.stat(os.path.join(dirpath, filename)).st_mtime_ns)
+    return [MANIFEST_VERSION, importer_dir, count, latest]
+
+
+def handler_options_manifest(manifest_file):
+    """Returns the options from get_all_handler_options without importing the importers.
+    The options are read from the manifest_file which is rebuilt by loading all the
+    importers if it is missing or any importer source file has changed since it was
+    written."""
+    stamp = importer_sources_stamp()
+    try:
+        with open(manifest_file) as fp:
+            manifest = json.load(fp)
+        if manifest['stamp'] == stamp:
+            return {name: dict(option, val_type=OPTION_TYPES[option['val_type']])
+                    for name, option in manifest['options'].items()}
+    except (OSError, ValueError, KeyError):
+        pass
+    # pylint: disable=import-outside-toplevel,unused-import
+    import importer.importer
+    options = HandlerOptions.get_all_handler_options()
+    manifest = {
+        'stamp': stamp,
+        'options': {name: dict(option, val_type=option['val_type'].__name__)
+                    for name, option in options.items()}
+    }
+    try:
+        with open(manifest_file + '.tmp', 'w') as fp:
+            json.dump(manifest, fp, indent=2)
+        os.replace(manifest_file + '.tmp', manifest_file)
+    except OSError as ex:
+        LOG.debug("unable to write handler options manifest: %s", ex)
+    return options
+
+
+def add_open_options(parser, options=None):
+    """Add all the options defined by import handlers to parser. If a boolean option
+    has a default of True then add a --no-option-name flag option."""
+    if options is None:
+        options = HandlerOptions.get_all_handler_options()
+    for option in options.values():
+        add_kwargs = {}
+        if option['val_type'] == bool and option['default']:
+            add_args = [f'--no_{option["name"]}']
+            add_kwargs['help'] = f'disable option {option["name"]}: {option["desc"]}'
+        elif option['shortcut']:
+            add_args = [f'-{option["shortcut"]}', f'--{option["name"]}']
+            add_kwargs['help'] = option['desc']
+        else:
+            add_args = [f'--{option["name"]}']
+            add_kwargs['help'] = option['desc']
+        if option['val_type'] == bool:
+            add_kwargs['action'] = 'store_true'
+        else:
+            add_kwargs['type'] = option['val_type']
+            add_kwargs['default'] = option['default']
+
+        parser.add_argument(*add_args, **add_kwargs)
@@ -15,15 +15,18 @@
 
 import argparse
 import logging
+from multiprocessing import Pool
 
 from cmd2 import Cmd2ArgumentParser, with_argparser
 from interpreter.nntool_shell_base import (NNToolShellBase,
                                            store_once_in_history)
-from interpreter.shell_utils import glob_input_files, input_options
+from interpreter.shell_utils import (batch_input_files, batch_options,
+                                     glob_input_files, input_options,
+                                     stack_batch)
 from quantization.handlers_helpers import (add_options_to_parser,
                                            get_options_from_args)
 from quantization.unified_quantizer import UnifiedQuantizer
-from utils.data_importer import import_data
+from utils.dataset_loader import import_batches
 from utils.stats_funcs import STATS_BITS
 
 from graph.matches.matchers.remove_unnecessary_quantize_operators import RemoveUnnecessaryQuantizeOperators
@@ -33,6 +36,61 @@ LOG = logging.getLogger('nntool.'+__name__)
 
 QUANTIZATION_SCHEMES = ['SQ8', 'POW2']
 
+# state of a calibration worker process set once by _init_worker
+WORKER_STATE = {}
+
+
+def collect_batches(G, stats_collector, file_batches, input_args, batch_size, loader_args=None):
+    processed_input = False
+    for files_batch, data in import_batches(file_batches, input_args, **(loader_args or {})):
+        LOG.info("input files %s", files_batch)
+        processed_input = True
+        if batch_size > 1:
+            stats_collector.collect_stats(
+                G, stack_batch(data), batch_size=len(data))
+        else:
+            stats_collector.collect_stats(G, data[0])
+    return processed_input
+
+
+def _init_worker(G, input_args, batch_size, loader_args):
+    WORKER_STATE['G'] = G
+    WORKER_STATE['input_args'] = input_args
+    WORKER_STATE['batch_size'] = batch_size
+    WORKER_STATE['loader_args'] = loader_args
+
+
+def _collect_shard(file_batches):
+    stats_collector = ActivationRangesCollector()
+    collect_batches(WORKER_STATE['G'], stats_collector, file_batches,
+                    WORKER_STATE['input_args'], WORKER_STATE['batch_size'],
+                    loader_args=WORKER_STATE['loader_args'])
+    return stats_collector
+
+
+def collect_batches_parallel(G, stats_collector, file_batches, input_args, batch_size, jobs,
+                             loader_args=None):
+    """Split the batches into consecutive shards collected by a pool of jobs processes.
+    The partial ranges are merged in shard order so the result is the same as collecting
+    all the batches in one process."""
+    file_batches = list(file_batches)
+    if not file_batches:
+        return False
+    # more shards than processes to even out the load
+    num_shards = min(len(file_batches), jobs * 4)
+    shard_size, rem = divmod(len(file_batches), num_shards)
+    shards = []
+    start = 0
+    for idx in range(num_shards):
+        end = start + shard_size + (1 if idx < rem else 0)
+        shards.append(file_batches[start:end])
+        start = end
+    with Pool(min(jobs, num_shards), initializer=_init_worker,
+              initargs=(G, input_args, batch_size, loader_args)) as pool:
+        for partial_collector in pool.imap(_collect_shard, shards):
+            stats_collector.merge(partial_collector)
+    return True
+
 
 class AquantCommand(NNToolShellBase):
     # AQUANT COMMAND
@@ -47,6 +105,11 @@ class AquantCommand(NNToolShellBase):
                                help='quantize with scaling factors (TFlite quantization-like) [default] or POW2')
     add_options_to_parser(parser_aquant)
     input_options(parser_aquant)
+    batch_options(parser_aquant)
+    parser_aquant.add_argument('--jobs',
+                               type=int, default=1,
+                               help='number of processes used to collect the activation ranges. ' +
+                               'The input files are split between the processes')
 
     @with_argparser(parser_aquant)
     @store_once_in_history
@@ -61,13 +124,17 @@ Attempt to calculate quantization for graph using one or more sample input files
             astats = self.history_stats
         else:
             input_args = self._get_input_args(args)
-            processed_input = False
-            for file_per_input in glob_input_files(args.input_files, self.G.num_inputs):
-                LOG.info("input file %s", file_per_input)
-                processed_input = True
-                data = [import_data(input_file, **input_args)
-                        for input_file in file_per_input]
-                stats_collector.collect_stats(self.G, data)
+            file_batches = batch_input_files(glob_input_files(args.input_files, self.G.num_inputs),
+                                             batch_size=args.batch_size)
+            loader_args = self._get_loader_args()
+            if args.jobs > 1:
+                processed_input = collect_batches_parallel(
+                    self.G, stats_collector, file_batches, input_args, args.batch_size, args.jobs,
+                    loader_args=loader_args)
+            else:
+                processed_input = collect_batches(
+                    self.G, stats_collector, file_batches, input_args, args.batch_size,
+                    loader_args=loader_args)
             if not processed_input:
                 self.perror("No input files found")
                 return
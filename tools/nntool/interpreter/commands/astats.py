@@ -18,10 +18,10 @@ import logging
 from cmd2 import Cmd2ArgumentParser, with_argparser
 from interpreter.nntool_shell_base import NNToolShellBase, no_history
 from interpreter.shell_utils import (output_table, table_options, input_options,
-                                     glob_input_files)
+                                     glob_input_files, batch_input_files)
 from reports.activation_reporter import ActivationReporter
 from stats.activation_stats_collector import ActivationStatsCollector
-from utils.data_importer import import_data
+from utils.dataset_loader import import_batches
 
 LOG = logging.getLogger("nntool")
 
@@ -37,6 +37,10 @@ class AstatsCommand(NNToolShellBase):
                                type=int,
                                nargs=(1, 2),
                                help='display information by channel for step. You can indicate a fusion step with two values. The step_idx and the idx of the node in the fusion.')
+    parser_astats.add_argument('--quantile_samples',
+                               type=int, default=None,
+                               help='approximate the quartiles used to count outliers on about ' +
+                               'this number of elements of each tensor or channel')
     table_options(parser_astats, default_width=180)
     input_options(parser_astats)
 
@@ -47,7 +51,7 @@ class AstatsCommand(NNToolShellBase):
 Calculate activation statistics on one or more input files."""
         self._check_graph()
         input_args = self._get_input_args(args)
-        stats_collector = ActivationStatsCollector()
+        stats_collector = ActivationStatsCollector(quantile_samples=args.quantile_samples)
         step_idx = args.step
         if step_idx is not None:
             if len(step_idx) == 1:
@@ -57,10 +61,11 @@ Calculate activation statistics on one or more input files."""
         if len(args.input_files) == 0:
             self.perror("You must enter some files to process")
             return
-        for file_per_input in glob_input_files(args.input_files, self.G.num_inputs):
-            LOG.info("input file %s", file_per_input)
-            data = [import_data(input_file, **input_args) for input_file in file_per_input]
-            stats_collector.collect_stats(self.G, data)
+        for files_batch, data in import_batches(
+                batch_input_files(glob_input_files(args.input_files, self.G.num_inputs)),
+                input_args, **self._get_loader_args()):
+            LOG.info("input file %s", files_batch[0])
+            stats_collector.collect_stats(self.G, data[0])
 
         fmt = ('tab' if args.output is None else args.output['fmt'])
         tab = ActivationReporter(do_totals=(fmt != "csv"),
@@ -97,6 +97,7 @@ specific step of the graph."""
             qmode = QuantizationMode.all_float_quantize_dequantize()
         else:
             qmode = QuantizationMode.none()
+        qmode.float_dtype = self._get_float_dtype()
         if args.step is not None:
             step = args.step
             num_steps = len(self.G.graph_state.steps)
@@ -116,7 +117,7 @@ specific step of the graph."""
             LOG.info("input file %s", file_per_input)
             data = [import_data(input_file, **input_args) for input_file in file_per_input]
             qrecs = None if qmode.is_none else self.G.quantization
-            executer = GraphExecuter(self.G, qrecs=qrecs)
+            executer = GraphExecuter(self.G, qrecs=qrecs, cache=self._get_execution_cache())
             outputs = executer.execute(data, step_idx_limit=step,
                                        qmode=qmode)
 
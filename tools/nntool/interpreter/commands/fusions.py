@@ -17,6 +17,7 @@ import texttable
 from cmd2 import Cmd2ArgumentParser, with_argparser
 from interpreter.nntool_shell_base import NNToolShellBase
 
+from graph.matches.matcher import MatchGroup
 from graph.matches.matches import (get_fusion, get_fusions,
                                    get_pow2_match_group,
                                    get_scale8_match_group)
@@ -43,6 +44,9 @@ class FusionsCommand(NNToolShellBase):
     parser_fustions_exclusive.add_argument('--scale8',
                                            action='store_true',
                                            help='apply standard fusions for AutoTiler SQ8 kernels')
+    parser_fusions.add_argument('--timings',
+                                action='store_true',
+                                help='show the time spent in each fusion')
 
     @with_argparser(parser_fusions)
     def do_fusions(self, args):
@@ -72,5 +76,17 @@ Carry out the default set of fusions on the graph"""
         for fusion in fusions:
             fusion.match(self.G)
         self.G.add_dimensions()
+        if args.timings:
+            table = texttable.Texttable()
+            table.set_cols_align(['l', 'r', 'r', 'r'])
+            table.set_cols_dtype(['t', 'i', 'i', 'f'])
+            table.set_max_width(120)
+            rows = []
+            for fusion in fusions:
+                if isinstance(fusion, MatchGroup):
+                    rows.extend(fusion.timings.rows())
+            if rows:
+                table.add_rows([['Name', 'Runs', 'Modified', 'Seconds']] + rows)
+                self.poutput(table.draw())
         if self.G.quantization and not self.G.quantization.verify_quantization(self.G):
             self.G.quantization = None
@@ -18,7 +18,7 @@ import logging
 import os
 
 from cmd2 import Cmd, Cmd2ArgumentParser, with_argparser
-from importer.common.handler_options import HandlerOptions
+from importer.common.handler_options import HandlerOptions, add_open_options
 from importer.importer import create_graph
 from interpreter.nntool_shell_base import NNToolShellBase
 from quantization.cross_layer_range_eq import weight_equalization
@@ -31,29 +31,6 @@ NO_GRAPH = {
     'tensor_file': ""
 }
 
-def add_open_options(parser):
-    # add all the options defined by import handlers
-    # if a boolean option has a default of True then add a --no-option-name
-    # flag option
-    for option in HandlerOptions.get_all_handler_options().values():
-        add_kwargs = {}
-        if option['val_type'] == bool and option['default']:
-            add_args = [f'--no_{option["name"]}']
-            add_kwargs['help'] = f'disable option {option["name"]}: {option["desc"]}'
-        elif option['shortcut']:
-            add_args = [f'-{option["shortcut"]}', f'--{option["name"]}']
-            add_kwargs['help'] = option['desc']
-        else:
-            add_args = [f'--{option["name"]}']
-            add_kwargs['help'] = option['desc']
-        if option['val_type'] == bool:
-            add_kwargs['action'] = 'store_true'
-        else:
-            add_kwargs['type'] = option['val_type']
-            add_kwargs['default'] = option['default']
-
-        parser.add_argument(*add_args, **add_kwargs)
-
 class OpenCommand(NNToolShellBase):
     STATE_EXTENSION = '.json'
 
@@ -13,11 +13,13 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import numpy as np
 from cmd2 import Cmd2ArgumentParser, with_argparser
 from interpreter.nntool_shell_base import NNToolShellBase, no_history
-from interpreter.shell_utils import (glob_input_files, input_options,
-                                     output_table, table_options)
-from utils.data_importer import import_data
+from interpreter.shell_utils import (batch_input_files, batch_options,
+                                     glob_input_files, input_options,
+                                     output_table, stack_batch, table_options)
+from utils.dataset_loader import import_batches
 from stats.step_error_stats_collector import StepErrorStatsCollector
 from stats.error_stats_collector import ErrorStatsCollector
 from reports.error_reporter import ErrorReporter
@@ -34,10 +36,15 @@ class QerrorCommand(NNToolShellBase):
                                action='store_true',
                                help='quantize and dequantize the float output \
                                    to give it the same error as the quantized output of the layer')
+    parser_qerror.add_argument('--precision_loss',
+                               action='store_true',
+                               help='compare quantized execution with execution_dtype set to float32 \
+                                   against the float64 reference instead of against float execution')
     parser_qerror.add_argument('-r', '--report_lowest',
                                type=int, help='QSNR threshold below which to report filename')
     table_options(parser_qerror, default_width=140)
     input_options(parser_qerror)
+    batch_options(parser_qerror)
 
     @with_argparser(parser_qerror)
     @no_history
@@ -49,19 +56,35 @@ Show quantization error introduced by processing one or more input files."""
         fmt = ('tab' if args.output is None else args.output['fmt'])
         input_args = self._get_input_args(args)
         if args.step:
+            if args.precision_loss:
+                self.perror("--precision_loss cannot be used with --step")
+                return
             stats_collector = StepErrorStatsCollector(quant_compare=args.compare_quantized)
+        elif args.precision_loss:
+            stats_collector = ErrorStatsCollector(execution_cache=self._get_execution_cache(),
+                                                  float_dtype=np.float32,
+                                                  precision_compare=True)
         else:
-            stats_collector = ErrorStatsCollector(quant_compare=args.compare_quantized)
+            stats_collector = ErrorStatsCollector(quant_compare=args.compare_quantized,
+                                                  execution_cache=self._get_execution_cache(),
+                                                  float_dtype=self._get_float_dtype())
         cnt = 0
-        for file_per_input in glob_input_files(args.input_files, self.G.num_inputs):
-            cnt += 1
+        for files_batch, data in import_batches(
+                batch_input_files(glob_input_files(args.input_files, self.G.num_inputs),
+                                  batch_size=args.batch_size),
+                input_args, **self._get_loader_args()):
+            cnt += len(files_batch)
 
-            data = [import_data(input_file, **input_args) for input_file in file_per_input]
-            stat = stats_collector.collect_stats(self.G, data)
+            if args.batch_size > 1:
+                stats = stats_collector.collect_stats(self.G, stack_batch(data),
+                                                      batch_size=len(data))
+            else:
+                stats = [stats_collector.collect_stats(self.G, data[0])]
             if args.report_lowest is not None:
-                lowest = min((elem['qsnr'] for elem in stat.values()))
-                if lowest < args.report_lowest:
-                    self.pfeedback("{} had QSNR below threshold".format(file_per_input))
+                for file_per_input, stat in zip(files_batch, stats):
+                    lowest = min((elem['qsnr'] for elem in stat.values()))
+                    if lowest < args.report_lowest:
+                        self.pfeedback("{} had QSNR below threshold".format(file_per_input))
         if not cnt:
             self.perror("no files to process")
             return
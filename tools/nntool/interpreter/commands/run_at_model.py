@@ -13,13 +13,17 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import argparse
-import distutils.ccompiler as compiler
+import csv
+import hashlib
+import json
 import logging
 import os
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from cmd2 import Cmd, Cmd2ArgumentParser, with_argparser
 from interpreter.nntool_shell_base import NNToolShellBase
-import re
 from prettytable import PrettyTable
 
 L1_MEM_USAGE = re.compile(r'\s*(?P<column>Shared L1 Memory size) \(Bytes\)\s+\: Given\:\s+(?P<given>[0-9]+)\,\sUsed\:\s+(?P<used>[0-9]+)')
@@ -36,8 +40,128 @@ TOT_COEFFS = re.compile(r'(?P<column>Total amount of flash coefficients)\s+\:\s+
 
 MATCHES = [L1_MEM_USAGE, L2_MEM_USAGE, L3_MEM_USAGE, L3_MEM_BW, L2_MEM_BW, TIL_OH, KER_ARGS, L2_MEM_BW_PER, L3_MEM_BW_PER, KER_OPS, TOT_COEFFS]
 
+# columns minimized when selecting the pareto front
+PARETO_COLUMNS = ['Shared L1 Memory size Used', 'L2 Memory size Used', 'L3 Memory size Used',
+                  'L2 Memory bandwidth for 1 graph run', 'L3 Memory bandwidth for 1 graph run']
+MEMORY_COLUMNS = ['L1', 'L2', 'L3']
+
+# bump if the parsing of the output changes so that old cache entries are not used
+CACHE_VERSION = 1
+
 LOG = logging.getLogger("nntool")
 
+
+def parse_at_output(lines):
+    """Returns a dict of the memory statistics reported by an AT model executable"""
+    res = {}
+    for line in lines:
+        for match in MATCHES:
+            m = match.search(line)
+            if m:
+                if "Memory size" in m['column']:
+                    res[m['column'] + ' Given'] = float(m['given'])
+                    res[m['column'] + ' Used'] = float(m['used'])
+                else:
+                    res[m['column']] = float(m['value'])
+                break
+    return res
+
+
+def file_digest(filename):
+    hasher = hashlib.sha1()
+    with open(filename, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def pareto_front(rows, columns):
+    """Returns the rows that are not dominated on the columns where lower is better"""
+    points = [[row.get(col, 0) for col in columns] for row in rows]
+    front = []
+    for idx, point in enumerate(points):
+        dominated = any(all(o <= p for o, p in zip(other, point)) and other != point
+                        for other in points)
+        # only keep the first of identical points
+        duplicate = any(other == point for other in points[:idx])
+        if not dominated and not duplicate:
+            front.append(rows[idx])
+    return front
+
+
+class ATSweepCache():
+    """Results of running an AT model executable with one memory configuration. Entries are
+    json files named after a hash of the executable, the memory sizes and the arguments."""
+
+    def __init__(self, cache_dir):
+        self._cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(exe_digest, memories, extra_args):
+        key = json.dumps([CACHE_VERSION, exe_digest, memories, extra_args])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _filename(self, key):
+        return os.path.join(self._cache_dir, key + '.json')
+
+    def get(self, key):
+        filename = self._filename(key)
+        if not os.path.exists(filename):
+            return None
+        try:
+            with open(filename) as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            LOG.warning("run_at cache entry %s is corrupt - rerunning", filename)
+            return None
+
+    def put(self, key, result):
+        filename = self._filename(key)
+        with open(filename + '.tmp', 'w') as fp:
+            json.dump(result, fp)
+        os.replace(filename + '.tmp', filename)
+
+
+def run_at_point(executable, out_dir, memories, extra_args, timeout=None, verbose=False):
+    """Runs the AT model executable with one memory configuration in kB and returns
+    the statistics that it reports"""
+    os.makedirs(out_dir, exist_ok=True)
+    cmd = [executable, '-o', out_dir, '-c', out_dir,
+           '--L1', str(memories[0]*1024), '--L2', str(memories[1]*1024),
+           '--L3', str(memories[2]*1024)] + extra_args
+    LOG.info(" ".join(cmd))
+    res = subprocess.run(cmd, capture_output=True, text=True, check=False,
+                         shell=False, timeout=timeout)
+    if verbose:
+        print(res.stdout, end='')
+    if res.returncode:
+        LOG.warning("%s returned error code %s", " ".join(cmd), res.returncode)
+    return parse_at_output(res.stdout.splitlines(keepends=True))
+
+
+def write_results(filename, fields, rows):
+    _, ext = os.path.splitext(filename)
+    with open(filename, 'w', newline='') as fp:
+        if ext.lower() == '.json':
+            json.dump([{field: row.get(field) for field in fields} for row in rows],
+                      fp, indent=2)
+        else:
+            writer = csv.writer(fp)
+            writer.writerow(fields)
+            for row in rows:
+                writer.writerow([row.get(field, '') for field in fields])
+
+
+def print_table(fields, rows):
+    x = PrettyTable()
+    x.field_names = fields
+    for row in rows:
+        x.add_row([row.get(field, '') for field in fields])
+    print(x)
+
+
+
 class RunATCommand(NNToolShellBase):
     # GEN COMMAND
     parser_compile = Cmd2ArgumentParser()
@@ -63,12 +187,30 @@ class RunATCommand(NNToolShellBase):
                                 help="Range of L3 Memory constraints (format: start, end, step)")
     parser_compile.add_argument('--verbose', action='store_true',
                                 help='Print out the whole Autotiler log')
+    parser_compile.add_argument('--jobs', '-j', type=int, default=1,
+                                help='Number of memory configurations to run in parallel. '
+                                'If greater than 1 each configuration is generated in '
+                                'a subdirectory of out_dir')
+    parser_compile.add_argument('--timeout', type=float, default=None,
+                                help='Timeout in seconds for each memory configuration')
+    parser_compile.add_argument('--cache_dir', completer_method=Cmd.path_complete, default=None,
+                                help='Directory to cache results in (default: out_dir/run_at_cache)')
+    parser_compile.add_argument('--no_cache', action='store_true',
+                                help='Rerun all memory configurations')
+    parser_compile.add_argument('--output', completer_method=Cmd.path_complete, default=None,
+                                help='Write the pareto front of memory used against bandwidth '
+                                'to this file. The format is JSON if the extension is .json '
+                                'otherwise CSV')
 
     @with_argparser(parser_compile)
     def do_run_at(self, args):
+        """
+Run a compiled AT model executable for a range of memory configurations and report
+the memory usage and bandwidth for each one. Results are cached on the executable
+and memory configuration."""
         extra_args = []
         if args.flash_dir:
-            extra_args.append("-f {}".format(args.flash_dir))
+            extra_args.extend(["-f", args.flash_dir])
         if args.l1_memory_range:
             l1_memories = [i for i in range(args.l1_memory_range[0], args.l1_memory_range[1], args.l1_memory_range[2])]
         else:
@@ -83,40 +225,72 @@ class RunATCommand(NNToolShellBase):
             l3_memories = [args.l3_memory]
         LOG.info("Memory settings: {} {} {}".format(l1_memories, l2_memories, l3_memories))
 
-        fields = None
+        executable = os.path.join('.', args.executable)
+        if not os.path.exists(executable):
+            self.perror(f"{executable} not found")
+            return
+        points = [(l1, l2, l3) for l1 in l1_memories for l2 in l2_memories for l3 in l3_memories]
+        cache = None if args.no_cache else ATSweepCache(
+            args.cache_dir or os.path.join(args.out_dir, 'run_at_cache'))
+        exe_digest = file_digest(executable) if cache else None
+
+        def run_point(memories):
+            out_dir = args.out_dir
+            if args.jobs > 1:
+                # parallel runs must not write to the same files
+                out_dir = os.path.join(out_dir, "L1_{}_L2_{}_L3_{}".format(*memories))
+            return run_at_point(executable, out_dir, list(memories), extra_args,
+                                timeout=args.timeout, verbose=args.verbose)
+
+        results = {}
+        pending = []
+        for memories in points:
+            if cache:
+                key = cache.key(exe_digest, memories, extra_args)
+                result = cache.get(key)
+                if result is not None:
+                    LOG.info("L1 %s L2 %s L3 %s: cached", *memories)
+                    results[memories] = result
+                    continue
+            pending.append(memories)
+
+        with ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+            futures = {executor.submit(run_point, memories): memories for memories in pending}
+            for future in as_completed(futures):
+                memories = futures[future]
+                try:
+                    result = future.result()
+                except subprocess.TimeoutExpired:
+                    LOG.warning("L1 %s L2 %s L3 %s: timed out", *memories)
+                    continue
+                except OSError as ex:
+                    LOG.warning("L1 %s L2 %s L3 %s: %s", *memories, ex)
+                    continue
+                results[memories] = result
+                if cache and result:
+                    cache.put(cache.key(exe_digest, memories, extra_args), result)
+
         rows = []
-        for l1 in l1_memories:
-            for l2 in l2_memories:
-                for l3 in l3_memories:
-                    cmd = "./{} -o {} -c {} --L1 {} --L2 {} --L3 {} {}".format(args.executable,
-                                                                               args.out_dir, args.out_dir,
-                                                                               l1*1024, l2*1024, l3*1024, " ".join(extra_args))
-                    LOG.info(cmd)
-                    stream = os.popen(cmd)
-
-                    out_log = stream.readlines()
-                    fields = []
-                    row = []
-                    for line in out_log:
-                        if args.verbose:
-                            print(line, end='')
-                        for match in MATCHES:
-                            m = match.search(line)
-                            if m:
-                                if "Memory size" in m['column']:
-                                    fields.append(m['column'] + ' Given')
-                                    row.append(float(m['given']))
-                                    fields.append(m['column'] + ' Used')
-                                    row.append(float(m['used']))
-                                else:
-                                    fields.append(m['column'])
-                                    row.append(float(m['value']))
-                                continue
-                    rows.append(row)
-
-        if fields:
-            x = PrettyTable()
-            x.field_names = fields
-            for row in rows:
-                x.add_row(row)
-            print(x)
+        fields = list(MEMORY_COLUMNS)
+        for memories in points:
+            result = results.get(memories)
+            if not result:
+                continue
+            for field in result:
+                if field not in fields:
+                    fields.append(field)
+            row = dict(zip(MEMORY_COLUMNS, memories))
+            row.update(result)
+            rows.append(row)
+
+        if not rows:
+            return
+        print_table(fields, rows)
+        if len(rows) > 1 or args.output:
+            front = pareto_front(rows, [col for col in PARETO_COLUMNS if col in fields])
+            if len(rows) > 1:
+                print("Pareto front of memory used against bandwidth")
+                print_table(fields, front)
+            if args.output:
+                write_results(args.output, fields, front)
+                LOG.info("wrote pareto front to %s", args.output)
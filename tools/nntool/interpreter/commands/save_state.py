@@ -19,6 +19,7 @@ import logging
 import os
 
 from cmd2 import Cmd, Cmd2ArgumentParser, with_argparser
+from graph.snapshot import save_snapshot
 from interpreter.nntool_shell_base import NNToolShellBase, no_history
 from utils.json_serializable import JsonSerializableStateEncoder
 
@@ -33,6 +34,9 @@ class SaveStateCommand(NNToolShellBase):
                                    completer_method=Cmd.path_complete,
                                    nargs=argparse.OPTIONAL,
                                    help='file to write to')
+    parser_save_state.add_argument('--no_snapshot',
+                                   action='store_true',
+                                   help='do not save a snapshot of the graph with the state')
 
     @with_argparser(parser_save_state)
     @no_history
@@ -44,7 +48,9 @@ a build script. If no argument is given then the state files
 will be saved in the same directory as the graph. If a directory is
 given then the state files will be saved in it with the graph
 basename. If a filename is given, its basename will be used to
-save the state files."""
+save the state files. A binary snapshot of the graph is saved next to
+the state file and is used to open it without replaying the commands as
+long as the state file, the graph file and nntool have not changed."""
         self._check_graph()
         self._check_quantized()
         if args.output is not None:
@@ -58,3 +64,15 @@ save the state files."""
         with open(state_filename, mode='w+') as fp:
             json.dump(self.graph_history, fp, indent=2, cls=JsonSerializableStateEncoder)
         LOG.info("saved state to %s", state_filename)
+        snapshot_filename = graph_base + self.SNAPSHOT_EXTENSION
+        if args.no_snapshot:
+            if os.path.exists(snapshot_filename):
+                os.remove(snapshot_filename)
+            return
+        state = {
+            'history': self.graph_history['history'],
+            'graph_file': self.graph_file,
+            'graph_file_stamp': self.graph_file_stamp(self.graph_file),
+            'load_quantization': self.settings['load_quantization']
+        }
+        save_snapshot(self.G, snapshot_filename, state=state)
@@ -23,9 +23,10 @@ from execution.graph_executer import GraphExecuter
 from execution.quantization_mode import QuantizationMode
 from execution.execution_progress import ExecutionProgress
 from interpreter.nntool_shell_base import NNToolShellBase, no_history
-from interpreter.shell_utils import (glob_input_files,
-                                     input_options)
-from utils.data_importer import import_data
+from interpreter.shell_utils import (batch_input_files, batch_options,
+                                     glob_input_files, input_options,
+                                     stack_batch)
+from utils.dataset_loader import import_batches
 from utils.validation_utils import ValidateFromJSON, ValidateFromName, ValidateFromClass, ValidateFromVWWInstances
 
 LOG = logging.getLogger('nntool.'+__name__)
@@ -64,6 +65,7 @@ class ValidationCommand(NNToolShellBase):
                                         instances["images"] = { file_name:.., image_id:.. }\
                                         instances["annotations"] = { image_id:.., label:..}')
     input_options(parser_val)
+    batch_options(parser_val)
 
     @with_argparser(parser_val)
     @no_history
@@ -79,6 +81,7 @@ must be 3, "file_45.png" will raise an error) or can be written in a .json objec
         if args.quantize:
             self._check_quantized()
             qmode = QuantizationMode.all_dequantize()
+            qmode.float_dtype = self._get_float_dtype()
         else:
             qmode = QuantizationMode.none()
 
@@ -109,30 +112,42 @@ must be 3, "file_45.png" will raise an error) or can be written in a .json objec
 
         try:
             ExecutionProgress.start()
-            for i, file_per_input in enumerate(glob_input_files(args.input_files, self.G.num_inputs)):
+            i = 0
+            executer = GraphExecuter(self.G, qrecs=self.G.quantization)
+            for files_batch, data in import_batches(
+                    batch_input_files(glob_input_files(args.input_files, self.G.num_inputs),
+                                      batch_size=args.batch_size),
+                    input_args, **self._get_loader_args()):
                 if not args.silent:
-                    LOG.info("input file %s", file_per_input)            
-                data = [import_data(input_file, **input_args) for input_file in file_per_input]
-
-                executer = GraphExecuter(self.G, qrecs=self.G.quantization)
-                outputs = executer.execute(data, qmode=qmode, silent=args.silent)
-
-                predicted_values = np.asarray(outputs[args.prediction_step_idx])
-                good_prediction, class_predicted, real_class, margin = validation.validate(
-                    file_per_input[0], predicted_values)
-                good_predictions.append(good_prediction)
-                if good_prediction:
-                    good_margin += margin
+                    LOG.info("input files %s", files_batch)
+
+                if args.batch_size > 1:
+                    outputs = executer.execute(stack_batch(data), qmode=qmode, silent=args.silent,
+                                               batch_size=len(data))
+                    all_predicted_values = [np.asarray([output[sample_idx]
+                                                        for output in outputs[args.prediction_step_idx]])
+                                            for sample_idx in range(len(data))]
                 else:
-                    bad_margin += margin
-
-                if not args.silent:
-                    LOG.info('Prediction is %s predicted %s correct %s margin %s',
-                             good_prediction, class_predicted, real_class, margin)
-                if not i % args.progress_every and i > 0:
-                    LOG.info('ACCURACY: %.3f %%', 100*sum(good_predictions)/len(good_predictions))
-
-                ExecutionProgress.progress(i, number_samples)
+                    outputs = executer.execute(data[0], qmode=qmode, silent=args.silent)
+                    all_predicted_values = [np.asarray(outputs[args.prediction_step_idx])]
+
+                for file_per_input, predicted_values in zip(files_batch, all_predicted_values):
+                    good_prediction, class_predicted, real_class, margin = validation.validate(
+                        file_per_input[0], predicted_values)
+                    good_predictions.append(good_prediction)
+                    if good_prediction:
+                        good_margin += margin
+                    else:
+                        bad_margin += margin
+
+                    if not args.silent:
+                        LOG.info('Prediction is %s predicted %s correct %s margin %s',
+                                 good_prediction, class_predicted, real_class, margin)
+                    if not i % args.progress_every and i > 0:
+                        LOG.info('ACCURACY: %.3f %%', 100*sum(good_predictions)/len(good_predictions))
+
+                    ExecutionProgress.progress(i, number_samples)
+                    i += 1
             ExecutionProgress.end()
 
         except (KeyboardInterrupt, SystemExit):
@@ -16,6 +16,7 @@
 import json
 import logging
 import os
+import pickle
 import re
 from argparse import OPTIONAL
 from copy import deepcopy
@@ -24,6 +25,7 @@ from typing import Any
 
 from cmd2 import Cmd, Cmd2ArgumentParser, CompletionItem, plugin
 from execution.execution_progress import ExecutionProgress
+from graph.snapshot import SnapshotError, load_snapshot
 from importer.common.handler_options import HandlerOptions
 from utils.json_serializable import JsonSerializableStateDecoder
 from utils.make_var import make_expand, make_vars
@@ -94,6 +96,7 @@ class NNToolShellBase(NNToolShellSettings, Cmd):
     # commands to exclude from save state history
     EXCLUDE_FROM_HISTORY = ['help', 'py']
     STORE_ONCE_IN_HISTORY = []
+    SNAPSHOT_EXTENSION = '.nnsnap'
     LOG_HANDLER_SET=False
 
     def __init__(self, args, *rest, **kwargs):
@@ -352,7 +355,48 @@ class NNToolShellBase(NNToolShellSettings, Cmd):
         with open(filepath) as fp:
             history = json.load(fp, cls=JsonSerializableStateDecoder)
         self.graph_history = history
-        self._replay_history()
+        if not self._load_snapshot(os.path.splitext(filepath)[0] + self.SNAPSHOT_EXTENSION):
+            self._replay_history()
+
+    @staticmethod
+    def graph_file_stamp(graph_file):
+        file_stat = os.stat(graph_file)
+        return [os.path.abspath(graph_file), file_stat.st_mtime_ns, file_stat.st_size]
+
+    def _load_snapshot(self, filepath):
+        """Restores the graph from a snapshot saved with the state file. Only the set
+        commands are replayed. Returns False if the snapshot is missing or does not
+        match the history, the graph file or the nntool sources."""
+        if not os.path.exists(filepath):
+            return False
+        try:
+            G, state = load_snapshot(filepath)
+        except (SnapshotError, OSError, EOFError, AttributeError, ImportError,
+                pickle.UnpicklingError) as ex:
+            LOG.warning("unable to load snapshot %s (%s) - replaying history", filepath, ex)
+            return False
+        if not isinstance(state, dict) or state.get('history') != self.graph_history['history']:
+            LOG.info("snapshot %s does not match state file - replaying history", filepath)
+            return False
+        graph_file = state['graph_file']
+        try:
+            if self.graph_file_stamp(graph_file) != state['graph_file_stamp']:
+                LOG.info("graph file %s has changed - replaying history", graph_file)
+                return False
+        except OSError:
+            pass
+        LOG.info("loading snapshot %s", filepath)
+        self._replaying_history = True
+        try:
+            for command in self.graph_history['history']:
+                if command.startswith('set') and self.onecmd_plus_hooks(command, add_to_history=False):
+                    break
+        finally:
+            self._replaying_history = False
+        self.G = G
+        self.graph_file = graph_file
+        self.settings['load_quantization'] = state['load_quantization']
+        return True
 
     @staticmethod
     def no_history(function):
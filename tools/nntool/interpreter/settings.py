@@ -15,7 +15,9 @@
 
 from copy import deepcopy
 import logging
+import numpy as np
 from cmd2 import Cmd, Settable
+from execution.execution_cache import ExecutionCache
 from generation.autotiler_options import DEFAULT_GEN_OPTS, DEFAULT_GEN_OPTS_DESCRIPTIONS
 from utils.data_importer import MODES
 from .shell_utils import find_choice
@@ -28,6 +30,11 @@ VALID_LOG_LEVELS = [
     "WARNING"
 ]
 
+EXECUTION_DTYPES = {
+    'float64': None,
+    'float32': np.float32
+}
+
 DEFAULT_OPT_DESCRIPTIONS = {
     'log_level': {'type': str, 'descr': 'set logging level', 'choices': VALID_LOG_LEVELS},
     'load_quantization': {'type': bool, 'descr': 'load TFLITE quantization information', 'choices': [True, False]},
@@ -45,6 +52,14 @@ DEFAULT_OPT_DESCRIPTIONS = {
     'input_divisor': {'type': float, 'descr': 'divide input tensor values by this value'},
     'input_offset': {'type': float, 'descr': 'add this value to input tensor values'},
     'input_norm_func': {'type': str, 'descr': 'lambda function in the form x: fn(x) where x is any input'},
+    'data_cache_dir': {'type': str, 'descr': 'directory used to cache imported input files. Empty to disable'},
+    'data_prefetch': {'type': int, 'descr': 'number of threads importing input files ahead of use. 0 to disable'},
+    'execution_cache': {'type': int, 'descr': 'size in MB of the cache of node outputs reused when re-executing '
+                                              'the graph after a change. 0 to disable'},
+    'execution_cache_dir': {'type': str, 'descr': 'directory where entries evicted from the execution cache '
+                                                  'are spilled. Empty to drop them'},
+    'execution_dtype': {'type': str, 'descr': 'floating point type of dequantized tensors in quantized execution',
+                        'choices': EXECUTION_DTYPES.keys()},
     'graph_name': {'type': str, 'descr': 'name of the graph used for code generation'},
     'template_file': {'type': str, 'descr': 'template file used for code generation'},
 }
@@ -78,6 +93,11 @@ class NNToolShellSettings(Cmd):
             'input_divisor': 1,
             'input_offset': 0,
             'input_shift': 0,
+            'data_cache_dir': "",
+            'data_prefetch': 0,
+            'execution_cache': 0,
+            'execution_cache_dir': "",
+            'execution_dtype': 'float64',
             'log_level': 'INFO',
             'graph_file': "",
             'tensor_file': "",
@@ -85,6 +105,7 @@ class NNToolShellSettings(Cmd):
         }
         self.settings.update(DEFAULT_GEN_OPTS)
         self.default_settings = deepcopy(self.settings)
+        self._execution_cache = None
 
     # LOG_LEVEL PROPERTY
 
@@ -249,6 +270,70 @@ class NNToolShellSettings(Cmd):
     def input_offset(self, val):
         self.settings['input_offset'] = int(val)
 
+    # DATA_CACHE_DIR PROPERTY
+
+    @property
+    def data_cache_dir(self):
+        return self.settings['data_cache_dir']
+
+    @data_cache_dir.setter
+    def data_cache_dir(self, val):
+        self.settings['data_cache_dir'] = str(val)
+
+    # DATA_PREFETCH PROPERTY
+
+    @property
+    def data_prefetch(self):
+        return self.settings['data_prefetch']
+
+    @data_prefetch.setter
+    def data_prefetch(self, val):
+        try:
+            val = int(val)
+            if val < 0:
+                raise ValueError()
+        except ValueError:
+            raise ValueError("value should be zero or a positive integer")
+        self.settings['data_prefetch'] = val
+
+    # EXECUTION_CACHE PROPERTY
+
+    @property
+    def execution_cache(self):
+        return self.settings['execution_cache']
+
+    @execution_cache.setter
+    def execution_cache(self, val):
+        try:
+            val = int(val)
+            if val < 0:
+                raise ValueError()
+        except ValueError:
+            raise ValueError("value should be zero or a positive integer")
+        self.settings['execution_cache'] = val
+        self._execution_cache = None
+
+    # EXECUTION_CACHE_DIR PROPERTY
+
+    @property
+    def execution_cache_dir(self):
+        return self.settings['execution_cache_dir']
+
+    @execution_cache_dir.setter
+    def execution_cache_dir(self, val):
+        self.settings['execution_cache_dir'] = str(val)
+        self._execution_cache = None
+
+    # EXECUTION_DTYPE PROPERTY
+
+    @property
+    def execution_dtype(self):
+        return self.settings['execution_dtype']
+
+    @execution_dtype.setter
+    def execution_dtype(self, val):
+        self.settings['execution_dtype'] = find_choice(EXECUTION_DTYPES.keys(), val)
+
     @property
     def template_file(self):
         return self.settings['template_file']
@@ -298,3 +383,21 @@ class NNToolShellSettings(Cmd):
             res['nptype'] = args.nptype
 
         return res
+
+    def _get_loader_args(self):
+        return {
+            'cache_dir': self.settings['data_cache_dir'] or None,
+            'prefetch': self.settings['data_prefetch']
+        }
+
+    def _get_float_dtype(self):
+        return EXECUTION_DTYPES[self.settings['execution_dtype']]
+
+    def _get_execution_cache(self):
+        if not self.settings['execution_cache']:
+            return None
+        if self._execution_cache is None:
+            self._execution_cache = ExecutionCache(
+                max_bytes=self.settings['execution_cache'] * 1024 * 1024,
+                spill_dir=self.settings['execution_cache_dir'] or None)
+        return self._execution_cache
@@ -85,6 +85,23 @@ def input_options(parser):
                         action="store_true",
                         help="convert 3 channel 8bits input into 1 channel 16bit rgb565")
 
+def batch_options(parser):
+    parser.add_argument('--batch_size',
+                        type=int, default=1,
+                        help="number of inputs executed together in one pass through the graph. "
+                        "All the inputs in a batch must have the same shape")
+
+def batch_input_files(files_per_input, batch_size=1):
+    """Group the lists of files returned by glob_input_files into batches"""
+    batch_size = max(batch_size, 1)
+    for idx in range(0, len(files_per_input), batch_size):
+        yield files_per_input[idx:idx + batch_size]
+
+def stack_batch(data_per_sample):
+    """Stack the imported data of a batch of samples into one tensor per graph input
+    with a leading batch axis"""
+    return [np.stack(data) for data in zip(*data_per_sample)]
+
 def output_table(table, args):
     fmt = ('tab' if args.output is None else args.output['fmt'])
     if fmt == "xls":
@@ -18,12 +18,14 @@ import numpy as np
 from graph.types import (HSigmoidActivationParameters,
                          HSwishActivationParameters, LeakyActivationParameters,
                          ReluActivationParameters, SigmoidActivationParameters)
-from quantization.kernels.kernel_base import KernelBase, params_type, qrec_type
+from quantization.kernels.kernel_base import (KernelBase, batch_support,
+                                              params_type, qrec_type)
 from quantization.new_qrec import AllFloatQRec, QRec
 
 
 @params_type(HSwishActivationParameters)
 @qrec_type('float')
+@batch_support()
 class HSwishFloat32(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -39,6 +41,7 @@ class HSwishFloat32(KernelBase):
 
 @params_type(HSigmoidActivationParameters)
 @qrec_type('float')
+@batch_support()
 class HSigmoidFloat32(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -54,6 +57,7 @@ class HSigmoidFloat32(KernelBase):
 
 @params_type(SigmoidActivationParameters)
 @qrec_type('float')
+@batch_support()
 class SigmoidFloat32(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -68,6 +72,7 @@ class SigmoidFloat32(KernelBase):
 
 @params_type(TanHActivationParameters)
 @qrec_type('float')
+@batch_support()
 class TanHFloat32(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -82,6 +87,7 @@ class TanHFloat32(KernelBase):
 
 @params_type(HTanHActivationParameters)
 @qrec_type('float')
+@batch_support()
 class HTanHFloat32(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -110,6 +116,7 @@ class HTanHFloat32(KernelBase):
 
 @params_type(ReluActivationParameters)
 @qrec_type('float')
+@batch_support()
 class ReluFloat32(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -134,6 +141,7 @@ class ReluFloat32(KernelBase):
 
 @params_type(LeakyActivationParameters)
 @qrec_type('float')
+@batch_support()
 class LeakyFloat32(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -20,6 +20,7 @@ from graph.types import Conv2DParameters
 from quantization.kernels.kernel_base import KernelBase, params_type, qrec_type
 from quantization.multiplicative.mulbias import apply_multiplicative_bias
 from quantization.new_qrec import AllFloatQRec, QRec
+from utils.im2col import conv2d_im2col
 
 # pylint: disable=invalid-name
 
@@ -34,7 +35,7 @@ class Conv2DFloat32(KernelBase):
                 in_tensors,
                 qrec: QRec,
                 **kwargs):
-        '''3D convolution by sub-matrix summing.
+        '''3D convolution computed as a matrix multiply on the im2col view of the input
         '''
         details = kwargs.get('details')
         if qrec is None:
@@ -76,12 +77,6 @@ class Conv2DFloat32(KernelBase):
 
         in_w = in_dims.w
         in_h = in_dims.h
-        out_c = params.filter.out_c
-
-        in_c_per_group = in_dims.c // params.groups
-        out_c_per_group = out_c // params.groups
-        in_c_off = 0
-        out_c_cnt = 0
 
         dillated_filter_w = (params.dilation.w - 1) * (filt_w - 1) + filt_w
         dillated_filter_h = (params.dilation.h - 1) * (filt_h - 1) + filt_h
@@ -92,9 +87,74 @@ class Conv2DFloat32(KernelBase):
         calc_dtype = qrec.out_qs[0].dtype if qrec.ktype.startswith(
             'float') else np.float32
 
-        if params.has_bias:
-            # biases = qrec.prepare_biases(params, params.get_uncompressed_biases(),
-            #                              params.get_uncompressed_weights(), ktype="float")
+        if not params.has_bias:
+            biases = None
+
+        if np.dtype(calc_dtype) in (np.float32, np.float64):
+            result = cls.conv_im2col(params, in_tensor, weights, biases, calc_dtype,
+                                     out_h, out_w, details=details)
+        else:
+            result = cls.conv_by_slab(params, in_tensor, weights, biases, calc_dtype,
+                                      (in_h, in_w, pad_h, pad_w, out_h, out_w),
+                                      details=details)
+
+        if details is not None:
+            details['min_pre_mul_bias'] = min(
+                np.min(result), details['min_pre_mul_bias'])
+            details['max_pre_mul_bias'] = max(
+                np.max(result), details['max_pre_mul_bias'])
+
+        result = apply_multiplicative_bias(qrec,
+                                           params, result, axis=0, ktype="float")
+
+        result = result.transpose(
+            out_dims.transpose_from_order(['c', 'h', 'w']))
+
+        return qrec.get_outputs(params, [result], ktype="float")
+
+    @classmethod
+    def conv_im2col(cls, params, in_tensor, weights, biases, calc_dtype, out_h, out_w, details=None):
+        conv_args = {
+            'stride': (params.stride.h, params.stride.w),
+            'dilation': (params.dilation.h, params.dilation.w),
+            'groups': params.groups,
+            'calc_dtype': calc_dtype
+        }
+        if biases is not None:
+            biases = biases.astype(calc_dtype).reshape(-1, 1, 1)
+        result = conv2d_im2col(in_tensor, weights, out_h, out_w, **conv_args)
+        if biases is not None:
+            result += biases
+        if details is None:
+            return result
+
+        # the accumulator range is the range of all the partial sums after each filter tap.
+        # the result itself is not taken from these sums since the float rounding would
+        # then depend on whether details are collected or not
+        partial = np.cumsum(conv2d_im2col(in_tensor, weights, out_h, out_w,
+                                          by_tap=True, **conv_args), axis=0, dtype=calc_dtype)
+        if biases is not None:
+            partial += biases
+        details['min_acc'] = min(np.min(partial), details['min_acc'])
+        details['max_acc'] = max(np.max(partial), details['max_acc'])
+        return result
+
+    @classmethod
+    def conv_by_slab(cls, params, in_tensor, weights, biases, calc_dtype, shapes, details=None):
+        """Convolution by sub-matrix summing. Used for reduced precision float types."""
+        in_h, in_w, pad_h, pad_w, out_h, out_w = shapes
+        filt_w = params.filter.w
+        filt_h = params.filter.h
+        out_c = params.filter.out_c
+        in_c_per_group = weights.shape[-1]
+        out_c_per_group = out_c // params.groups
+        in_c_off = 0
+        out_c_cnt = 0
+
+        dillated_filter_w = (params.dilation.w - 1) * (filt_w - 1) + filt_w
+        dillated_filter_h = (params.dilation.h - 1) * (filt_h - 1) + filt_h
+
+        if biases is not None:
             result = np.broadcast_to(biases.reshape(
                 out_c, 1, 1), (out_c, out_h, out_w)).copy().astype(calc_dtype)
         else:
@@ -103,7 +163,7 @@ class Conv2DFloat32(KernelBase):
 
         const_h = pad_h + in_h - dillated_filter_h + 1
         const_w = pad_w + in_w - dillated_filter_w + 1
-        for out_c_i in range(out_dims.c):
+        for out_c_i in range(out_c):
             for cur_h in range(filt_h):
                 for cur_w in range(filt_w):
 
@@ -136,16 +196,4 @@ class Conv2DFloat32(KernelBase):
                 out_c_cnt = 0
                 in_c_off += in_c_per_group
 
-        if details is not None:
-            details['min_pre_mul_bias'] = min(
-                np.min(result), details['min_pre_mul_bias'])
-            details['max_pre_mul_bias'] = max(
-                np.max(result), details['max_pre_mul_bias'])
-
-        result = apply_multiplicative_bias(qrec,
-                                           params, result, axis=0, ktype="float")
-
-        result = result.transpose(
-            out_dims.transpose_from_order(['c', 'h', 'w']))
-
-        return qrec.get_outputs(params, [result], ktype="float")
+        return result
@@ -26,6 +26,10 @@ from expressions.symbolic.symbol import Symbol, SymbolStats
 
 
 class PieceWiseFloat32Mixin():
+    @classmethod
+    def can_batch(cls, params):
+        return not (isinstance(params, Broadcastable) and params.is_broadcasted)
+
     @classmethod
     def execute_piecewise(cls, params,
                           in_tensors,
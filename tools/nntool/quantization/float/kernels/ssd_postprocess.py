@@ -19,7 +19,7 @@ from quantization.kernels.kernel_base import KernelBase, params_type, qrec_type
 from quantization.new_qrec import AllFloatQRec, QRec
 from utils.ssd_utils import (CNTX_IDX, CNTY_IDX, H_IDX, W_IDX, XMAX_IDX,
                              XMIN_IDX, YMAX_IDX, YMIN_IDX, convert_cors2cnts,
-                             rect_intersect_area, rect_union_area)
+                             suppress_overlapping)
 
 
 @params_type(SSDDetectorParameters)
@@ -103,22 +103,13 @@ class SSDDetectorFloat32(KernelBase):
             inds = valid_scores_indices[args]
             sorted_bboxes = decoded_bboxes[inds]
             sorted_scores = class_scores[args]
-            liveness = [True] * sorted_bboxes.shape[0]
-            for i, box_a in enumerate(sorted_bboxes):
-                if not liveness[i]:
-                    continue
-                for j in range(i+1, len(sorted_bboxes)):
-                    box_b = sorted_bboxes[j]
-                    intersection = rect_intersect_area(box_a, box_b)
-                    union = rect_union_area(box_a, box_b)
-                    if intersection >= (params.nms_iou_threshold * union):
-                        # iou > threshold ->
-                        # discard second box which is dominated by the first because they are sorted
-                        liveness[j] = False
-            if sum(liveness) > 0:
+            # discard the boxes dominated by a box with a higher score
+            liveness = suppress_overlapping(sorted_bboxes, params.nms_iou_threshold)
+            num_live = int(np.sum(liveness))
+            if num_live > 0:
                 out_boxes.append(sorted_bboxes[liveness])
                 out_scores.append(sorted_scores[liveness])
-                out_classes.append([class_idx] * sum(liveness))
+                out_classes.append([class_idx] * num_live)
         if len(out_boxes) > 0:
             out_boxes = np.concatenate(out_boxes)
             out_classes = np.concatenate(out_classes)
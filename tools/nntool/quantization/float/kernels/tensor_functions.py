@@ -22,9 +22,9 @@ from graph.types import (ConcatParameters, ConstantInputParameters,
                          StridedSliceParameters, TransposeParameters)
 from graph.types.others import (GatherParameters, NoOPParameters,
                                 QuantizeParameters)
-from quantization.kernels.kernel_base import KernelBase, params_type, qrec_type
+from quantization.kernels.kernel_base import (KernelBase, batch_support,
+                                              params_type, qrec_type)
 from quantization.new_qrec import AllFloatQRec, QRec
-from skimage.transform import resize
 
 
 @params_type(InputParameters)
@@ -47,6 +47,8 @@ class InputFloat32(KernelBase):
                     raise ValueError(f'{params.name} received input of shape {in_tensor.shape} but expecting {params.dims.shape}')
             in_tensor = in_tensor.reshape(params.dims.shape)
         else:
+            # skimage is slow to import and rarely needed
+            from skimage.transform import resize
             in_tensor = resize(in_tensor, params.dims.shape)
         if params.transpose_out:
             in_tensor = np.transpose(in_tensor, params.transpose_out)
@@ -55,6 +57,7 @@ class InputFloat32(KernelBase):
 
 @params_type(OutputParameters)
 @qrec_type('float')
+@batch_support()
 class OutputFloat32(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -80,11 +83,12 @@ class ConstantInputFloat32(KernelBase):
         # if value_quantization is set then dequantize
         # if mutated then make a copy otherwise numpy may modify it
 
-        if params.qtype is None:
-            value = params.value if not params.is_mutated else params.value.copy()
+        if not params.is_mutated:
+            value = params.cached_value_as(qrec.out_qs[0])
+        elif params.qtype is None:
+            value = qrec.out_qs[0].quantize(params.value.copy())
         else:
-            value = params.dqvalue
-        value = qrec.out_qs[0].quantize(value)
+            value = qrec.out_qs[0].quantize(params.dqvalue)
         return qrec.get_outputs(params, [value], ktype="float")
 
 @params_type(QuantizeParameters)
@@ -196,6 +200,7 @@ class GatherAny(KernelBase):
 
 @params_type(CopyParameters)
 @qrec_type('any')
+@batch_support()
 class CopyFloat32(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -223,6 +228,7 @@ class ReverseFloat32(KernelBase):
 
 @params_type(NoOPParameters)
 @qrec_type('any')
+@batch_support()
 class NoOPFloat32(KernelBase):
     @classmethod
     def execute(cls, params,
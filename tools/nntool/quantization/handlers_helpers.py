@@ -18,7 +18,6 @@ import logging
 import numpy as np
 from iteration_utilities import duplicates
 
-from cmd2.argparse_custom import Cmd2ArgumentParser
 from graph.types import ConstantInputParameters
 from graph.types.base import Parameters
 
@@ -110,7 +109,7 @@ def get_all_options():
     return options
 
 
-def add_options_to_parser(parser: Cmd2ArgumentParser):
+def add_options_to_parser(parser):
     opts = get_all_options()
     shortcuts = [opt['shortcut'] for opt in opts.values() if 'shortcut' in opt]
     duplicate_shortcuts = set(duplicates(shortcuts))
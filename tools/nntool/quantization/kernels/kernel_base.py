@@ -24,6 +24,7 @@ from quantization.new_qrec import QRec
 class KernelBase():
     PARAMS_TYPE = None
     QREC_TYPE = None
+    BATCHED = False
 
     @classmethod
     def execute(cls, params: Parameters, in_tensors: Sequence[np.ndarray],
@@ -38,6 +39,17 @@ class KernelBase():
     def params_type(*args):
         return KernelBase.property_register("PARAMS_TYPE", args)
 
+    @staticmethod
+    def batch_support(supported=True):
+        return KernelBase.property_register("BATCHED", supported)
+
+    @classmethod
+    def can_batch(cls, params: Parameters) -> bool:
+        """Kernels that return True accept and produce tensors with an extra leading
+        batch axis. Others are executed once per sample by the KernelExecuter."""
+        del params
+        return cls.BATCHED
+
     @staticmethod
     def property_register(name, value):
 
@@ -69,3 +81,4 @@ class KernelBase():
 
 params_type = KernelBase.params_type
 qrec_type = KernelBase.qrec_type
+batch_support = KernelBase.batch_support
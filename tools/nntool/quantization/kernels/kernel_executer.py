@@ -17,11 +17,10 @@ import logging
 from typing import Sequence
 
 import numpy as np
-from graph.types import Parameters
+from graph.types import ConstantInputParameters, Parameters
 from graph.types.base import Transposable
 from quantization.handlers_helpers import get_all_subclasses
 from quantization.new_qrec import AllFloatQRec, QRec
-from sklearn.utils import Parallel
 
 # pylint: disable=wildcard-import,unused-wildcard-import
 from ..float.kernels import *  # noqa
@@ -48,22 +47,53 @@ def get_all_backend_handlers():
 HANDLERS = get_all_backend_handlers()
 
 
+def merge_details(all_details):
+    """Merge the details produced by the execution of several samples. Keys starting
+    with min or max are reduced accordingly, nested dicts are merged recursively and
+    the last value is kept for anything else."""
+    merged = {}
+    for details in all_details:
+        if not details:
+            continue
+        for key, val in details.items():
+            if key not in merged:
+                merged[key] = val
+            elif isinstance(val, dict):
+                merged[key] = merge_details([merged[key], val])
+            elif key.startswith('min'):
+                merged[key] = min(merged[key], val)
+            elif key.startswith('max'):
+                merged[key] = max(merged[key], val)
+            else:
+                merged[key] = val
+    return merged
+
+
+def batch_transpose(transpose):
+    return (0,) + tuple(idx + 1 for idx in transpose)
+
+
 class KernelExecuter():
     @classmethod
-    def execute(cls, params: Parameters, input_tensors: Sequence[np.ndarray],
-                qrec: QRec, details: str = None) -> Sequence[np.ndarray]:
+    def get_handler(cls, params: Parameters, qrec: QRec):
         if params.__class__ not in HANDLERS:
             raise ValueError(
                 f"no handlers found for {params.__class__.__name__}")
         handlers = HANDLERS[params.__class__]
-        if qrec is None:
-            qrec = AllFloatQRec()
         handler = handlers.get(qrec.ktype)
         if handler is None:
             handler = handlers.get('any')
         if handler is None:
             raise ValueError(
                 f"no handlers found for {params.__class__.__name__} quantization {qrec.ktype}")
+        return handler
+
+    @classmethod
+    def execute(cls, params: Parameters, input_tensors: Sequence[np.ndarray],
+                qrec: QRec, details: str = None) -> Sequence[np.ndarray]:
+        if qrec is None:
+            qrec = AllFloatQRec()
+        handler = cls.get_handler(params, qrec)
 
         if isinstance(params, Transposable) and params.transpose_in:
             input_tensors = [(np.transpose(in_tensor, params.transpose_in[idx]) if params.transpose_in[idx] else in_tensor)
@@ -77,3 +107,50 @@ class KernelExecuter():
             output_tensors = [(np.transpose(out_tensor, params.transpose_out[idx]) if params.transpose_out[idx] else out_tensor)
                               for idx, out_tensor in enumerate(output_tensors)]
         return output_tensors
+
+    @classmethod
+    def execute_batch(cls, params: Parameters, input_tensors: Sequence[np.ndarray],
+                      qrec: QRec, batch_size: int, details: dict = None) -> Sequence[np.ndarray]:
+        """Execute a node on tensors that carry a leading batch axis of size batch_size.
+
+        Constant inputs are executed once and broadcast (without copy) along the batch
+        axis. Kernels that support batching are called once for the whole batch. The
+        other kernels are called once per sample and their outputs stacked."""
+        if qrec is None:
+            qrec = AllFloatQRec()
+        handler = cls.get_handler(params, qrec)
+
+        if isinstance(params, ConstantInputParameters):
+            output_tensors = cls.execute(params, input_tensors, qrec, details=details)
+            return [np.broadcast_to(out_tensor, (batch_size,) + out_tensor.shape)
+                    for out_tensor in output_tensors]
+
+        if not handler.can_batch(params):
+            all_details = []
+            all_outputs = []
+            for sample_idx in range(batch_size):
+                sample_details = {} if details is not None else None
+                all_outputs.append(cls.execute(
+                    params,
+                    [in_tensor[sample_idx] if in_tensor is not None else None
+                     for in_tensor in input_tensors],
+                    qrec, details=sample_details))
+                all_details.append(sample_details)
+            if details is not None:
+                details.update(merge_details(all_details))
+            return [np.stack(out_tensors) for out_tensors in zip(*all_outputs)]
+
+        if isinstance(params, Transposable) and params.transpose_in:
+            input_tensors = [(np.transpose(in_tensor, batch_transpose(params.transpose_in[idx]))
+                              if params.transpose_in[idx] else in_tensor)
+                             for idx, in_tensor in enumerate(input_tensors)]
+
+        output_tensors = handler.execute(params, input_tensors,
+                                         qrec, details=details,
+                                         qname=qrec.ktype)
+
+        if isinstance(params, Transposable) and params.transpose_out:
+            output_tensors = [(np.transpose(out_tensor, batch_transpose(params.transpose_out[idx]))
+                               if params.transpose_out[idx] else out_tensor)
+                              for idx, out_tensor in enumerate(output_tensors)]
+        return output_tensors
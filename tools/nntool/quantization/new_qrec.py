@@ -157,8 +157,9 @@ class QRec():
         elif ktype == "symmetric" and self._auto_quantize_inputs:
             return [self.in_qs[idx].quantize(t) if t is not None else None for idx, t in enumerate(input_tensors)]
         else:
+            # read only tensors such as cached constants cannot be modified by the kernel
             input_tensors = [
-                t.copy() if t is not None else None for t in input_tensors]
+                t.copy() if t is not None and t.flags.writeable else t for t in input_tensors]
         return input_tensors
 
     def get_outputs(self,
@@ -730,39 +730,107 @@ class QType(JsonSerializable, EventEmitter):
             bits, narrow_range=narrow_range, signed=self._signed)
         return np.minimum(np.maximum(arr, qmin), qmax).astype(dtype)
 
-    def quantize(self, arr):
-        if self.is_floating or self.scale is None:
-            return arr.astype(self.dtype)
+    def _scale_and_zero_point(self, shape):
         if self.quantized_dimension is not None:
             bshape = [dim if self._quantized_dimension ==
-                      idx else 1 for idx, dim in enumerate(arr.shape)]
+                      idx else 1 for idx, dim in enumerate(shape)]
             scale = self.scale if len(
                 self.scale) == 1 else np.reshape(self.scale, bshape)
             zero_point = self.zero_point if len(
                 self.zero_point) == 1 else np.reshape(self.zero_point, bshape)
-            arr = np.floor((arr / scale) + 0.5) + zero_point
+            return scale, zero_point
+        return self.scale, self.zero_point
+
+    def _quantize_unclipped(self, arr, float_dtype=None):
+        """Returns arr quantized but not clipped in a new floating point array. If float_dtype
+        is None the dtype follows numpy's promotion of arr, scale and zero point."""
+        arr = np.asarray(arr)
+        scale, zero_point = self._scale_and_zero_point(arr.shape)
+        if float_dtype is not None and np.finfo(float_dtype).nmant + 1 < self._bits:
+            # the quantized values must be exact in the intermediate dtype
+            float_dtype = np.float64
+        if float_dtype is None:
+            # ufuncs return scalars for 0-d arrays which cannot be updated in place
+            res = np.asarray(np.divide(arr, scale))
+            work_dtype = np.result_type(res, zero_point)
         else:
-            arr = np.floor((arr / self.scale) + 0.5) + self.zero_point
+            res = np.asarray(np.divide(arr, scale.astype(float_dtype), dtype=float_dtype))
+            zero_point = zero_point.astype(float_dtype)
+            work_dtype = float_dtype
+        shape = np.broadcast_shapes(res.shape, np.shape(zero_point))
+        np.add(res, 0.5, out=res)
+        np.floor(res, out=res)
+        if res.dtype != work_dtype or res.shape != shape:
+            res = np.broadcast_to(res, shape).astype(work_dtype)
+        np.add(res, zero_point, out=res)
         if self._offset is not None:
-            arr += self._offset
-        return self.clip(arr).astype(self.dtype)
+            res += self._offset
+        return res
 
-    def dequantize(self, arr):
+    def quantize(self, arr, out=None, float_dtype=None):
+        """Quantizes arr. The result is written to out if it is given. Intermediate values
+        use float_dtype, by default the dtype numpy promotes arr and the scale to, in a
+        single temporary array."""
         if self.is_floating or self.scale is None:
-            return arr.astype(self.dtype)
+            if out is None:
+                return arr.astype(self.dtype)
+            np.copyto(out, arr, casting='unsafe')
+            return out
+        res = self._quantize_unclipped(arr, float_dtype=float_dtype)
+        np.clip(res, *self.calculate_quantized_range(self._bits, signed=self._signed), out=res)
+        if out is None:
+            return res.astype(self.dtype)[()] if res.ndim == 0 else res.astype(self.dtype)
+        np.copyto(out, res, casting='unsafe')
+        return out
+
+    def dequantize(self, arr, out=None, float_dtype=None):
+        """Dequantizes arr into an array of float_dtype, float64 by default, or into out
+        if it is given."""
+        if self.is_floating or self.scale is None:
+            if out is None:
+                return arr.astype(self.dtype)
+            np.copyto(out, arr, casting='unsafe')
+            return out
+        if float_dtype is None:
+            float_dtype = np.float64 if out is None else out.dtype
+        arr = np.asarray(arr)
         if self._offset is not None:
             arr = arr - self._offset
-        if self.quantized_dimension is not None:
-            bshape = [dim if self._quantized_dimension ==
-                      idx else 1 for idx, dim in enumerate(arr.shape)]
-            scale = self.scale if len(
-                self.scale) == 1 else np.reshape(self.scale, bshape)
-            zero_point = self.zero_point if len(
-                self.zero_point) == 1 else np.reshape(self.zero_point, bshape)
-        else:
-            scale = self.scale
-            zero_point = self.zero_point
-        return (arr.astype(np.float64) - zero_point) * scale
+        scale, zero_point = self._scale_and_zero_point(arr.shape)
+        if out is None:
+            out = np.empty(np.broadcast_shapes(arr.shape, np.shape(scale), np.shape(zero_point)),
+                           dtype=float_dtype)
+        if float_dtype != np.float64:
+            scale = scale.astype(float_dtype)
+            zero_point = zero_point.astype(float_dtype)
+        np.subtract(arr, zero_point, out=out)
+        np.multiply(out, scale, out=out)
+        return out[()] if out.ndim == 0 else out
+
+    def quantize_dequantize(self, arr, float_dtype=None):
+        """The same as dequantize(quantize(arr)) without the quantized intermediate"""
+        # removing the offset from the quantized dtype may wrap so that is not fused
+        if self.is_floating or self.scale is None or self._offset is not None:
+            return self.dequantize(self.quantize(arr, float_dtype=float_dtype),
+                                   float_dtype=float_dtype)
+        # quantize divides in the dtype numpy promotes to when none is given
+        res = self._quantize_unclipped(arr, float_dtype=float_dtype)
+        np.clip(res, *self.calculate_quantized_range(self._bits, signed=self._signed), out=res)
+        if float_dtype is None:
+            # and dequantize then works in float64
+            float_dtype = np.float64
+            res = res.astype(np.float64, copy=False)
+        scale, zero_point = self._scale_and_zero_point(np.shape(arr))
+        if res.dtype != np.float64:
+            scale = scale.astype(res.dtype)
+            zero_point = zero_point.astype(res.dtype)
+        shape = np.broadcast_shapes(res.shape, np.shape(scale))
+        if res.shape != shape:
+            res = np.broadcast_to(res, shape).copy()
+        np.subtract(res, zero_point, out=res)
+        np.multiply(res, scale, out=res)
+        res = res.astype(float_dtype, copy=False)
+        return res[()] if res.ndim == 0 else res
 
     def quantize_from(self, arr, qtype):
         return self.quantize(qtype.dequantize(arr))
@@ -814,6 +882,15 @@ class QType(JsonSerializable, EventEmitter):
             return QType(q=self.q + other.q, bits=self.bits + other.bits, signed=self.signed or other.signed)
         return QType(scale=self.scale * other.scale, bits=self.bits + other.bits, signed=self.signed or other.signed)
 
+    @property
+    def cache_key(self):
+        """Hashable snapshot of the attributes that quantize and dequantize depend on"""
+        def array_key(val):
+            return None if val is None else tuple(np.atleast_1d(val).tolist())
+        return (self._dtype, self._bits, self._signed, self._narrow_range, self._q,
+                self._quantized_dimension, array_key(self._scale),
+                array_key(self._zero_point), array_key(self._offset))
+
     def __eq__(self, other):
         if isinstance(other, QType):
             return (np.allclose(self.scale, other.scale) and
@@ -21,7 +21,8 @@ from graph.types import (HSigmoidActivationParameters,
                          ReluActivationParameters, SigmoidActivationParameters)
 from graph.types.activations import (HTanHActivationParameters,
                                      TanHActivationParameters)
-from quantization.kernels.kernel_base import KernelBase, params_type, qrec_type
+from quantization.kernels.kernel_base import (KernelBase, batch_support,
+                                              params_type, qrec_type)
 from quantization.multiplicative.mulbias import compute_in_out_scale
 from quantization.multiplicative.utils.scale import compute_scales
 from quantization.new_qrec import QRec
@@ -61,6 +62,7 @@ class LeakySymmetric(KernelBase):
 
 @params_type(LeakyActivationParameters)
 @qrec_type('scaled')
+@batch_support()
 class LeakySymmetricMult(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -93,6 +95,7 @@ def sigmoid(params,
 
 @params_type(ReluActivationParameters)
 @qrec_type('scaled')
+@batch_support()
 class ReluSymmetricMult(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -116,6 +119,7 @@ class ReluSymmetricMult(KernelBase):
 
 @params_type(ReluActivationParameters)
 @qrec_type('symmetric')
+@batch_support()
 class ReluSymmetric(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -148,6 +152,7 @@ def hsigmoid_mult_gen_factors(params, qrec):
 
 @params_type(HSigmoidActivationParameters)
 @qrec_type('scaled')
+@batch_support()
 class HSigmoidSymmetricMult(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -170,6 +175,7 @@ class HSigmoidSymmetricMult(KernelBase):
 
 @params_type(HSigmoidActivationParameters)
 @qrec_type('symmetric')
+@batch_support()
 class HSigmoidSymmetric(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -199,6 +205,7 @@ def sigmoid_mult_gen_factors(params, qrec):
 
 @params_type(HTanHActivationParameters)
 @qrec_type('symmetric')
+@batch_support()
 class HTanHSymmetric(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -216,6 +223,7 @@ class HTanHSymmetric(KernelBase):
 
 @params_type(SigmoidActivationParameters)
 @qrec_type('scaled')
+@batch_support()
 class SigmoidScaledSymmetricMult(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -237,6 +245,7 @@ class SigmoidScaledSymmetricMult(KernelBase):
 
 @params_type(SigmoidActivationParameters)
 @qrec_type('symmetric')
+@batch_support()
 class SigmoidSymmetricMult(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -263,6 +272,7 @@ class SigmoidSymmetricMult(KernelBase):
 
 @params_type(TanHActivationParameters)
 @qrec_type('scaled')
+@batch_support()
 class TanHScaledMult(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -284,6 +294,7 @@ class TanHScaledMult(KernelBase):
 
 @params_type(TanHActivationParameters)
 @qrec_type('symmetric')
+@batch_support()
 class TanHSymmetricMult(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -320,6 +331,7 @@ def hswish_mult_gen_factors(qrec):
 
 @params_type(HSwishActivationParameters)
 @qrec_type('scaled')
+@batch_support()
 class HSwishSymmetricMult(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -342,6 +354,7 @@ class HSwishSymmetricMult(KernelBase):
 
 @params_type(HSwishActivationParameters)
 @qrec_type('symmetric')
+@batch_support()
 class HSwishSymmetric(KernelBase):
     @classmethod
     def execute(cls, params,
@@ -21,6 +21,7 @@ from quantization.kernels.kernel_base import KernelBase, params_type, qrec_type
 from quantization.multiplicative.mulbias import (apply_multiplicative_bias,
                                                  apply_zero_offset_bias)
 from quantization.new_qrec import QRec
+from utils.im2col import conv2d_im2col
 
 FORCE_INT64 = False
 
@@ -37,7 +38,7 @@ class Conv2DSymmetric(KernelBase):
                 in_tensors,
                 qrec: QRec,
                 **kwargs):
-        '''3D convolution by sub-matrix summing.
+        '''3D convolution computed as a matrix multiply on the im2col view of the input
         '''
         details = kwargs.get('details')
 
@@ -85,12 +86,6 @@ class Conv2DSymmetric(KernelBase):
 
         in_w = in_dims.w
         in_h = in_dims.h
-        out_c = params.filter.out_c
-
-        in_c_per_group = in_dims.c // params.groups
-        out_c_per_group = out_c // params.groups
-        in_c_off = 0
-        out_c_cnt = 0
 
         dillated_filter_w = (params.dilation.w - 1) * (filt_w - 1) + filt_w
         dillated_filter_h = (params.dilation.h - 1) * (filt_h - 1) + filt_h
@@ -102,6 +97,73 @@ class Conv2DSymmetric(KernelBase):
             # biases = qrec.prepare_biases(params, params.biases, params.weights, ktype="symmetric")
             if acc_q != qrec.in_qs[2]:
                 biases = acc_q.expand_from(biases, qrec.in_qs[2])
+        else:
+            biases = None
+
+        if calc_q == acc_q:
+            result = cls.conv_im2col(params, in_tensor, weights, biases, acc_q,
+                                     out_h, out_w, details=details)
+        else:
+            result = cls.conv_by_slab(params, in_tensor, weights, biases, acc_q, calc_q,
+                                      (in_h, in_w, pad_h, pad_w, out_h, out_w),
+                                      details=details)
+
+        result = apply_multiplicative_bias(
+            qrec, params, result, 0, ktype="symmetric")
+
+        result = result.transpose(
+            out_dims.transpose_from_order(['c', 'h', 'w']))
+
+        if qrec.out_qs[0] != acc_q:
+            result = qrec.out_qs[0].reduce_from(result, acc_q, allow_zero_adjust=True)
+
+        return qrec.get_outputs(params, [result], ktype="symmetric")
+
+    @classmethod
+    def conv_im2col(cls, params, in_tensor, weights, biases, acc_q, out_h, out_w, details=None):
+        """Convolution as one exact integer matrix multiply. The result wraps to the
+        accumulator type exactly as an accumulation in that type would."""
+        acc_dtype = np.int64 if FORCE_INT64 else acc_q.dtype
+        conv_args = {
+            'stride': (params.stride.h, params.stride.w),
+            'dilation': (params.dilation.h, params.dilation.w),
+            'groups': params.groups
+        }
+        if biases is not None:
+            biases = biases.astype(acc_q.dtype).astype(np.int64).reshape(-1, 1, 1)
+        if details is None:
+            result = conv2d_im2col(in_tensor, weights, out_h, out_w, **conv_args)
+            if biases is not None:
+                result += biases
+            return result.astype(acc_dtype)
+
+        # the accumulator range is the range of all the partial sums after each filter tap
+        result = np.cumsum(conv2d_im2col(in_tensor, weights, out_h, out_w,
+                                         by_tap=True, **conv_args), axis=0)
+        if biases is not None:
+            result += biases
+        result = result.astype(acc_dtype)
+        details['min_acc'] = min(np.min(result), details['min_acc'])
+        details['max_acc'] = max(np.max(result), details['max_acc'])
+        return result[-1]
+
+    @classmethod
+    def conv_by_slab(cls, params, in_tensor, weights, biases, acc_q, calc_q, shapes, details=None):
+        """Convolution by sub-matrix summing. Used when the products must be reduced
+        to the accumulator type before being summed."""
+        in_h, in_w, pad_h, pad_w, out_h, out_w = shapes
+        filt_w = params.filter.w
+        filt_h = params.filter.h
+        out_c = params.filter.out_c
+        in_c_per_group = weights.shape[-1]
+        out_c_per_group = out_c // params.groups
+        in_c_off = 0
+        out_c_cnt = 0
+
+        dillated_filter_w = (params.dilation.w - 1) * (filt_w - 1) + filt_w
+        dillated_filter_h = (params.dilation.h - 1) * (filt_h - 1) + filt_h
+
+        if biases is not None:
             result = np.broadcast_to(biases.reshape(
                 out_c, 1, 1), (out_c, out_h, out_w)).copy().astype(acc_q.dtype)
         else:
@@ -112,7 +174,7 @@ class Conv2DSymmetric(KernelBase):
         const_w = pad_w + in_w - dillated_filter_w + 1
         if FORCE_INT64:
             result = result.astype(np.int64)
-        for out_c_i in range(out_dims.c):
+        for out_c_i in range(out_c):
             for cur_h in range(filt_h):
                 for cur_w in range(filt_w):
 
@@ -149,13 +211,4 @@ class Conv2DSymmetric(KernelBase):
                 out_c_cnt = 0
                 in_c_off += in_c_per_group
 
-        result = apply_multiplicative_bias(
-            qrec, params, result, 0, ktype="symmetric")
-
-        result = result.transpose(
-            out_dims.transpose_from_order(['c', 'h', 'w']))
-
-        if qrec.out_qs[0] != acc_q:
-            result = qrec.out_qs[0].reduce_from(result, acc_q, allow_zero_adjust=True)
-
-        return qrec.get_outputs(params, [result], ktype="symmetric")
+        return result
@@ -22,8 +22,8 @@ from graph.types import (MatMulOpParameters, MatrixAddParameters,
 from graph.types.expression_fusion import ExpressionFusionParameters
 from graph.types.fusions import MatScaleFusionParameters
 from graph.types.tensor_arithmetic import Broadcastable
-from quantization.kernels.kernel_base import (KernelBase, params_type,
-                                              qrec_type)
+from quantization.kernels.kernel_base import (KernelBase, batch_support,
+                                              params_type, qrec_type)
 from quantization.multiplicative.mulbias import (compute_in_out_scale,
                                                  set_add_in_scale)
 from quantization.qtype import QType
@@ -44,6 +44,10 @@ LOG = logging.getLogger("nntool." + __name__)
              MatrixMulParameters, MatrixSubParameters)
 @qrec_type('scaled')
 class PieceWiseSymmetricMult(KernelBase):
+    @classmethod
+    def can_batch(cls, params):
+        return not (isinstance(params, Broadcastable) and params.is_broadcasted)
+
     @classmethod
     def execute(cls, params,
                 in_tensors,
@@ -79,7 +83,12 @@ class PieceWiseSymmetricMult(KernelBase):
 @params_type(MatrixAddParameters, MatrixDivParameters,
              MatrixMulParameters, MatrixSubParameters)
 @qrec_type('symmetric')
+@batch_support()
 class PieceWiseSymmetric(KernelBase):
+    @classmethod
+    def can_batch(cls, params):
+        return not (isinstance(params, Broadcastable) and params.is_broadcasted)
+
     @classmethod
     def execute(cls, params,
                 in_tensors,
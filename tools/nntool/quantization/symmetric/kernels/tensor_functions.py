@@ -18,7 +18,6 @@ from graph.types import (ConstantInputParameters, InputParameters,
                          OutputParameters)
 from quantization.kernels.kernel_base import KernelBase, params_type, qrec_type
 from quantization.new_qrec import QRec
-from skimage.transform import resize
 
 
 @params_type(InputParameters)
@@ -42,6 +41,8 @@ class InputSymmetric(KernelBase):
                         f'{params.name} received input of shape {in_tensor.shape} but expecting {params.dims.shape}')
             in_tensor = in_tensor.reshape(params.dims.shape)
         else:
+            # skimage is slow to import and rarely needed
+            from skimage.transform import resize
             in_tensor = resize(in_tensor, params.dims.shape)
         if params.transpose_out:
             in_tensor = np.transpose(in_tensor, params.transpose_out)
@@ -73,4 +74,4 @@ class ConstantInputSymmetric(KernelBase):
                 qrec: QRec,
                 **kwargs):
         del in_tensors
-        return [params.value_as(qrec.out_qs[0])]
+        return [params.cached_value_as(qrec.out_qs[0])]
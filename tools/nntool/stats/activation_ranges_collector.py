@@ -27,21 +27,42 @@ from utils.node_id import NodeId
 from .stats_collector import GraphStatsCollector
 
 
-def update_peraxis(var, arr: np.ndarray):
+def update_peraxis(var, arr: np.ndarray, batched=False):
+    # if batched then the first axis of arr is the batch axis which is reduced with all the others
+    shape = arr.shape[1:] if batched else arr.shape
     per_axis = var.get('per_axis')
     if not per_axis:
         per_axis = [{'min': np.array(
-            [float('inf')] * sz), 'max': np.array(float('-inf') * sz)} for sz in arr.shape]
+            [float('inf')] * sz), 'max': np.array(float('-inf') * sz)} for sz in shape]
         var['per_axis'] = per_axis
-    for i, _ in enumerate(arr.shape):
+    for i, _ in enumerate(shape):
         per_axis_elem = per_axis[i]
-        other_axis = tuple(j for j in range(len(arr.shape)) if i != j)
+        axis = i + 1 if batched else i
+        other_axis = tuple(j for j in range(len(arr.shape)) if axis != j)
         per_axis_elem['min'] = np.minimum(
             per_axis_elem['min'], arr.min(axis=other_axis))
         per_axis_elem['max'] = np.maximum(
             per_axis_elem['max'], arr.max(axis=other_axis))
 
 
+def merge_range(range_stat, other):
+    range_stat['min'] = min(range_stat['min'], other['min'])
+    range_stat['max'] = max(range_stat['max'], other['max'])
+
+
+def merge_peraxis(var, other):
+    other_per_axis = other.get('per_axis')
+    if not other_per_axis:
+        return
+    per_axis = var.get('per_axis')
+    if not per_axis:
+        var['per_axis'] = deepcopy(other_per_axis)
+        return
+    for per_axis_elem, other_elem in zip(per_axis, other_per_axis):
+        per_axis_elem['min'] = np.minimum(per_axis_elem['min'], other_elem['min'])
+        per_axis_elem['max'] = np.maximum(per_axis_elem['max'], other_elem['max'])
+
+
 def update_ema(ema, value, decay):
     ema = value * decay + (1 - decay) * ema
     return ema
@@ -90,7 +111,50 @@ class ActivationRangesCollector(GraphStatsCollector):
             range_out['min'] = min(range_out['min'], tensor_min)
             range_out['max'] = max(range_out['max'], tensor_max)
 
-    def collect_stats(self, G, input_tensors, step_idx=None):
+    def merge(self, other: 'ActivationRangesCollector'):
+        """Merge the ranges collected by another collector on the same graph into this one.
+        Merging collectors that have seen consecutive parts of a set of inputs, in order,
+        gives the same ranges as collecting all the inputs with one collector. EMA ranges
+        cannot be merged in this way."""
+        # range_in entries are the range_out entries of the producing nodes. Stats
+        # copied from other must refer to the range_out entries of this collector.
+        memo = {}
+        for key, other_stat in other.stats.items():
+            stat = self.stats.get(key)
+            if stat is None:
+                continue
+            for range_out, other_range_out in zip(stat['range_out'], other_stat['range_out']):
+                memo[id(other_range_out)] = range_out
+
+        for key, other_stat in other.stats.items():
+            stat = self.stats.get(key)
+            if stat is None:
+                self.stats[key] = deepcopy(other_stat, memo)
+                continue
+            for range_out, other_range_out in zip(stat['range_out'], other_stat['range_out']):
+                merge_range(range_out, other_range_out)
+                # std is the one of the last tensor seen
+                if other_range_out['min'] != float('inf'):
+                    range_out['std'] = other_range_out['std']
+                merge_peraxis(range_out, other_range_out)
+            for name in ['range_acc', 'range_pre_mul_bias', 'range_state', 'range_cell']:
+                if name not in other_stat:
+                    continue
+                if name in stat:
+                    merge_range(stat[name], other_stat[name])
+                else:
+                    stat[name] = deepcopy(other_stat[name])
+            if 'expression' in other_stat:
+                if 'expression' in stat:
+                    self.update_expression_ranges(stat, other_stat['expression'])
+                else:
+                    stat['expression'] = deepcopy(other_stat['expression'])
+        return self
+
+    def collect_stats(self, G, input_tensors, step_idx=None, batch_size=None):
+        """Collect the ranges produced by executing input_tensors. If batch_size is set
+        then each input tensor has a leading batch axis and the whole batch is executed
+        in one pass."""
         if self._graph_execution is None:
             if G.has_quantized_parameters:
                 quantization = G.quantization
@@ -102,8 +166,10 @@ class ActivationRangesCollector(GraphStatsCollector):
             graph_execution = self._graph_execution
 
         limit = step_idx[0] if isinstance(step_idx, tuple) else step_idx
+        exec_args = {} if batch_size is None else {'batch_size': batch_size}
         for _, pnode, fnode, output_tensors, details in\
-                graph_execution(input_tensors, step_idx_limit=limit, yield_fusions=True, yield_details=True):
+                graph_execution(input_tensors, step_idx_limit=limit, yield_fusions=True,
+                                yield_details=True, **exec_args):
             key = NodeId(pnode, fnode)
             node = (pnode if fnode is None else fnode)
             stat = self.stats.get(key)
@@ -147,7 +213,7 @@ class ActivationRangesCollector(GraphStatsCollector):
                 range_out = stat['range_out'][idx]
                 self.update_ranges(range_out, tensor.min(), tensor.max())
                 range_out['std'] = np.std(tensor)
-                update_peraxis(range_out, tensor)
+                update_peraxis(range_out, tensor, batched=batch_size is not None)
 
             if isinstance(node, FilterParameters):
                 if details:
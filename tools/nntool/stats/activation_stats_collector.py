@@ -14,25 +14,29 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from collections import OrderedDict
-from typing import Mapping, Sequence
+from typing import Mapping
 
 from execution.graph_executer import GraphExecuter
 from graph.types import FilterParameters, InputParameters, MultiplicativeBiasParameters
 from utils.node_id import NodeId
 from utils.stats_funcs import astats, calculate_qsnrs
 
+from .running_stats import RunningStat
 from .stats_collector import ReductionStatsCollector
 
 
-def gather_stats(activation, force_ideal=False, channel_dim=None, channel_details=None):
-    stat = astats(activation, channel_dim=channel_dim, channel_details=channel_details)
+def gather_stats(activation, force_ideal=False, channel_dim=None, channel_details=None,
+                 quantile_samples=None):
+    stat = astats(activation, channel_dim=channel_dim, channel_details=channel_details,
+                  quantile_samples=quantile_samples)
     stat['qstats'] = calculate_qsnrs(activation, stat['ibits'], force_ideal)
     return stat
 
 class ActivationStatsCollector(ReductionStatsCollector):
-    def __init__(self, graph_execution=None):
+    def __init__(self, graph_execution=None, quantile_samples=None):
         super(ActivationStatsCollector, self).__init__()
         self._graph_execution = graph_execution
+        self._quantile_samples = quantile_samples
 
     def _collect(self, G, input_tensors, step_idx):
         if self._graph_execution is None:
@@ -60,7 +64,8 @@ class ActivationStatsCollector(ReductionStatsCollector):
             stat = gather_stats(output_tensors[0],
                                 force_ideal=not isinstance(node, InputParameters),
                                 channel_dim=channel_dim,
-                                channel_details=step_idx is not None)
+                                channel_details=step_idx is not None,
+                                quantile_samples=self._quantile_samples)
             if isinstance(node, FilterParameters) and details:
                 stat['min_acc'] = details['min_acc']
                 stat['max_acc'] = details['max_acc']
@@ -72,60 +77,52 @@ class ActivationStatsCollector(ReductionStatsCollector):
 
         return stats
 
-    def _reduce_prepare(self, all_stats: Sequence[Mapping]):
-        stats = all_stats.pop()
+    def _reduce_prepare(self, stats: Mapping):
         for stat in stats.values():
             for field in ['mean', 'std', 'avg_prec']:
-                if field in stat:
-                    stat[field] = [stat[field]]
-                else:
-                    stat[field] = []
+                stat[field] = RunningStat(stat.get(field))
                 if 'channel_stats' in stat:
                     for cstat in stat['channel_stats']:
-                        if field in cstat:
-                            cstat[field] = [cstat[field]]
-                        else:
-                            cstat[field] = []
+                        cstat[field] = RunningStat(cstat.get(field))
         return stats
 
     @staticmethod
-    def reduce_elem(base, stat):
-        if stat['ibits'] > base['ibits']:
-            base['qstats'] = stat['qstats']
-            base['ibits'] = stat['ibits']
-            base['size'] = stat['size']
-        base['max'] = max(base['max'], stat['max'])
-        base['min'] = min(base['min'], stat['min'])
+    def merge_elem(base, other):
+        # on equal integer bits the qstats of the latest sample are kept
+        if other['ibits'] >= base['ibits']:
+            base['qstats'] = other['qstats']
+            base['ibits'] = other['ibits']
+            base['size'] = other['size']
+        # outlier information is not reduced and is the one of the latest sample
+        for field in ['wols', 'sols', 'min_out', 'max_out']:
+            if field in other:
+                base[field] = other[field]
+        base['max'] = max(base['max'], other['max'])
+        base['min'] = min(base['min'], other['min'])
         for field in ['mean', 'std', 'avg_prec']:
-            if field in stat:
-                base[field].append(stat[field])
+            base[field].merge(other[field])
 
-        if 'min_acc' in stat:
-            base['min_acc'] = min(stat['min_acc'], base['min_acc'])
-            base['max_acc'] = max(stat['max_acc'], base['max_acc'])
-
-        if 'min_pre_mul_bias' in stat:
-            stat['min_pre_mul_bias'] = min(stat['min_pre_mul_bias'], base['min_pre_mul_bias'])
-            stat['max_pre_mul_bias'] = max(stat['max_pre_mul_bias'], base['min_pre_mul_bias'])
-
-    def _reduce(self, _, base: Mapping, stat: Mapping):
-        self.reduce_elem(base, stat)
-        if 'channel_stats' in stat:
-            for chan, cstat in enumerate(stat['channel_stats']):
-                self.reduce_elem(base['channel_stats'][chan], cstat)
+        for field in ['acc', 'pre_mul_bias']:
+            if 'min_' + field not in other:
+                continue
+            if 'min_' + field in base:
+                base['min_' + field] = min(other['min_' + field], base['min_' + field])
+                base['max_' + field] = max(other['max_' + field], base['max_' + field])
+            else:
+                base['min_' + field] = other['min_' + field]
+                base['max_' + field] = other['max_' + field]
 
+    def _merge(self, _, base: Mapping, other: Mapping):
+        self.merge_elem(base, other)
+        if 'channel_stats' in other:
+            for chan, cstat in enumerate(other['channel_stats']):
+                self.merge_elem(base['channel_stats'][chan], cstat)
 
     def _reduce_finalize(self, stats: Mapping):
         for stat in stats.values():
             for field in ['mean', 'std', 'avg_prec']:
-                if len(stat[field]) > 0:
-                    stat[field] = sum(stat[field]) / len(stat[field])
-                else:
-                    stat[field] = None
+                stat[field] = stat[field].mean
                 if 'channel_stats' in stat:
                     for cstat in stat['channel_stats']:
-                        if len(cstat[field]) > 0:
-                            cstat[field] = sum(cstat[field]) / len(cstat[field])
-                        else:
-                            cstat[field] = None
+                        cstat[field] = cstat[field].mean
         return stats
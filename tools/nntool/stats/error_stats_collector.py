@@ -25,26 +25,33 @@ from utils.node_id import NodeId
 from execution.graph_executer import GraphExecuter
 from execution.quantization_mode import QuantizationMode
 
+from stats.running_stats import RunningStat
 from stats.stats_collector import ReductionStatsCollector
 
 LOG = logging.getLogger('nntool.' + __name__)
 
 
 class ErrorStatsCollector(ReductionStatsCollector):
-    def __init__(self, limit=None, quant_compare=False):
+    def __init__(self, limit=None, quant_compare=False, execution_cache=None,
+                 float_dtype=None, precision_compare=False):
         super().__init__()
         self._limit = limit
         self._quant_compare = quant_compare
+        self._execution_cache = execution_cache
+        self._float_dtype = float_dtype
+        # compare quantized execution in float_dtype against the float64 reference
+        self._precision_compare = precision_compare
 
     def _prepare(self, G):
         pass
 
-    def _collect_execution(self, executer, tensors, qrecs, qmode=None):
+    def _collect_execution(self, executer, tensors, qrecs, qmode=None, batch_size=None):
         del qrecs
         outputs = []
         fusion_outputs = []
         for step_idx, pnode, fnode, output, details in\
-                executer.execute_iterator(tensors, step_idx_limit=self._limit, qmode=qmode):
+                executer.execute_iterator(tensors, step_idx_limit=self._limit, qmode=qmode,
+                                          batch_size=batch_size):
 
             if fnode:
                 fusion_outputs.append({
@@ -70,11 +77,14 @@ class ErrorStatsCollector(ReductionStatsCollector):
         return outputs
 
     @staticmethod
-    def _collect_one(fstat, qstat, qrec, quant_compare=False):
+    def _collect_one(fstat, qstat, qrec, quant_compare=False, sample_idx=None):
         fout = fstat['output'][0]
-        if quant_compare:
-            fout = qrec.out_qs[0].dequantize(qrec.out_qs[0].quantize(fout))
         qout = qstat['output'][0]
+        if sample_idx is not None:
+            fout = fout[sample_idx]
+            qout = qout[sample_idx]
+        if quant_compare:
+            fout = qrec.out_qs[0].quantize_dequantize(fout)
         error_ = np.abs(fout - qout)
         node = fstat['node']
 
@@ -91,19 +101,45 @@ class ErrorStatsCollector(ReductionStatsCollector):
 
         return stat
 
-    def _collect(self, G, input_tensors, step_idx) -> Mapping[NodeId, Mapping]:
-        LOG.debug("gather quantization statistics")
-        if G.has_quantized_parameters:
-            quantization = G.quantization
+    def _execute_float_and_quantized(self, G, input_tensors, batch_size=None):
+        if self._precision_compare:
+            executer = GraphExecuter(G, qrecs=G.quantization, cache=self._execution_cache)
+            foutputs = self._collect_execution(executer,
+                                               input_tensors,
+                                               G.quantization,
+                                               qmode=QuantizationMode.all_dequantize(),
+                                               batch_size=batch_size)
         else:
-            quantization = None
-        executer = GraphExecuter(G, qrecs=quantization)
-        foutputs = self._collect_execution(executer, input_tensors, quantization)
-        executer = GraphExecuter(G, qrecs=G.quantization)
+            if G.has_quantized_parameters:
+                quantization = G.quantization
+            else:
+                quantization = None
+            executer = GraphExecuter(G, qrecs=quantization, cache=self._execution_cache)
+            foutputs = self._collect_execution(executer, input_tensors, quantization,
+                                               batch_size=batch_size)
+        executer = GraphExecuter(G, qrecs=G.quantization, cache=self._execution_cache)
+        qmode = QuantizationMode.all_dequantize()
+        qmode.float_dtype = self._float_dtype
         qoutputs = self._collect_execution(executer,
                                            input_tensors,
                                            G.quantization,
-                                           qmode=QuantizationMode.all_dequantize())
+                                           qmode=qmode,
+                                           batch_size=batch_size)
+        return foutputs, qoutputs
+
+    def _collect(self, G, input_tensors, step_idx) -> Mapping[NodeId, Mapping]:
+        LOG.debug("gather quantization statistics")
+        foutputs, qoutputs = self._execute_float_and_quantized(G, input_tensors)
+        return self._compare_outputs(G, foutputs, qoutputs)
+
+    def _collect_batch(self, G, input_tensors, step_idx, batch_size):
+        LOG.debug("gather quantization statistics on batch of %s", batch_size)
+        foutputs, qoutputs = self._execute_float_and_quantized(G, input_tensors,
+                                                               batch_size=batch_size)
+        return [self._compare_outputs(G, foutputs, qoutputs, sample_idx=sample_idx)
+                for sample_idx in range(batch_size)]
+
+    def _compare_outputs(self, G, foutputs, qoutputs, sample_idx=None):
         stats = OrderedDict()
         for idx, fstat in enumerate(foutputs):
             qstat = qoutputs[idx]
@@ -114,41 +150,35 @@ class ErrorStatsCollector(ReductionStatsCollector):
                         self._collect_one(ffstat,
                                           qstat['fusion_outputs'][jdx],
                                           G.quantization[nid],
-                                          quant_compare=self._quant_compare)
+                                          quant_compare=self._quant_compare,
+                                          sample_idx=sample_idx)
             nid = NodeId(fstat['node'], None)
             stats[nid] = self._collect_one(fstat,
                                            qstat,
                                            G.quantization[nid],
-                                           quant_compare=self._quant_compare)
+                                           quant_compare=self._quant_compare,
+                                           sample_idx=sample_idx)
 
         return stats
 
-    def _reduce_prepare(self, all_stats):
-        stats = all_stats.pop()
+    def _reduce_prepare(self, stats):
         for stat in stats.values():
-            stat['min_qsnr'] = stat['qsnr']
-            stat['max_qsnr'] = stat['qsnr']
-            stat['min_cos'] = stat['cos']
-            stat['max_cos'] = stat['cos']
             for field in ['av_err', 'qsnr', 'cos']:
-                stat[field] = [stat[field]]
-
+                stat[field] = RunningStat(stat[field])
         return stats
 
-    def _reduce(self, _, base: Mapping, stat: Mapping):
+    def _merge(self, _, base: Mapping, other: Mapping):
         for k in ['av_err', 'qsnr', 'cos']:
-            base[k].append(stat[k])
-        for k in [('max_err', 'max_err')]:
-            base[k[0]] = max(base[k[0]], abs(stat[k[1]]))
-        for k in [('min_err', 'min_err')]:
-            base[k[0]] = min(base[k[0]], abs(stat[k[1]]))
-        for k in [('max_qsnr', 'qsnr'), ('max_cos', 'cos')]:
-            base[k[0]] = max(base[k[0]], stat[k[1]])
-        for k in [('min_qsnr', 'qsnr', ('min_cos', 'cos'))]:
-            base[k[0]] = min(base[k[0]], stat[k[1]])
+            base[k].merge(other[k])
+        base['max_err'] = max(abs(base['max_err']), abs(other['max_err']))
+        base['min_err'] = min(abs(base['min_err']), abs(other['min_err']))
 
     def _reduce_finalize(self, stats: Mapping) -> Mapping:
         for stat in stats.values():
+            for field, min_field, max_field in [('qsnr', 'min_qsnr', 'max_qsnr'),
+                                                ('cos', 'min_cos', 'max_cos')]:
+                stat[min_field] = stat[field].min
+                stat[max_field] = stat[field].max
             for field in ['av_err', 'qsnr', 'cos']:
-                stat[field] = sum(stat[field]) / len(stat[field])
+                stat[field] = stat[field].mean
         return stats
@@ -0,0 +1,94 @@
+# Copyright (C) 2020  GreenWaves Technologies, SAS
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+
+class RunningStat():
+    """Constant memory accumulator of a stream of scalars or of equally shaped arrays.
+
+    Keeps the count, sum, minimum and maximum. Two accumulators can be merged which
+    gives the same result as accumulating both streams in one."""
+
+    def __init__(self, value=None):
+        self._count = 0
+        self._sum = None
+        self._min = None
+        self._max = None
+        if value is not None:
+            self.update(value)
+
+    @staticmethod
+    def _as_value(value):
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return np.array(value, dtype=np.float64)
+        return value
+
+    def update(self, value):
+        value = self._as_value(value)
+        self._count += 1
+        if self._count == 1:
+            self._sum = value
+            self._min = value
+            self._max = value
+            return self
+        self._sum = self._sum + value
+        self._min = np.minimum(self._min, value) if isinstance(
+            value, np.ndarray) else min(self._min, value)
+        self._max = np.maximum(self._max, value) if isinstance(
+            value, np.ndarray) else max(self._max, value)
+        return self
+
+    def merge(self, other: 'RunningStat'):
+        if other.count == 0:
+            return self
+        if self._count == 0:
+            self._count = other.count
+            self._sum = other.sum
+            self._min = other.min
+            self._max = other.max
+            return self
+        self._count += other.count
+        self._sum = self._sum + other.sum
+        self._min = np.minimum(self._min, other.min) if isinstance(
+            self._min, np.ndarray) else min(self._min, other.min)
+        self._max = np.maximum(self._max, other.max) if isinstance(
+            self._max, np.ndarray) else max(self._max, other.max)
+        return self
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def sum(self):
+        return self._sum
+
+    @property
+    def mean(self):
+        if not self._count:
+            return None
+        return self._sum / self._count
+
+    @property
+    def min(self):
+        return self._min
+
+    @property
+    def max(self):
+        return self._max
+
+    def __repr__(self) -> str:
+        return f"RunningStat(count={self._count}, mean={self.mean}, min={self._min}, max={self._max})"
@@ -14,6 +14,8 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from copy import deepcopy
 from typing import Mapping, Sequence
 
 from utils.node_id import NodeId
@@ -48,8 +50,12 @@ class GraphStatsCollector(ABC):
         pass
 
 class ReductionStatsCollector(GraphStatsCollector):
+    """Collects stats on each input and reduces them as they are collected so that
+    memory use does not depend on the number of inputs. Partial reductions of several
+    collectors can be combined with merge."""
+
     def __init__(self):
-        self._collected_stats = []
+        self._reduced_stats = None
         self._fusion_cnt = None
 
     @abstractmethod
@@ -57,23 +63,48 @@ class ReductionStatsCollector(GraphStatsCollector):
         pass
 
     def reduce_stats(self):
-        base = self._reduce_prepare(self._collected_stats)
-        for stat in self._collected_stats:
-            for key, level in stat.items():
-                self._reduce(key, base[key], level)
-        return self._reduce_finalize(base)
+        if self._reduced_stats is None:
+            return OrderedDict()
+        return self._reduce_finalize(deepcopy(self._reduced_stats))
+
+    def merge(self, other: 'ReductionStatsCollector'):
+        """Merge the stats reduced by another collector of the same type into this one"""
+        if other._reduced_stats is None:
+            return self
+        if self._reduced_stats is None:
+            self._reduced_stats = deepcopy(other._reduced_stats)
+            return self
+        for key, other_base in other._reduced_stats.items():
+            base = self._reduced_stats.get(key)
+            if base is None:
+                self._reduced_stats[key] = deepcopy(other_base)
+            else:
+                self._merge(key, base, other_base)
+        return self
+
+    def _reduce_stat(self, stat: Mapping[NodeId, Mapping]):
+        prepared = self._reduce_prepare(deepcopy(stat))
+        if self._reduced_stats is None:
+            self._reduced_stats = prepared
+            return
+        for key, level in prepared.items():
+            base = self._reduced_stats.get(key)
+            if base is None:
+                self._reduced_stats[key] = level
+            else:
+                self._merge(key, base, level)
 
     @abstractmethod
-    def _reduce_prepare(self, all_stats: Sequence[Mapping[NodeId, Mapping]])\
+    def _reduce_prepare(self, stats: Mapping[NodeId, Mapping])\
         -> Mapping[NodeId, Mapping]:
-        pass
+        """Transform the stats of one input into a partial reduction"""
 
     @abstractmethod
-    def _reduce(self,
-                key: NodeId,
-                base: Mapping[NodeId, Mapping],
-                stat: Mapping[NodeId, Mapping]):
-        pass
+    def _merge(self,
+               key: NodeId,
+               base: Mapping,
+               other: Mapping):
+        """Merge the partial reduction other into base"""
 
     @abstractmethod
     def _reduce_finalize(self, stats: Mapping) -> Mapping[NodeId, Mapping]:
@@ -92,7 +123,18 @@ class ReductionStatsCollector(GraphStatsCollector):
             return step_idx[1] == self._fusion_cnt
         return step_idx == node.step_idx and fnode is None
 
-    def collect_stats(self, G, input_tensors, step_idx=None):
-        stat = self._collect(G, input_tensors, step_idx)
-        self._collected_stats.append(stat)
-        return stat
+    def _collect_batch(self, G, input_tensors, step_idx, batch_size) -> Sequence[Mapping[NodeId, Mapping]]:
+        """Collect the stats of each sample of a batch. Collectors that can execute the
+        whole batch in one pass override this."""
+        return [self._collect(G, [in_tensor[idx] for in_tensor in input_tensors], step_idx)
+                for idx in range(batch_size)]
+
+    def collect_stats(self, G, input_tensors, step_idx=None, batch_size=None):
+        if batch_size is None:
+            stat = self._collect(G, input_tensors, step_idx)
+            self._reduce_stat(stat)
+            return stat
+        stats = self._collect_batch(G, input_tensors, step_idx, batch_size)
+        for stat in stats:
+            self._reduce_stat(stat)
+        return stats
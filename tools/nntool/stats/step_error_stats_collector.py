@@ -25,6 +25,7 @@ from utils.node_id import NodeId
 
 from execution.graph_executer import GraphExecuter
 
+from .running_stats import RunningStat
 from .stats_collector import ReductionStatsCollector
 
 LOG = logging.getLogger('nntool.' + __name__)
@@ -129,29 +130,17 @@ class StepErrorStatsCollector(ReductionStatsCollector):
 
         return stats
 
-    def _reduce_prepare(self, all_stats):
-        stats = all_stats.pop()
+    def _reduce_prepare(self, stats):
         for stat in stats.values():
-            stat['min_qsnr'] = stat['qsnr']
-            stat['max_qsnr'] = stat['qsnr']
-            stat['min_cos'] = stat['cos']
-            stat['max_cos'] = stat['cos']
             for field in ['av_err', 'qsnr', 'chan_err', 'cos']:
-                stat[field] = [stat[field]]
-
+                stat[field] = RunningStat(stat[field])
         return stats
 
-    def _reduce(self, _, base: Mapping, stat: Mapping):
+    def _merge(self, _, base: Mapping, other: Mapping):
         for k in ['av_err', 'qsnr', 'chan_err', 'cos']:
-            base[k].append(stat[k])
-        for k in [('max_err', 'max_err')]:
-            base[k[0]] = max(base[k[0]], abs(stat[k[1]]))
-        for k in [('min_err', 'min_err')]:
-            base[k[0]] = min(base[k[0]], abs(stat[k[1]]))
-        for k in [('max_qsnr', 'qsnr'), ('max_cos', 'cos')]:
-            base[k[0]] = max(base[k[0]], stat[k[1]])
-        for k in [('min_qsnr', 'qsnr'), ('min_cos', 'cos')]:
-            base[k[0]] = min(base[k[0]], stat[k[1]])
+            base[k].merge(other[k])
+        base['max_err'] = max(abs(base['max_err']), abs(other['max_err']))
+        base['min_err'] = min(abs(base['min_err']), abs(other['min_err']))
 
     @staticmethod
     def _max_abs(l):
@@ -164,8 +153,12 @@ class StepErrorStatsCollector(ReductionStatsCollector):
 
     def _reduce_finalize(self, stats: Mapping) -> Mapping:
         for stat in stats.values():
+            for field, min_field, max_field in [('qsnr', 'min_qsnr', 'max_qsnr'),
+                                                ('cos', 'min_cos', 'max_cos')]:
+                stat[min_field] = stat[field].min
+                stat[max_field] = stat[field].max
             for field in ['av_err', 'qsnr', 'cos']:
-                stat[field] = sum(stat[field]) / len(stat[field])
-            stat['chan_err'] = [sum(i) for i in zip(*stat['chan_err'])]
+                stat[field] = stat[field].mean
+            stat['chan_err'] = np.atleast_1d(stat['chan_err'].sum).tolist()
             stat['max_chan_err'] = self._max_abs(stat['chan_err'])
         return stats
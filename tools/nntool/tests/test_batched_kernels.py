@@ -0,0 +1,38 @@
+# Copyright (C) 2020  GreenWaves Technologies, SAS
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+
+from graph.types import MatrixAddParameters, MatrixMulParameters
+from quantization.kernels.kernel_executer import KernelExecuter
+from quantization.new_qrec import QRec
+from quantization.qtype import QType
+
+
+@pytest.mark.parametrize("params_class", [MatrixAddParameters, MatrixMulParameters])
+@pytest.mark.parametrize("batch_size", [2, 4])
+def test_pow2_broadcast_piecewise_batched(params_class, batch_size):
+    params = params_class("op")
+    params.set_broadcast([[2, 4, 5], [5]])
+    qrec = QRec.symmetric(in_qs=[QType.Pow2(8, 5, True), QType.Pow2(8, 6, True)],
+                          out_qs=[QType.Pow2(8, 4, True)])
+    rng = np.random.default_rng(0)
+    in1 = rng.integers(-128, 128, (batch_size, 2, 4, 5)).astype(np.int8)
+    in2 = rng.integers(-128, 128, (batch_size, 5)).astype(np.int8)
+    batched = KernelExecuter.execute_batch(params, [in1, in2], qrec, batch_size)
+    for sample_idx in range(batch_size):
+        single = KernelExecuter.execute(params, [in1[sample_idx], in2[sample_idx]], qrec)
+        np.testing.assert_array_equal(batched[0][sample_idx], single[0])
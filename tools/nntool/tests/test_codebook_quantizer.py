@@ -0,0 +1,63 @@
+# Copyright (C) 2020  GreenWaves Technologies, SAS
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+
+from utils.codebook_quantizer import CodebookQuantizer
+
+
+def squared_error(values, centers, quantizer):
+    return float(((values - centers[quantizer.codes(centers)]) ** 2).sum())
+
+
+@pytest.mark.parametrize("seed", [7, 9, 12, 13])
+def test_kmeans_offset_values(seed):
+    values = 1e6 + np.random.default_rng(seed).random(5000) * 1e-3
+    quantizer = CodebookQuantizer(values)
+    inertias = []
+    for bits in range(1, 9):
+        centers, _, inertia = quantizer.kmeans(1 << bits)
+        assert np.all(np.diff(centers) > 0)
+        assert inertia == pytest.approx(squared_error(values, centers, quantizer), rel=1e-6)
+        inertias.append(inertia)
+    assert np.all(np.diff(inertias) < 0)
+    assert inertias[1] < 5e-5
+
+
+@pytest.mark.parametrize("num_unique", [300, 2000])
+def test_kmeans_against_sklearn(num_unique):
+    rng = np.random.default_rng(0)
+    values = rng.choice(rng.laplace(0, 0.02, num_unique), 3000).astype(np.float32)
+    quantizer = CodebookQuantizer(values)
+    assert (quantizer.num_unique > 512) == (num_unique > 512)
+    for bits in range(2, 6):
+        centers, splits, inertia = quantizer.kmeans(1 << bits)
+        assert inertia == pytest.approx(squared_error(values, centers, quantizer), rel=1e-6)
+        kmeans = KMeans(1 << bits, n_init=10, random_state=0).fit(
+            values.reshape(-1, 1).astype(np.float64))
+        assert inertia <= kmeans.inertia_ * (1 + 1e-6)
+        assert quantizer.silhouette(splits) == pytest.approx(
+            silhouette_score(values.reshape(-1, 1), quantizer.codes(centers)), abs=1e-5)
+
+
+def test_kmeans_fewer_unique_than_bins():
+    quantizer = CodebookQuantizer(np.array([3, 1, 1, 2], dtype=np.int8))
+    centers, splits, inertia = quantizer.kmeans(4)
+    assert list(centers) == [1, 2, 3, 3]
+    assert list(splits) == [0, 1, 2, 3]
+    assert inertia == 0
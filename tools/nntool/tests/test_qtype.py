@@ -0,0 +1,58 @@
+# Copyright (C) 2020  GreenWaves Technologies, SAS
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+
+from quantization.qtype import QType
+
+
+def float32_ties(rng, scale, count):
+    """Values that are half way between two quantized values when divided by scale in
+    float32"""
+    steps = rng.integers(-120, 120, count) + 0.5
+    return (steps * scale).astype(np.float32)
+
+
+@pytest.mark.parametrize("zero_point", [0, 3])
+def test_quantize_dequantize_float32_ties(zero_point):
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        scale = np.float32(rng.uniform(1e-3, 1))
+        qtype = QType(bits=8, scale=scale, zero_point=zero_point, dtype=np.int8)
+        arr = float32_ties(rng, scale, 8)
+        np.testing.assert_array_equal(qtype.quantize_dequantize(arr),
+                                      qtype.dequantize(qtype.quantize(arr)))
+
+
+def test_quantize_dequantize_float32_ties_per_channel():
+    rng = np.random.default_rng(1)
+    scale = rng.uniform(1e-3, 1, 16).astype(np.float32)
+    qtype = QType(bits=8, scale=scale, zero_point=0, dtype=np.int8, quantized_dimension=0)
+    arr = float32_ties(rng, scale.reshape(16, 1), (16, 50))
+    np.testing.assert_array_equal(qtype.quantize_dequantize(arr),
+                                  qtype.dequantize(qtype.quantize(arr)))
+
+
+@pytest.mark.parametrize("float_dtype", [None, np.float32])
+def test_quantize_dequantize(float_dtype):
+    rng = np.random.default_rng(2)
+    qtype = QType(bits=16, scale=np.float32(1e-3), zero_point=0, dtype=np.int16)
+    arr = rng.normal(0, 20, (8, 32)).astype(np.float32)
+    res = qtype.quantize_dequantize(arr, float_dtype=float_dtype)
+    assert res.dtype == (np.float64 if float_dtype is None else float_dtype)
+    np.testing.assert_array_equal(
+        res, qtype.dequantize(qtype.quantize(arr, float_dtype=float_dtype),
+                              float_dtype=float_dtype))
@@ -0,0 +1,285 @@
+# Copyright (C) 2020  GreenWaves Technologies, SAS
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+
+def codebook_lookup(values, codebook):
+    """Returns the index of the nearest entry in codebook for each of values.
+
+    Where the codebook contains duplicates the lowest index is returned."""
+    entries, first = np.unique(codebook, return_index=True)
+    if entries.size == 1:
+        return np.zeros(np.shape(values), dtype=np.intp)
+    entries = entries.astype(np.float64)
+    midpoints = (entries[:-1] + entries[1:]) / 2
+    return first[np.searchsorted(midpoints, values, side='left')]
+
+
+# histograms with up to this many unique values are clustered optimally. larger ones are
+# clustered optimally on this many ranges of values and then refined
+EXACT_MAX_UNIQUE = 512
+# the clusters are then refined by moving each split up to this many unique values
+MOVE_WINDOW = 32
+# and by splitting clusters in two at the best of up to this many points
+SPLIT_POINTS = 256
+# ranges the density of the values is estimated on to place the ranges of a large histogram
+DENSITY_RANGES = 4096
+
+
+class CodebookQuantizer():
+    """1-D k-means on the sorted histogram of the unique values of a tensor.
+
+    Clusters of sorted 1-D values are contiguous ranges of the histogram so the error of
+    any cluster is given by the prefix sums of the counts. Small histograms are clustered
+    optimally by dynamic programming. Larger ones are clustered optimally on ranges of
+    the histogram spread like the clusters of an optimal quantizer and then refined with
+    Lloyd's algorithm run on the cluster ranges, by moving the splits and by merging and
+    splitting clusters. The dynamic programming keeps its state so evaluating all the bit
+    widths costs about the same as the largest one."""
+
+    def __init__(self, values):
+        self._uniques, self._inverse, counts = np.unique(
+            np.asarray(values).flatten(), return_inverse=True, return_counts=True)
+        weights = counts.astype(np.float64)
+        # the prefix sums are taken around the mean so that they do not cancel on values
+        # with a large offset
+        self._offset = float(np.average(self._uniques.astype(np.float64), weights=weights))
+        self._x = self._uniques.astype(np.float64) - self._offset
+        self._cw = np.concatenate(([0.0], np.cumsum(weights)))
+        self._cs = np.concatenate(([0.0], np.cumsum(weights * self._x)))
+        self._cs2 = np.concatenate(([0.0], np.cumsum(weights * self._x * self._x)))
+        # split points of the histogram that the dynamic programming can choose from
+        if self._x.size <= EXACT_MAX_UNIQUE:
+            self._bounds = np.arange(self._x.size + 1)
+        else:
+            self._bounds = self._coarse_bounds(EXACT_MAX_UNIQUE)
+        # optimal cost and choice of the last split for each number of clusters
+        self._costs = None
+        self._layers = []
+
+    @property
+    def num_unique(self):
+        return self._x.size
+
+    def _coarse_bounds(self, count):
+        # the clusters of an optimal quantizer are about evenly spread over the integral of
+        # the cube root of the density of the values. the density is estimated on ranges
+        # holding the same number of values
+        ranges = np.unique(np.searchsorted(
+            self._cw, np.linspace(0, self._cw[-1], DENSITY_RANGES + 1), side='left'))
+        ranges = np.concatenate(([0], ranges[(ranges > 0) & (ranges < self._x.size)],
+                                 [self._x.size]))
+        low, high = self._x[ranges[:-1]], self._x[np.maximum(ranges[1:] - 1, ranges[:-1])]
+        widths = np.append(low[1:], high[-1]) - low
+        mass = np.cbrt(np.diff(self._cw[ranges]) * widths * widths)
+        cumulative = np.concatenate(([0.0], np.cumsum(mass)))
+        targets = np.linspace(0, cumulative[-1], count + 1)
+        # the values at the targets interpolated in the ranges
+        values = np.interp(targets, cumulative, np.append(low, high[-1]))
+        bounds = np.searchsorted(self._x, values, side='left')
+        return np.unique(np.concatenate(([0, self._x.size], bounds)))
+
+    def _splits(self, centers):
+        boundaries = (centers[:-1] + centers[1:]) / 2
+        # a value on a boundary goes to the lower center
+        return np.concatenate(([0], np.searchsorted(self._x, boundaries, side='right'),
+                               [self._x.size]))
+
+    def _sums(self, splits):
+        return (np.diff(self._cw[splits]), np.diff(self._cs[splits]),
+                np.diff(self._cs2[splits]))
+
+    @staticmethod
+    def _errors(weights, sums, sums2):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.maximum(sums2 - sums * sums / weights, 0)
+
+    def _optimal(self, bins):
+        bounds = self._bounds
+        if self._costs is None:
+            cw, cs, cs2 = self._cw[bounds], self._cs[bounds], self._cs2[bounds]
+            weights = cw[np.newaxis, :] - cw[:, np.newaxis]
+            # cost of the cluster from bound i to bound j at [i, j]
+            self._costs = np.where(
+                weights > 0,
+                self._errors(weights, cs[np.newaxis, :] - cs[:, np.newaxis],
+                             cs2[np.newaxis, :] - cs2[:, np.newaxis]),
+                np.inf)
+            self._layers.append((self._costs[0], np.zeros(bounds.size, dtype=np.intp)))
+        while len(self._layers) < bins:
+            totals = self._layers[-1][0][:, np.newaxis] + self._costs
+            choices = np.argmin(totals, axis=0)
+            self._layers.append((totals[choices, np.arange(totals.shape[1])], choices))
+        splits = [bounds.size - 1]
+        for _, choices in reversed(self._layers[:bins]):
+            splits.append(choices[splits[-1]])
+        return bounds[np.array(splits[::-1])]
+
+    def _split(self, splits, count):
+        """Splits the clusters with the largest errors at their centers until there are count."""
+        # empty clusters are dropped
+        splits = np.unique(splits)
+        while splits.size <= count:
+            weights, sums, sums2 = self._sums(splits)
+            errors = self._errors(weights, sums, sums2)
+            # only clusters holding more than one unique value can be split
+            errors[np.diff(splits) < 2] = -1
+            worst = np.argsort(errors, kind='stable')[::-1][:count + 1 - splits.size]
+            worst = worst[errors[worst] >= 0]
+            if worst.size == 0:
+                break
+            start, end = splits[worst], splits[worst + 1]
+            middle = np.searchsorted(self._x, sums[worst] / weights[worst], side='right')
+            middle = np.minimum(np.maximum(middle, start + 1), end - 1)
+            splits = np.union1d(splits, middle)
+        return splits
+
+    def _lloyd(self, splits, max_iter):
+        count = splits.size - 1
+        for _ in range(max_iter):
+            splits = self._split(splits, count)
+            weights, sums, _ = self._sums(splits)
+            new_splits = self._splits(sums / weights)
+            if np.array_equal(new_splits, splits):
+                return splits
+            splits = new_splits
+        return self._split(splits, count)
+
+    def _range_errors(self, start, end):
+        return self._errors(self._cw[end] - self._cw[start], self._cs[end] - self._cs[start],
+                            self._cs2[end] - self._cs2[start])
+
+    def _best_splits(self, start, end, low, high, count):
+        """Best point to split each range of unique values [start, end) in two and the
+        error of the two halves.
+
+        The points searched are at most count points spread evenly over [low, high).
+        Ranges with no point to search give inf."""
+        spans = np.maximum(high - low, 0)
+        sizes = np.minimum(spans, count)
+        owner = np.repeat(np.arange(start.size), sizes)
+        offsets = np.cumsum(sizes) - sizes
+        points = low[owner] + ((np.arange(owner.size) - offsets[owner]) * spans[owner] //
+                               np.maximum(sizes[owner], 1))
+        errors = (self._range_errors(start[owner], points) +
+                  self._range_errors(points, end[owner]))
+        best = np.full(start.size, np.inf)
+        at = low.copy()
+        searched = sizes > 0
+        if owner.size:
+            best[searched] = np.minimum.reduceat(errors, offsets[searched])
+            is_best = errors == best[owner]
+            owners, first = np.unique(owner[is_best], return_index=True)
+            at[owners] = points[is_best][first]
+        return at, best
+
+    def _move_splits(self, splits, max_iter):
+        """Moves each split to the best point near it between its neighbours until none
+        of them moves."""
+        for _ in range(max_iter):
+            moved = False
+            # splits with the same parity can be moved independently
+            for parity in (1, 2):
+                idx = np.arange(parity, splits.size - 1, 2)
+                start, end = splits[idx - 1], splits[idx + 1]
+                low = np.maximum(splits[idx] - MOVE_WINDOW, start + 1)
+                high = np.minimum(splits[idx] + MOVE_WINDOW + 1, end)
+                at, best = self._best_splits(start, end, low, high, 2 * MOVE_WINDOW + 1)
+                current = (self._range_errors(start, splits[idx]) +
+                           self._range_errors(splits[idx], end))
+                # points that are as good to rounding errors would swap forever
+                move = best < current - 1e-12 * current
+                moved = moved or move.any()
+                splits[idx[move]] = at[move]
+            if not moved:
+                break
+        return splits
+
+    def _improve(self, splits, max_iter):
+        """Refines the clusters with Lloyd's algorithm and by moving the splits. Then
+        merges the two adjacent clusters that cost the least to merge and splits the
+        cluster that gains the most from being split in two as long as that lowers the
+        inertia."""
+        for _ in range(max_iter):
+            splits = self._move_splits(self._lloyd(splits, max_iter), max_iter)
+            # the cluster split cannot be one of the two merged
+            if splits.size < 4:
+                break
+            start, end = splits[:-1], splits[1:]
+            errors = self._range_errors(start, end)
+            merge = self._range_errors(splits[:-2], splits[2:]) - errors[:-1] - errors[1:]
+            at, best = self._best_splits(start, end, start + 1, end, SPLIT_POINTS)
+            gains = errors - best
+            pair = np.argmin(merge)
+            gains[pair:pair + 2] = -np.inf
+            worst = np.argmax(gains)
+            if gains[worst] - merge[pair] <= 1e-12 * errors.sum():
+                break
+            splits = np.sort(np.append(np.delete(splits, pair + 1), at[worst]))
+        return splits
+
+    def kmeans(self, bins, max_iter=300):
+        """Clusters the values into bins clusters.
+
+        Returns the sorted centers, the split points of the clusters in the histogram
+        and the inertia. If there are fewer unique values than bins each unique value
+        is its own cluster and the last center is repeated to fill the codebook."""
+        num_unique = self._x.size
+        if num_unique <= bins:
+            uniques = self._uniques.astype(np.float64)
+            centers = np.concatenate((uniques, np.full(bins - num_unique, uniques[-1])))
+            return centers, np.arange(num_unique + 1), 0.0
+        splits = self._optimal(bins)
+        if num_unique > EXACT_MAX_UNIQUE:
+            splits = self._improve(splits, max_iter)
+        weights, sums, sums2 = self._sums(splits)
+        inertia = float(self._errors(weights, sums, sums2).sum())
+        return sums / weights + self._offset, splits, inertia
+
+    def silhouette(self, splits):
+        """Mean silhouette coefficient of the clusters defined by splits.
+
+        The same as sklearn's silhouette_score on the flattened values but computed in
+        O(n) on the histogram. In 1-D the nearest other cluster of a value is always
+        one of the two clusters adjacent to its own."""
+        if splits.size < 3:
+            return 0.0
+        x, cw, cs = self._x, self._cw, self._cs
+        weights, sums, _ = self._sums(splits)
+        sizes = np.diff(splits)
+
+        def per_value(per_cluster):
+            return np.repeat(per_cluster, sizes)
+
+        start, end = splits[:-1], splits[1:]
+        # sum of the distances to the values below and above in the same cluster
+        own = (x * (cw[:-1] - per_value(cw[start])) - (cs[:-1] - per_value(cs[start])) +
+               (per_value(cs[end]) - cs[1:]) - x * (per_value(cw[end]) - cw[1:]))
+        # all the values of an adjacent cluster are on the same side
+        means = sums / weights
+        below = x - per_value(np.concatenate(([-np.inf], means[:-1])))
+        above = per_value(np.concatenate((means[1:], [np.inf]))) - x
+        nearest = np.minimum(below, above)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            intra = own / per_value(weights - 1)
+            coef = np.nan_to_num((nearest - intra) / np.maximum(intra, nearest))
+        # the coefficient of a value alone in its cluster is 0
+        coef[per_value(weights <= 1)] = 0
+        return float((coef * np.diff(cw)).sum() / cw[-1])
+
+    def codes(self, codebook):
+        """Returns the index of the nearest codebook entry for each value."""
+        return codebook_lookup(self._uniques, codebook)[self._inverse]
@@ -15,6 +15,7 @@
 
 import os
 import logging
+from functools import lru_cache
 
 import numpy as np
 from PIL import Image
@@ -41,6 +42,12 @@ VALID_IMAGE_EXTENSIONS = ['.pgm', '.png', '.ppm', '.jpg', '.jpeg']
 VALID_SOUND_EXTENSIONS = ['.wav', '.raw', '.pcm']
 VALID_DATA_IMPORT_EXTENSIONS = ['.npy', '.dat']
 
+@lru_cache(maxsize=16)
+def compile_norm_func(norm_func):
+    g_env = {}.update(np.__dict__)
+# pylint: disable=eval-used
+    return eval('lambda ' + norm_func, g_env)
+
 def postprocess(img_in, h, w, c, **kwargs):
     if kwargs.get('transpose'):
         if c == 1:
@@ -64,10 +71,7 @@ def postprocess(img_in, h, w, c, **kwargs):
 
     norm_func = kwargs.get('norm_func')
     if norm_func:
-        g_env = {}.update(np.__dict__)
-# pylint: disable=eval-used
-        compiled_norm_func = eval('lambda ' + norm_func, g_env)
-        img_in = compiled_norm_func(img_in)
+        img_in = compile_norm_func(norm_func)(img_in)
         img_in = np.array(img_in, dtype=np.float)
     else:
         img_in = (img_in.astype(np.float) / divisor) + offset
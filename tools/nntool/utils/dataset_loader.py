@@ -0,0 +1,112 @@
+# Copyright (C) 2020  GreenWaves Technologies, SAS
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from utils.data_importer import import_data
+
+LOG = logging.getLogger('nntool.' + __name__)
+
+# bump if the way files are imported changes so that old cache entries are not used
+CACHE_VERSION = 1
+
+
+class DataCache():
+    """On disk cache of imported input files.
+
+    The result of import_data is saved as a .npy file named after a hash of the file path,
+    its modification time and size and the import options. Cached entries are memory
+    mapped copy on write so callers can modify them without changing the cache."""
+
+    def __init__(self, cache_dir):
+        self._cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def cache_key(filename, input_args):
+        file_stat = os.stat(filename)
+        key = json.dumps([CACHE_VERSION, os.path.abspath(filename), file_stat.st_mtime_ns,
+                          file_stat.st_size, input_args],
+                         sort_keys=True, default=str)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def cache_file(self, filename, input_args):
+        return os.path.join(self._cache_dir, self.cache_key(filename, input_args) + '.npy')
+
+    def import_data(self, filename, **input_args):
+        cache_file = self.cache_file(filename, input_args)
+        if os.path.exists(cache_file):
+            try:
+                return np.load(cache_file, mmap_mode='c')
+            except (ValueError, OSError):
+                LOG.warning("data cache entry %s for %s is corrupt - reimporting",
+                            cache_file, filename)
+        data = import_data(filename, **input_args)
+        # write then rename so that concurrent readers never see a partial file
+        tmp_fd, tmp_file = tempfile.mkstemp(suffix='.npy', dir=self._cache_dir)
+        try:
+            with os.fdopen(tmp_fd, 'wb') as fp:
+                np.save(fp, data)
+            os.replace(tmp_file, cache_file)
+        except OSError as ex:
+            LOG.warning("unable to write data cache entry for %s: %s", filename, ex)
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+        return data
+
+
+def prefetch_map(func, items, threads=0):
+    """Returns an iterator of func applied to items in order. If threads is set then
+    up to twice that number of items are processed ahead on background threads."""
+    if not threads:
+        for item in items:
+            yield func(item)
+        return
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = deque()
+        items = iter(items)
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= threads * 2:
+                break
+        while pending:
+            res = pending.popleft().result()
+            for item in items:
+                pending.append(executor.submit(func, item))
+                break
+            yield res
+
+
+def import_batches(file_batches, input_args, cache_dir=None, prefetch=0):
+    """Import the batches of files returned by batch_input_files. Yields the files of
+    each batch and a list with one list of tensors, one per graph input, for each sample
+    of the batch. Files are read through a DataCache if cache_dir is set and imported on
+    prefetch background threads if it is not 0."""
+    importer = import_data if not cache_dir else DataCache(cache_dir).import_data
+
+    def import_batch(files_batch):
+        return files_batch, [[importer(input_file, **input_args)
+                              for input_file in file_per_input]
+                             for file_per_input in files_batch]
+
+    return prefetch_map(import_batch, file_batches, threads=prefetch)
@@ -1,8 +1,6 @@
 from collections import OrderedDict
 
 import numpy as np
-from matplotlib import pyplot as plt
-from matplotlib.ticker import FormatStrFormatter
 
 
 class DiagCollector():
@@ -60,6 +58,10 @@ class DiagCollector():
 
     @classmethod
     def plot_error(cls, names, axis=(0, ), sets=None, node_name=None):
+        # matplotlib is slow to import and only needed here
+        from matplotlib import pyplot as plt
+        from matplotlib.ticker import FormatStrFormatter
+
         if isinstance(names, str):
             names = [names]
 
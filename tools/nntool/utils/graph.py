@@ -169,7 +169,9 @@ class Edge():
         return "{}[{}]->{}[{}]".format(*self._link)
 
     def __hash__(self):
-        return str(self).__hash__()
+        from_node, from_idx, to_node, to_idx = self._link
+        return hash((getattr(from_node, 'name', from_node), from_idx,
+                     getattr(to_node, 'name', to_node), to_idx))
 
 # pylint: disable=too-many-public-methods
 
@@ -180,14 +182,28 @@ class GraphView(Mapping):
         self._out_edges = OrderedDict()
         self._in_edges = OrderedDict()
         self._nodes = OrderedDict()
+        self._version = 0
+        self._order_cache = {}
 
     @classmethod
     # pylint: disable=unused-argument
     def clone_factory(cls, G):
         return cls()
 
+    @property
+    def version(self):
+        '''Counter incremented by every change to the nodes or edges of the graph'''
+        return self._version
+
+    def modified(self):
+        '''Records a change to the graph. Called by all the methods that add or remove
+        nodes or edges. Must be called if an edge already in the graph is changed.'''
+        self._version += 1
+        self._order_cache.clear()
+
     def clear(self):
         '''Clears the graph view'''
+        self.modified()
         if self._nodes:
             self._in_edges.clear()
             self._out_edges.clear()
@@ -277,6 +293,7 @@ class GraphView(Mapping):
         elif edge.to_node.name not in self._nodes:
             assert edge.to_node not in self._nodes.values()
             self._nodes[edge.to_node.name] = edge.to_node
+        self.modified()
         self.__add_in_edge(edge)
         self.__add_out_edge(edge)
 
@@ -448,6 +465,7 @@ class GraphView(Mapping):
         node_name = node_or_name.name if isinstance(
             node_or_name, Node) else node_or_name
         del self._nodes[node_name]
+        self.modified()
         node_names_to_look_at = set()
         if node_name in self._in_edges:
             node_names_to_look_at |= set(self._in_edges[node_name].keys())
@@ -468,6 +486,7 @@ class GraphView(Mapping):
         def edge_match(x):
             return not(x.to_node == edge.to_node and x.from_node == edge.from_node and
                        x.to_idx == edge.to_idx and x.from_idx == edge.from_idx)
+        self.modified()
         edge_list = self._in_edges[edge.to_node.name][edge.from_node.name]
         self._in_edges[edge.to_node.name][edge.from_node.name]\
             = list(filter(edge_match, edge_list))
@@ -534,6 +553,7 @@ class GraphView(Mapping):
 
     def replace_node(self, node_name: str, new_node: Node):
         '''Replaces a single node with a new node'''
+        self.modified()
         del self._nodes[node_name]
         self._nodes[new_node.name] = new_node
         for edge in self.out_edges(node_name):
@@ -641,6 +661,7 @@ class GraphView(Mapping):
         if node.name in self._nodes:
             raise ValueError("node already in graph")
         assert node not in self._nodes.values()
+        self.modified()
         self._nodes[node.name] = node
 
     def inputs(self, ignore_names=None):
@@ -657,58 +678,78 @@ class GraphView(Mapping):
                 if node_name not in self._out_edges or all(output_name in ignore_names
                                                            for output_name in self._out_edges[node_name])]
 
-    def __revdfs(self, node, condition, visited_nodes, visited_edges, from_node, from_edge):
-        if not node:
-            return
-        if isinstance(node, str):
-            node = self._nodes[node]
-        if node not in visited_nodes and\
-            (from_node is None or
-             all((out_edge in visited_edges) for out_edge in self.out_edges(node.name))) and\
-                (not condition or condition(self, from_node, node, from_edge)):
+    @staticmethod
+    def __dfs_edge_key(edge):
+        return str(edge.from_idx) + edge.to_node.name + str(edge.to_idx)
 
+    @staticmethod
+    def __revdfs_edge_key(edge):
+        return str(edge.from_idx) + edge.from_node.name + str(edge.to_idx)
+
+    def __traverse(self, nodes, condition, reverse):
+        """Visits nodes depth first once all the edges into them, or out of them if reverse
+        is set, have been visited. Edges out of a node are visited in a repeatable order."""
+        if reverse:
+            next_edges, wait_edges = self.in_edges, self.out_edges
+        else:
+            next_edges, wait_edges = self.out_edges, self.in_edges
+
+        def next_nodes(node):
+            edges = next_edges(node.name)
+            if reverse:
+                edges.sort(key=self.__revdfs_edge_key, reverse=True)
+                return ((edge.from_node, edge) for edge in edges)
+            edges.sort(key=self.__dfs_edge_key)
+            return ((edge.to_node, edge) for edge in edges)
+
+        visited_nodes = set()
+        # count of the edges that have been visited to each node
+        visited_edges = {}
+        for node in nodes:
+            if not node:
+                continue
+            if isinstance(node, str):
+                node = self._nodes[node]
+            if node in visited_nodes or (condition and not condition(self, None, node, None)):
+                continue
             yield node
             visited_nodes.add(node)
-            in_edges = self.in_edges(node.name)
-            # Edges are visited in a repeatable order
-            in_edges.sort(key=lambda x: str(x.from_idx) + x.from_node.name + str(x.to_idx),
-                          reverse=True)
-            for edge in in_edges:
-                visited_edges.add(edge)
-
-                yield from self.__revdfs(edge.from_node,
-                                         condition,
-                                         visited_nodes,
-                                         visited_edges,
-                                         node,
-                                         edge)
-
-    def __dfs(self, node, condition, visited_nodes, visited_edges, from_node, from_edge):
-        if not node:
-            return
-        if isinstance(node, str):
-            node = self._nodes[node]
-        if node not in visited_nodes and \
-            (from_node is None or all((in_edge in visited_edges) for in_edge in self.in_edges(node.name))) and \
-                (not condition or condition(self, from_node, node, from_edge)):
-            yield node
-            visited_nodes.add(node)
-            out_edges = self.out_edges(node.name)
-            # Edges are visited in a repeatable order
-            out_edges.sort(key=lambda x: str(x.from_idx) +
-                           x.to_node.name + str(x.to_idx))
-            for edge in out_edges:
-                visited_edges.add(edge)
-
-                yield from self.__dfs(edge.to_node,
-                                      condition,
-                                      visited_nodes,
-                                      visited_edges,
-                                      node,
-                                      edge)
+            stack = [(node, next_nodes(node))]
+            while stack:
+                from_node, edges = stack[-1]
+                node, edge = next(edges, (None, None))
+                if edge is None:
+                    stack.pop()
+                    continue
+                visited_edges[node] = visited_edges.get(node, 0) + 1
+                if (node in visited_nodes or
+                        visited_edges[node] < len(wait_edges(node.name)) or
+                        (condition and not condition(self, from_node, node, edge))):
+                    continue
+                yield node
+                visited_nodes.add(node)
+                stack.append((node, next_nodes(node)))
+
+    def topological_order(self, reverse=False):
+        """All the nodes in the order that they are visited by dfs. The order is cached
+        until the graph is modified."""
+        order = self._order_cache.get(reverse)
+        if order is None:
+            if reverse:
+                nodes = list(self.outputs())
+                # This isn't really necessary but helps with tests
+                nodes.reverse()
+            else:
+                nodes = self.inputs()
+            order = tuple(self.__traverse(nodes, None, reverse))
+            self._order_cache[reverse] = order
+        return order
 
     def dfs(self, node_or_name=None, condition=None, reverse=False):
         if node_or_name is None:
+            if condition is None:
+                yield from self.topological_order(reverse=reverse)
+                return
             if reverse:
                 nodes = list(self.outputs())
                 # This isn't really necessary but helps with tests
@@ -723,13 +764,7 @@ class GraphView(Mapping):
         else:
             raise TypeError()
 
-        visited_nodes = set()
-        visited_edges = set()
-        for node in nodes:
-            if reverse:
-                yield from self.__revdfs(node, condition, visited_nodes, visited_edges, None, None)
-            else:
-                yield from self.__dfs(node, condition, visited_nodes, visited_edges, None, None)
+        yield from self.__traverse(nodes, condition, reverse)
 
     @staticmethod
     def match_semantics(edges, match_edge):
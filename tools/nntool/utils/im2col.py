@@ -0,0 +1,92 @@
+# Copyright (C) 2020  GreenWaves Technologies, SAS
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+# largest integer magnitude that a float64 represents exactly
+FLOAT64_EXACT_INT = 1 << 53
+
+
+def im2col(in_tensor: np.ndarray, filt_h: int, filt_w: int, out_h: int, out_w: int,
+           stride=(1, 1), dilation=(1, 1)) -> np.ndarray:
+    """Returns a read only view on a padded (h, w, c) input of shape
+    (out_h, out_w, filt_h, filt_w, c) containing the input patch seen by each output
+    position. No data is copied."""
+    s_h, s_w, s_c = in_tensor.strides
+    return as_strided(in_tensor,
+                      shape=(out_h, out_w, filt_h, filt_w, in_tensor.shape[2]),
+                      strides=(s_h * stride[0], s_w * stride[1],
+                               s_h * dilation[0], s_w * dilation[1], s_c),
+                      writeable=False)
+
+
+def exact_matmul(mat_a: np.ndarray, mat_b: np.ndarray) -> np.ndarray:
+    """Integer matrix product of mat_a and mat_b returned as int64 without loss.
+
+    If the result and all of its partial sums are guaranteed to be exactly representable
+    in a float64 the product is computed with BLAS otherwise an int64 matmul is used."""
+    if mat_a.size == 0 or mat_b.size == 0:
+        return np.matmul(mat_a.astype(np.int64), mat_b.astype(np.int64))
+    bound = (int(np.max(np.abs(mat_a.astype(np.int64)))) *
+             int(np.max(np.abs(mat_b.astype(np.int64)))) *
+             mat_a.shape[-1])
+    if bound < FLOAT64_EXACT_INT:
+        return np.matmul(mat_a.astype(np.float64),
+                         mat_b.astype(np.float64)).astype(np.int64)
+    return np.matmul(mat_a.astype(np.int64), mat_b.astype(np.int64))
+
+
+def conv2d_im2col(in_tensor: np.ndarray, weights: np.ndarray, out_h: int, out_w: int,
+                  stride=(1, 1), dilation=(1, 1), groups=1, by_tap=False,
+                  calc_dtype=None) -> np.ndarray:
+    """Grouped 2D convolution of an already padded (h, w, c) input by (out_c, h, w, in_c)
+    weights computed as one batched matrix multiply.
+
+    Integer inputs are accumulated exactly in int64. Floating point inputs are
+    accumulated in calc_dtype (default float32).
+
+    Returns the accumulator in (out_c, out_h, out_w) order or, if by_tap is set, the
+    contribution of each filter tap in (filt_h * filt_w, out_c, out_h, out_w) order so
+    that partial sums can be inspected."""
+    out_c, filt_h, filt_w, in_c_per_group = weights.shape
+    out_c_per_group = out_c // groups
+    n_taps = filt_h * filt_w
+    n_pos = out_h * out_w
+    cols = im2col(in_tensor, filt_h, filt_w, out_h, out_w,
+                  stride=stride, dilation=dilation)
+    # cols is (pos, tap, group, in_c_per_group) -> (group, pos, tap, in_c_per_group)
+    cols = cols.reshape(n_pos, n_taps, groups, in_c_per_group).transpose(2, 0, 1, 3)
+    # weights are (group, out_c_per_group, tap, in_c_per_group)
+    weights = weights.reshape(groups, out_c_per_group, n_taps, in_c_per_group)
+    integer = np.issubdtype(in_tensor.dtype, np.integer) and np.issubdtype(
+        weights.dtype, np.integer)
+    if integer:
+        matmul = exact_matmul
+    else:
+        calc_dtype = np.float32 if calc_dtype is None else calc_dtype
+
+        def matmul(mat_a, mat_b):
+            return np.matmul(mat_a.astype(calc_dtype), mat_b.astype(calc_dtype))
+
+    if by_tap:
+        # (group, tap, pos, in_c) @ (group, tap, in_c, out_c) -> (group, tap, pos, out_c)
+        res = matmul(cols.transpose(0, 2, 1, 3),
+                     weights.transpose(0, 2, 3, 1))
+        return res.transpose(1, 0, 3, 2).reshape(n_taps, out_c, out_h, out_w)
+    # (group, pos, tap * in_c) @ (group, tap * in_c, out_c) -> (group, pos, out_c)
+    res = matmul(cols.reshape(groups, n_pos, n_taps * in_c_per_group),
+                 weights.reshape(groups, out_c_per_group, n_taps * in_c_per_group).transpose(0, 2, 1))
+    return res.transpose(0, 2, 1).reshape(out_c, out_h, out_w)
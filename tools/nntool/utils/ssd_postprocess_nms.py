@@ -1,4 +1,3 @@
-import copy
 import json
 import os
 from typing import NamedTuple
@@ -143,11 +142,11 @@ class NonMaxSuppression(object):
         'calculate iou between a base bounding box and an array of bboxes'
         ymin, xmin, ymax, xmax = 0, 1, 2, 3
         # base anchor
-        base_bbox_cor = copy.deepcopy(base_bbox)
+        base_bbox_cor = base_bbox
         base_bbox_area = (base_bbox_cor[ymax] - base_bbox_cor[ymin]).astype(np.int32) *\
             (base_bbox_cor[xmax] - base_bbox_cor[xmin]).astype(np.int32)
         # an array of anchors
-        rest_bboxes_cor = copy.deepcopy(rest_bboxes)
+        rest_bboxes_cor = rest_bboxes
         # rest anchors area
         rest_bboxes_area = (rest_bboxes_cor[:, ymax] - rest_bboxes_cor[:, ymin]) *\
             (rest_bboxes_cor[:, xmax] - rest_bboxes_cor[:, xmin])
@@ -195,8 +194,9 @@ class NonMaxSuppression(object):
             # lets store the base anchor in the bank
             kept_indices.append(base_ind)
 
-            base_bbox = copy.deepcopy(bboxes[base_ind, :])
-            rest_bboxes = copy.deepcopy(bboxes[rest_inds, :])
+            # calculate_iou does not modify its inputs so there is no need to copy them
+            base_bbox = bboxes[base_ind, :]
+            rest_bboxes = bboxes[rest_inds, :]
             iou = self.calculate_iou(base_bbox, rest_bboxes)
 
             # print('before: rest_inds', rest_inds.shape)
@@ -225,8 +225,8 @@ class NonMaxSuppression(object):
 
             # a one-dimentionsal array, including confidences for the class_id
             class_confidences = confidences[:, class_id]
-            # a copy of transformed anchor boxes
-            class_bboxes = copy.deepcopy(bboxes)
+            # transformed anchor boxes. greedy_non_maximum_suppression does not modify them
+            class_bboxes = bboxes
 
             # greedy nsm over the anchors, the output df has two new columns: confidence and class_id
             valid_class_bboxes, valid_class_confidences, valid_anchors_indices = self.greedy_non_maximum_suppression(
@@ -321,8 +321,8 @@ class NonMaxSuppression(object):
             rest_inds = inds[1:]
             # lets store the base anchor in the bank
             kept_indices.append(base_ind)
-            base_bbox = copy.deepcopy(bboxes[base_ind, :])
-            rest_bboxes = copy.deepcopy(bboxes[rest_inds, :])
+            base_bbox = bboxes[base_ind, :]
+            rest_bboxes = bboxes[rest_inds, :]
             iou = self.calculate_iou(base_bbox, rest_bboxes)
             # lets keep bboxes having iou less than iou_threshold for the next itteration evaluation
             inds = rest_inds[iou < self.iou_threshold]
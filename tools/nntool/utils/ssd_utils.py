@@ -55,3 +55,64 @@ def rect_union_area(box_cors_a, box_cors_b):
         area_a = x_a.astype(np.int32) * y_a
         area_b = x_b.astype(np.int32) * y_b
     return area_a + area_b - rect_intersect_area(box_cors_a, box_cors_b)
+
+def rect_overlaps(box_cors_a, boxes_cors_b, iou_threshold):
+    """Vectorized rect_intersect_area(a, b) >= iou_threshold * rect_union_area(a, b)
+    between box_cors_a and boxes_cors_b which broadcast against each other (for example
+    one box against an array of boxes or an (N, 1, 4) against a (1, M, 4) array to
+    get the full matrix). Returns a boolean array.
+
+    The computation is done in exactly the same types as the scalar functions so the
+    result is identical to calling them on each pair of boxes."""
+    box_cors_a = np.asarray(box_cors_a)
+    boxes_cors_b = np.asarray(boxes_cors_b)
+    is_float = box_cors_a.dtype in (np.float32, np.float64)
+    area_dtype = box_cors_a.dtype if is_float else np.dtype(np.int32)
+    # The scalar functions mix numpy scalars with python numbers so the types of some
+    # intermediate results depend on the numpy promotion rules. Probe them so that
+    # the same types are used here.
+    union_nointer_dtype = (area_dtype.type(0) - 0).dtype
+    thres_dtype = (area_dtype.type(0) * iou_threshold).dtype
+    thres_nointer_dtype = (union_nointer_dtype.type(0) * iou_threshold).dtype
+
+    x = np.maximum(box_cors_a[..., XMIN_IDX], boxes_cors_b[..., XMIN_IDX])
+    y = np.maximum(box_cors_a[..., YMIN_IDX], boxes_cors_b[..., YMIN_IDX])
+    size_x = np.minimum(box_cors_a[..., XMAX_IDX], boxes_cors_b[..., XMAX_IDX]) - x
+    size_y = np.minimum(box_cors_a[..., YMAX_IDX], boxes_cors_b[..., YMAX_IDX]) - y
+    # N.B. rect_intersect_area only tests size_x
+    no_inter = size_x <= 0
+    if is_float:
+        intersection = size_x * size_y
+    else:
+        intersection = size_x.astype(np.int32) * size_y
+    intersection = np.where(no_inter, intersection.dtype.type(0), intersection)
+
+    def area(boxes):
+        size_x = np.abs(boxes[..., XMAX_IDX] - boxes[..., XMIN_IDX])
+        size_y = np.abs(boxes[..., YMAX_IDX] - boxes[..., YMIN_IDX])
+        if is_float:
+            return size_x * size_y
+        return size_x.astype(np.int32) * size_y
+
+    areas = area(box_cors_a) + area(boxes_cors_b)
+    union = areas - intersection
+    thres = np.multiply(union, iou_threshold, dtype=thres_dtype)
+    if np.any(no_inter):
+        thres_nointer = np.multiply(areas.astype(union_nointer_dtype), iou_threshold,
+                                    dtype=thres_nointer_dtype)
+        return np.where(no_inter, 0 >= thres_nointer, intersection >= thres)
+    return intersection >= thres
+
+def suppress_overlapping(sorted_boxes_cors, iou_threshold):
+    """Greedy non max suppression of boxes sorted by decreasing score. A box is suppressed
+    if it overlaps (see rect_overlaps) a box before it that has not been suppressed.
+    Returns a boolean array which is True for the boxes that are kept."""
+    liveness = np.ones(len(sorted_boxes_cors), dtype=np.bool_)
+    for i in range(len(sorted_boxes_cors)):
+        if not liveness[i]:
+            continue
+        rest = np.flatnonzero(liveness[i + 1:]) + (i + 1)
+        if rest.size == 0:
+            break
+        liveness[rest[rect_overlaps(sorted_boxes_cors[i], sorted_boxes_cors[rest], iou_threshold)]] = False
+    return liveness
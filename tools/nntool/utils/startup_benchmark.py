@@ -0,0 +1,87 @@
+# Copyright (C) 2020  GreenWaves Technologies, SAS
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Measures the time taken to start nntool and to import its main packages.
+
+Each case is run in a fresh interpreter. Run from the nntool directory:
+
+    python3 -m utils.startup_benchmark [-r REPEATS] [--importtime]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+NNTOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ('nntool --version', [os.path.join(NNTOOL_DIR, 'nntool'), '--version']),
+    ('graph', ['-c', 'import graph.nngraph']),
+    ('execution', ['-c', 'import execution.graph_executer']),
+    ('quantization', ['-c', 'import quantization.unified_quantizer']),
+    ('generation', ['-c', 'import generation.code_generator']),
+    ('onnx importer', ['-c', 'import importer.onnx.onnx']),
+    ('shell', ['-c', 'import interpreter.nntool_shell']),
+]
+
+
+def time_case(args, repeats, importtime=False):
+    times = []
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + args
+    for _ in range(repeats):
+        start = time.perf_counter()
+        res = subprocess.run(cmd, cwd=NNTOOL_DIR, capture_output=True, text=True, check=False)
+        times.append(time.perf_counter() - start)
+        if res.returncode:
+            return None, res.stderr
+    return times, res.stderr
+
+
+def slowest_imports(importtime_output, count):
+    imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative), name.rstrip()))
+    imports.sort(reverse=True)
+    return imports[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='startup_benchmark')
+    parser.add_argument('-r', '--repeats', type=int, default=5,
+                        help='number of times each case is run')
+    parser.add_argument('--importtime', action='store_true',
+                        help='show the slowest imports of each case')
+    args = parser.parse_args()
+    print(f"{'case':20s} {'best':>8s} {'median':>8s}")
+    for name, case_args in CASES:
+        times, stderr = time_case(case_args, args.repeats)
+        if times is None:
+            print(f"{name:20s} failed: {stderr.strip().splitlines()[-1:]}")
+            continue
+        print(f"{name:20s} {min(times):8.3f} {statistics.median(times):8.3f}")
+        if args.importtime:
+            _, stderr = time_case(case_args, 1, importtime=True)
+            for cumulative, module in slowest_imports(stderr, 10):
+                print(f"{'':20s} {cumulative/1e6:8.3f} {module}")
+
+
+if __name__ == '__main__':
+    main()
@@ -37,12 +37,25 @@ def calc_bits(*args, signed=True):
         return (1 if signed else 0)
     return int(np.ceil(np.log2(num)) + (1 if signed else 0))
 
-def do_stat(npa, do_bits=True, channel_dim=None, all_channel_range=None):
+def quartiles(npa, axis=None, quantile_samples=None):
+    """First and third quartiles of npa. If quantile_samples is set and the tensor (or each
+    row along axis) has more elements than that then the quartiles are approximated on an
+    evenly strided subsample of about quantile_samples elements"""
+    size = npa.size if axis is None else npa.shape[axis]
+    if quantile_samples and size > quantile_samples:
+        step = -(-size // quantile_samples)
+        if axis is None:
+            npa = npa.reshape(-1)[::step]
+        else:
+            npa = npa[:, ::step]
+    return np.quantile(npa, [0.25, 0.75], axis=axis)
+
+def do_stat(npa, do_bits=True, channel_dim=None, all_channel_range=None, quantile_samples=None):
     mean = float(np.mean(npa))
     std = float(np.std(npa))
     amax = float(np.amax(npa))
     amin = float(np.amin(npa))
-    quant1_3 = np.quantile(npa, [0.25, 0.75])
+    quant1_3 = quartiles(npa, quantile_samples=quantile_samples)
     iqr = quant1_3[1] - quant1_3[0]
     weak_min = (npa < quant1_3[0] - 1.5 * iqr)
     weak_max = (npa > quant1_3[1] + 1.5 * iqr)
@@ -84,18 +97,77 @@ def do_stat(npa, do_bits=True, channel_dim=None, all_channel_range=None):
 
     return ret
 
-def astats(npa, do_bits=True, channel_dim=None, channel_details=None):
-    """Extracts statistics from a tensor
+def calc_bits_array(amax, amin):
+    """Vectorized calc_bits on arrays of maximums and minimums for signed values"""
+    num = np.ceil(np.abs(amax.astype(np.float64) - amin.astype(np.float64)))
+    with np.errstate(divide='ignore'):
+        bits = np.ceil(np.log2(num)) + 1
+    return np.where(num == 0, 1, bits).astype(int)
+
+def do_channel_stats(npa, channel_dim, all_channel_range=None, quantile_samples=None):
+    """Statistics of each channel of npa along channel_dim. Returns the same list of
+    dicts as calling do_stat on each channel but computes them with a few reductions
+    over the whole tensor."""
+    # one row per channel
+    rows = np.moveaxis(npa, channel_dim, 0).reshape(npa.shape[channel_dim], -1)
+    size = rows.shape[1]
+    mean = np.mean(rows, axis=1)
+    std = np.std(rows, axis=1)
+    amax = np.amax(rows, axis=1)
+    amin = np.amin(rows, axis=1)
+    quant1, quant3 = quartiles(rows, axis=1, quantile_samples=quantile_samples)
+    iqr = (quant3 - quant1)[:, np.newaxis]
+    quant1 = quant1[:, np.newaxis]
+    quant3 = quant3[:, np.newaxis]
+    weak = (rows < quant1 - 1.5 * iqr) | (rows > quant3 + 1.5 * iqr)
+    strong = (rows < quant1 - 3 * iqr) | (rows > quant3 + 3 * iqr)
+    weak_count = weak.sum(axis=1)
+    strong_count = strong.sum(axis=1)
+    abs_rows = np.abs(rows)
+    min_out = np.min(np.where(weak, abs_rows, np.inf), axis=1)
+    max_out = np.where(strong_count > 0,
+                       np.max(np.where(strong, abs_rows, -np.inf), axis=1),
+                       np.max(np.where(weak, abs_rows, -np.inf), axis=1))
+    ibits = calc_bits_array(amax, amin)
+    if all_channel_range and size > 1:
+        avg_prec = (amax - amin)/all_channel_range
+    else:
+        avg_prec = None
+
+    channel_stats = []
+    for chan in range(rows.shape[0]):
+        if weak_count[chan]:
+            chan_min_out = float(min_out[chan])
+            chan_max_out = float(max_out[chan])
+        else:
+            chan_min_out = chan_max_out = 0
+        stat = {
+            'mean': float(mean[chan]),
+            'std': float(std[chan]),
+            'min': float(amin[chan]),
+            'max': float(amax[chan]),
+            'size': size,
+            'wols': int(weak_count[chan]),
+            'sols': int(strong_count[chan]),
+            'min_out' : chan_min_out,
+            'max_out' : chan_max_out,
+            'ibits': int(ibits[chan])
+        }
+        if avg_prec is not None:
+            stat['avg_prec'] = avg_prec[chan]
+        channel_stats.append(stat)
+    return channel_stats
+
+def astats(npa, do_bits=True, channel_dim=None, channel_details=None, quantile_samples=None):
+    """Extracts statistics from a tensor. If quantile_samples is set then the quartiles
+    used to detect outliers are approximated on at most about that number of elements
     """
     all_channel_range = np.ptp(npa)
-    ret = do_stat(npa, do_bits=do_bits, channel_dim=channel_dim, all_channel_range=all_channel_range)
+    ret = do_stat(npa, do_bits=do_bits, channel_dim=channel_dim, all_channel_range=all_channel_range,
+                  quantile_samples=quantile_samples)
     if channel_details and channel_dim is not None:
-        idx = [slice(None) for dim in npa.shape]
-        channel_data = []
-        for channel in range(npa.shape[channel_dim]):
-            idx[channel_dim] = slice(channel, channel + 1)
-            channel_data.append(do_stat(npa[tuple(idx)], do_bits=True, all_channel_range=all_channel_range))
-        ret['channel_stats'] = channel_data
+        ret['channel_stats'] = do_channel_stats(npa, channel_dim, all_channel_range=all_channel_range,
+                                                quantile_samples=quantile_samples)
     return ret
 
 def max_error(orig, quant):